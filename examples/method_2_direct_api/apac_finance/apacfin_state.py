@@ -1,8 +1,12 @@
-import requests
+import os
+import sys
+
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from session_manager import SessionManager
 
 url = "https://apacfin.com/findBranch?id=5"
 
-payload = {}
 headers = {
   'accept': '*/*',
   'accept-language': 'en-GB,en-US;q=0.9,en;q=0.8',
@@ -18,11 +22,11 @@ headers = {
   'sec-fetch-site': 'same-origin',
   'user-agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
   'x-requested-with': 'XMLHttpRequest',
-  # NOTE: Obtain fresh XSRF-TOKEN and apac_session by visiting https://apacfin.com/contact_us
-  'Cookie': 'XSRF-TOKEN=YOUR_XSRF_TOKEN; apac_session=YOUR_SESSION_TOKEN'
+  # XSRF-TOKEN and apac_session are fetched from the contact page by SessionManager
 }
 
-response = requests.request("GET", url, headers=headers, data=payload)
+with SessionManager("https://apacfin.com/contact_us", headers) as session:
+    response = session.get(url)
 
 print(response.text)
 
@@ -1,77 +1,115 @@
-import requests
+import asyncio
 import csv
-import json
+import time
 
-def scrape_icici_hfc_data():
-    """Scrapes ICICI HFC branch data by hitting their API endpoint for each city."""
-    headers = {
-        'Accept': 'application/json, text/javascript, */*; q=0.01',
-        'User-Agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
-    }
+import aiohttp
 
-    # Data provided by the user
-    locations = {
-        "Andhra Pradesh": ["Bhimavaram", "Eluru", "Guntur", "Kakinada", "Kurnool", "Machilipatnam", "Nellore", "Ongole", "Rajahmundry", "Tirupati", "Vijayawada", "Visakhapatnam", "Vizianagaram"],
-        "Bihar": ["Patna"],
-        "Chandigarh": ["Chandigarh"],
-        "Chhattisgarh": ["Bilaspur", "Durg", "Raipur", "Raipur - Bhatagaon"],
-        "Delhi": ["Central Delhi - Karol Bagh", "Delhi - Model Town", "East Delhi - Laxmi Nagar", "North Delhi – Pitampura", "West Delhi – Janakpuri"],
-        "Gujarat": ["Ahmedabad - Nikol", "Ahmedabad - SG Highway", "Ahmedabad - West", "Anand", "Bharuch", "Bhavnagar", "Bopal", "Chandkheda", "Gandhidham", "Himmatnagar", "Junagadh", "Mehsana", "Modasa", "Morbi", "Narol", "Palanpur", "Patan", "Rajkot", "Surat", "Vadodara", "Vadodara-Waghodia Road", "Vapi"],
-        "Haryana": ["Ambala", "Faridabad", "Gurgaon 1 - Sec 29", "Gurgaon – Sohna Road", "Hissar", "Karnal", "Panchkula", "Panipat", "Rohtak", "Sonipat", "Yamunanagar"],
-        "Jharkhand": ["Jamshedpur", "Ranchi"],
-        "Karnataka": ["Bangalore - J P Nagar", "Bangalore - JP Nagar (REL)", "Bangalore - Sahakar Nagar", "Bangalore - Yeshwantpur", "Bangalore-Koramangala", "Belgaum", "Bengaluru - Kalyan Nagar", "Bengaluru - Vijaynagar", "Davangere", "Gulbarga", "Hasan", "Hubli", "Kengeri", "Marathahalli", "Mysore", "Shimoga"],
-        "Kerala": ["Kochi", "Kollam", "Kottayam", "Kozhikode (Calicut)", "Palakkad", "Thiruvananthapuram (Trivandrum)", "Thrissur"],
-        "Madhya Pradesh": ["Ashta", "Bhopal", "Dewas", "Dhar", "Guna", "Gwalior", "Indore - Navlakha", "Indore - Phooti Kothi", "Indore - Vijaynagar", "Indore Main - MG road", "Jabalpur", "Mandsaur", "Pithampur", "Ratlam", "Sagar", "Satna", "Ujjain", "Vidisha"],
-        "Maharashtra": ["Ahmednagar", "Akola", "Amravati", "Andheri", "Aurangabad", "Badlapur", "Baramati", "Boisar", "Buldhana", "Chandrapur", "Chinchwad - Pune", "Dhule", "Dombivli", "Jalgaon", "Kalyan-Mumbai", "Kharadi", "Kolhapur", "Latur", "Mira Road", "Mumbai - Borivali", "Mumbai – CBD Belapur", "Mumbai- Malad West", "Nagpur", "Nagpur - CA Road", "Nagpur Wardha Road", "Nanded", "Nashik", "Nashik - Panchvati", "Nashik Road", "Panvel", "Pune - Baner", "Pune - Main", "Pune - Wakad", "Pune-Hadapsar", "Pune-Vishrantwadi", "Ratnagiri", "Sangli", "Satara", "Solapur", "Thane", "Vasai", "Vashi", "Virar"],
-        "New Delhi": ["Lajpat Nagar", "New Delhi- Dwarka"],
-        "Odisha": ["Bhubaneswar"],
-        "Puducherry": ["Puducherry"],
-        "Punjab": ["Amritsar", "Bhatinda", "Ferozpur", "Jalandhar", "Kharar", "Ludhiana", "Pathankot", "Patiala"],
-        "Rajasthan": ["Ajmer", "Alwar", "Balotra", "Beawar", "Bhilwara", "Bhiwadi", "Bikaner", "Chittorgarh", "Chomu", "Dausa", "Hanumangarh", "Jagatpura", "Jaipur", "Jaipur - Main", "Jaipur - Vaishali Nagar", "Jodhpur", "Kalwar road", "Kekri", "Kota", "Kotputli", "Pali", "Sikar", "SriGanganagar", "Tonk", "Udaipur", "Vidyadhar nagar"],
-        "Tamil Nadu": ["Chennai - Annanagar", "Chennai - T Nagar", "Chennai - Tambaram", "Coimbatore", "Erode", "Hosur", "Madurai", "Nagercoil", "Salem", "Tenkasi", "Tirunelveli", "Tiruppur", "Trichy", "Tuticorin", "Vellore"],
-        "Telangana": ["Ameerpet", "Ameerpet NDMA", "ECIL Hyderabad", "Hyderabad - Dilsukhnagar", "Hyderabad - Kokapet", "Hyderabad - Kukatpally", "Hyderabad - Punjagutta", "Hyderabad - Secunderabad", "Hyderabad - Shamshabad", "Hyderabad – Kompally", "Khammam", "Nizamabad", "RC Puram", "Sangareddy", "Warangal"],
-        "Uttar Pradesh": ["Agra", "Allahabad - Prayagraj", "Bareilly", "Bijnor", "Ghaziabad", "Gorakhpur", "Greater Noida", "Jankipuram", "Jhansi", "Kanpur", "Lucknow", "Lucknow- South", "Lucknow- Transportnagar", "Mathura", "Meerut", "Moradabad", "Noida", "Pilibhit", "Raebareli", "Saharanpur", "Varanasi"],
-        "Uttarakhand": ["Central Dehradun", "Dehradun", "Dehradun-South", "Haldwani", "Haridwar", "Kashipur", "Roorkee", "Rudrapur", "Vikasnagar"],
-        "West Bengal": ["Kolkata - AJC Bose Road", "Kolkata - Howrah", "Siliguri"]
-    }
+BASE_URL = "https://www.icicihfc.com/bin/branchlocator?contentRequired=details&branch="
+HEADERS = {
+    'Accept': 'application/json, text/javascript, */*; q=0.01',
+    'User-Agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
+}
 
-    all_branches = []
-    base_url = "https://www.icicihfc.com/bin/branchlocator?contentRequired=details&branch="
+# Cities requested at the same time (also the size of the keep-alive connection pool)
+CONCURRENCY = 16
+RETRIES = 2
+OUTPUT_FILE = "icici_hfc_branches.csv"
 
-    for state, cities in locations.items():
-        for city in cities:
-            print(f"Fetching data for {city}, {state}...")
-            url = f"{base_url}{city.replace(' ', '%20')}"
+# Data provided by the user
+LOCATIONS = {
+    "Andhra Pradesh": ["Bhimavaram", "Eluru", "Guntur", "Kakinada", "Kurnool", "Machilipatnam", "Nellore", "Ongole", "Rajahmundry", "Tirupati", "Vijayawada", "Visakhapatnam", "Vizianagaram"],
+    "Bihar": ["Patna"],
+    "Chandigarh": ["Chandigarh"],
+    "Chhattisgarh": ["Bilaspur", "Durg", "Raipur", "Raipur - Bhatagaon"],
+    "Delhi": ["Central Delhi - Karol Bagh", "Delhi - Model Town", "East Delhi - Laxmi Nagar", "North Delhi – Pitampura", "West Delhi – Janakpuri"],
+    "Gujarat": ["Ahmedabad - Nikol", "Ahmedabad - SG Highway", "Ahmedabad - West", "Anand", "Bharuch", "Bhavnagar", "Bopal", "Chandkheda", "Gandhidham", "Himmatnagar", "Junagadh", "Mehsana", "Modasa", "Morbi", "Narol", "Palanpur", "Patan", "Rajkot", "Surat", "Vadodara", "Vadodara-Waghodia Road", "Vapi"],
+    "Haryana": ["Ambala", "Faridabad", "Gurgaon 1 - Sec 29", "Gurgaon – Sohna Road", "Hissar", "Karnal", "Panchkula", "Panipat", "Rohtak", "Sonipat", "Yamunanagar"],
+    "Jharkhand": ["Jamshedpur", "Ranchi"],
+    "Karnataka": ["Bangalore - J P Nagar", "Bangalore - JP Nagar (REL)", "Bangalore - Sahakar Nagar", "Bangalore - Yeshwantpur", "Bangalore-Koramangala", "Belgaum", "Bengaluru - Kalyan Nagar", "Bengaluru - Vijaynagar", "Davangere", "Gulbarga", "Hasan", "Hubli", "Kengeri", "Marathahalli", "Mysore", "Shimoga"],
+    "Kerala": ["Kochi", "Kollam", "Kottayam", "Kozhikode (Calicut)", "Palakkad", "Thiruvananthapuram (Trivandrum)", "Thrissur"],
+    "Madhya Pradesh": ["Ashta", "Bhopal", "Dewas", "Dhar", "Guna", "Gwalior", "Indore - Navlakha", "Indore - Phooti Kothi", "Indore - Vijaynagar", "Indore Main - MG road", "Jabalpur", "Mandsaur", "Pithampur", "Ratlam", "Sagar", "Satna", "Ujjain", "Vidisha"],
+    "Maharashtra": ["Ahmednagar", "Akola", "Amravati", "Andheri", "Aurangabad", "Badlapur", "Baramati", "Boisar", "Buldhana", "Chandrapur", "Chinchwad - Pune", "Dhule", "Dombivli", "Jalgaon", "Kalyan-Mumbai", "Kharadi", "Kolhapur", "Latur", "Mira Road", "Mumbai - Borivali", "Mumbai – CBD Belapur", "Mumbai- Malad West", "Nagpur", "Nagpur - CA Road", "Nagpur Wardha Road", "Nanded", "Nashik", "Nashik - Panchvati", "Nashik Road", "Panvel", "Pune - Baner", "Pune - Main", "Pune - Wakad", "Pune-Hadapsar", "Pune-Vishrantwadi", "Ratnagiri", "Sangli", "Satara", "Solapur", "Thane", "Vasai", "Vashi", "Virar"],
+    "New Delhi": ["Lajpat Nagar", "New Delhi- Dwarka"],
+    "Odisha": ["Bhubaneswar"],
+    "Puducherry": ["Puducherry"],
+    "Punjab": ["Amritsar", "Bhatinda", "Ferozpur", "Jalandhar", "Kharar", "Ludhiana", "Pathankot", "Patiala"],
+    "Rajasthan": ["Ajmer", "Alwar", "Balotra", "Beawar", "Bhilwara", "Bhiwadi", "Bikaner", "Chittorgarh", "Chomu", "Dausa", "Hanumangarh", "Jagatpura", "Jaipur", "Jaipur - Main", "Jaipur - Vaishali Nagar", "Jodhpur", "Kalwar road", "Kekri", "Kota", "Kotputli", "Pali", "Sikar", "SriGanganagar", "Tonk", "Udaipur", "Vidyadhar nagar"],
+    "Tamil Nadu": ["Chennai - Annanagar", "Chennai - T Nagar", "Chennai - Tambaram", "Coimbatore", "Erode", "Hosur", "Madurai", "Nagercoil", "Salem", "Tenkasi", "Tirunelveli", "Tiruppur", "Trichy", "Tuticorin", "Vellore"],
+    "Telangana": ["Ameerpet", "Ameerpet NDMA", "ECIL Hyderabad", "Hyderabad - Dilsukhnagar", "Hyderabad - Kokapet", "Hyderabad - Kukatpally", "Hyderabad - Punjagutta", "Hyderabad - Secunderabad", "Hyderabad - Shamshabad", "Hyderabad – Kompally", "Khammam", "Nizamabad", "RC Puram", "Sangareddy", "Warangal"],
+    "Uttar Pradesh": ["Agra", "Allahabad - Prayagraj", "Bareilly", "Bijnor", "Ghaziabad", "Gorakhpur", "Greater Noida", "Jankipuram", "Jhansi", "Kanpur", "Lucknow", "Lucknow- South", "Lucknow- Transportnagar", "Mathura", "Meerut", "Moradabad", "Noida", "Pilibhit", "Raebareli", "Saharanpur", "Varanasi"],
+    "Uttarakhand": ["Central Dehradun", "Dehradun", "Dehradun-South", "Haldwani", "Haridwar", "Kashipur", "Roorkee", "Rudrapur", "Vikasnagar"],
+    "West Bengal": ["Kolkata - AJC Bose Road", "Kolkata - Howrah", "Siliguri"]
+}
+
+
+async def fetch_city(session, semaphore, state, city):
+    """Returns (state, city, branches, error); branches is every branch the API returned for the city."""
+    url = f"{BASE_URL}{city.replace(' ', '%20')}"
+    async with semaphore:
+        for attempt in range(RETRIES + 1):
             try:
-                response = requests.get(url, headers=headers, timeout=15)
-                response.raise_for_status()
-                data = response.json()
-                if data:
-                    # The API returns a list, we take the first element
-                    branch_info = data[0]
-                    address = branch_info.get('address', 'N/A')
-                    all_branches.append([state, city, address])
-                else:
-                    print(f"No data found for {city}, {state}")
-            except requests.exceptions.RequestException as e:
-                print(f"Could not fetch data for {city}, {state}. Error: {e}")
-            except json.JSONDecodeError:
-                print(f"Could not decode JSON for {city}, {state}")
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    data = await response.json(content_type=None)
+                # The API returns a list; a city can have more than one branch
+                if isinstance(data, dict):
+                    data = [data]
+                return state, city, data or [], None
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error = str(e) or type(e).__name__
+                if isinstance(e, aiohttp.ClientResponseError) and e.status < 500 and e.status != 429:
+                    break
+                if attempt < RETRIES:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+    return state, city, None, error
 
-    return all_branches
+async def scrape_icici_hfc_data(writer):
+    """
+    Fetches every city concurrently and writes each branch row as soon as its city answers.
+    Returns (branches written, failed cities).
+    """
+    # Reasoning: One session with a bounded connector keeps the TLS connections alive across
+    # cities, and the semaphore keeps at most CONCURRENCY requests in flight.
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY, ttl_dns_cache=300)
+    timeout = aiohttp.ClientTimeout(total=15)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    written = 0
+    failed = []
 
-def save_to_csv(data, filename="icici_hfc_branches.csv"):
-    """Saves the scraped data to a CSV file with '@' as the delimiter."""
-    if not data:
-        print("No data was scraped. CSV file will not be created.")
-        return
+    async with aiohttp.ClientSession(headers=HEADERS, connector=connector, timeout=timeout) as session:
+        tasks = [
+            fetch_city(session, semaphore, state, city)
+            for state, cities in LOCATIONS.items()
+            for city in cities
+        ]
+        print(f"Fetching {len(tasks)} cities, {CONCURRENCY} at a time...")
+        for finished in asyncio.as_completed(tasks):
+            state, city, branches, error = await finished
+            if branches is None:
+                print(f"Could not fetch data for {city}, {state}. Error: {error}")
+                failed.append((state, city))
+                continue
+            if not branches:
+                print(f"No data found for {city}, {state}")
+                continue
+            for branch_info in branches:
+                writer.writerow([state, city, branch_info.get('address', 'N/A')])
+            written += len(branches)
+            print(f"Fetched {len(branches)} branch(es) for {city}, {state}")
 
-    with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
+    return written, failed
+
+def main():
+    start_time = time.time()
+    # Rows are written (in arrival order) as each city answers instead of being buffered
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile, delimiter='@')
         writer.writerow(['State', 'City', 'Address'])
-        writer.writerows(data)
-    print(f"Data successfully saved to {filename}")
+        written, failed = asyncio.run(scrape_icici_hfc_data(writer))
+
+    print(f"\nSaved {written} branches to {OUTPUT_FILE} in {time.time() - start_time:.1f} seconds.")
+    if failed:
+        print(f"{len(failed)} cities failed: {', '.join(city for _, city in failed)}")
 
 if __name__ == "__main__":
-    scraped_data = scrape_icici_hfc_data()
-    save_to_csv(scraped_data)
+    main()
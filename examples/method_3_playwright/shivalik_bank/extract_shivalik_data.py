@@ -1,6 +1,39 @@
-import requests
 from bs4 import BeautifulSoup
 import csv
+import os
+import re
+import sys
+
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from paginator import paginate
+from session_manager import SessionManager
+
+PAGE_WORKERS = 8
+
+PAGE_LINK_PATTERN = re.compile(r'[?&]page=(\d+)')
+
+
+def parse_branches(html):
+    """Branch name and address from every branch card of one listing page."""
+    soup = BeautifulSoup(html, 'html.parser')
+    branches = []
+    for branch in soup.find_all('div', class_='col-md-4'):
+        branch_name_tag = branch.find('h4')
+        branch_name = branch_name_tag.text.strip() if branch_name_tag else 'NA'
+
+        address_tag = branch.find('p')
+        address = address_tag.text.strip() if address_tag else 'NA'
+
+        if branch_name != 'NA':
+            branches.append({'Branch Name': branch_name, 'Address': address})
+    return branches
+
+
+def last_page_link(html):
+    """The highest page number linked from the pagination bar (a hint; the paginator verifies it)."""
+    return max((int(page) for page in PAGE_LINK_PATTERN.findall(html)), default=None)
+
 
 def scrape_shivalik_branches():
     """
@@ -25,45 +58,25 @@ def scrape_shivalik_branches():
         'sec-ch-ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
         'sec-ch-ua-mobile': '?1',
         'sec-ch-ua-platform': '"Android"',
-        # NOTE: Obtain fresh XSRF-TOKEN and sfsb_session by visiting https://shivalikbank.com/contact/branch
-        'Cookie': 'XSRF-TOKEN=YOUR_XSRF_TOKEN; sfsb_session=YOUR_SESSION_TOKEN'
+        # XSRF-TOKEN and sfsb_session are fetched from the branch page by SessionManager
     }
-    
-    all_branches = []
-    
-    # Loop through pages 1 to 10
-    for page_num in range(1, 11):
-        params = {
-            'page': page_num
-        }
-        
-        print(f"Scraping page {page_num}...")
-        
-        try:
-            response = requests.get(base_url, headers=headers, params=params, timeout=15)
-            response.raise_for_status() # Raise an exception for bad status codes
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            branch_containers = soup.find_all('div', class_='col-md-4')
-            
-            if not branch_containers:
-                print(f"No more branches found on page {page_num}. Stopping.")
-                break
-                
-            for branch in branch_containers:
-                branch_name_tag = branch.find('h4')
-                branch_name = branch_name_tag.text.strip() if branch_name_tag else 'NA'
-                
-                address_tag = branch.find('p')
-                address = address_tag.text.strip() if address_tag else 'NA'
-                
-                if branch_name != 'NA':
-                    all_branches.append({'Branch Name': branch_name, 'Address': address})
-
-        except requests.exceptions.RequestException as e:
-            print(f"Error scraping page {page_num}: {e}")
-            continue
+    session = SessionManager(base_url, headers, pool_size=PAGE_WORKERS, timeout=15)
+
+    def fetch_page(page_num):
+        response = session.get(base_url, params={'page': page_num})
+        response.raise_for_status()  # Raise an exception for bad status codes
+        return response.text
+
+    # Reasoning: The listing used to be walked as pages 1-10 one after another, which cut off
+    # every branch past page 10. The paginator finds the real last page (starting from the
+    # pagination links on page 1) and fetches all pages concurrently.
+    pages, failures = paginate(fetch_page, parse_page=parse_branches, page_count=last_page_link,
+                               workers=PAGE_WORKERS, name='Shivalik')
+    session.close()
+
+    all_branches = [branch for _, branches in pages for branch in branches]
+    for page_num, error in failures:
+        print(f"Error scraping page {page_num}: {error}")
 
     output_file = 'shivalik_branches.csv'
     if not all_branches:
@@ -1,7 +1,43 @@
 
 import asyncio
-from playwright.async_api import async_playwright
 import csv
+import os
+import sys
+
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from paginator import paginate_async
+from playwright_capture import block_resources, capture
+from playwright_pool import PagePool, goto
+from extract_shivalik_data import last_page_link, parse_branches
+
+PAGE_WORKERS = 4
+
+# 'capture': read each page's HTML from the document response, with every other request
+#            (CSS, scripts, images, fonts) aborted, and parse it without rendering.
+# 'render':  let the page render and read the cards from the DOM.
+MODE = 'capture'
+
+# Branch cards of one listing page, plus the highest page number in the pagination links
+# (a hint for the paginator, which still verifies where the listing ends).
+EXTRACT_BRANCHES_JS = '''( () => {
+    const data = [];
+    const containers = document.querySelectorAll('.col-md-4');
+    containers.forEach(branch => {
+        const name = branch.querySelector('h4');
+        const address = branch.querySelector('p');
+        if (name) {
+            data.push({
+                "Branch Name": name.innerText.trim(),
+                "Address": address ? address.innerText.trim() : 'NA'
+            });
+        }
+    });
+    const pageNumbers = Array.from(document.querySelectorAll('a[href*="page="]'))
+        .map(link => parseInt(new URL(link.href).searchParams.get('page'), 10))
+        .filter(number => !isNaN(number));
+    return {branches: data, lastPageLink: pageNumbers.length ? Math.max(...pageNumbers) : null};
+} )'''
 
 async def scrape_shivalik_with_playwright():
     """
@@ -10,45 +46,38 @@ async def scrape_shivalik_with_playwright():
     all_branches = []
     print("Launching browser...")
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
-        
-        for page_num in range(1, 11):
+    # Reasoning: One browser with PAGE_WORKERS tabs; the paginator keeps that many page loads
+    # in flight, and each load returns at DOMContentLoaded (the cards are server-rendered)
+    # instead of waiting for networkidle.
+    if MODE == 'capture':
+        setup = lambda page: block_resources(page, keep=('document',))
+    else:
+        setup = block_resources
+
+    async with PagePool.launch(size=PAGE_WORKERS, setup=setup) as pool:
+
+        async def fetch_page(page_num):
             url = f"https://shivalikbank.com/contact/branch?page={page_num}"
             print(f"Navigating to page {page_num}...")
-            
-            try:
-                await page.goto(url, wait_until='networkidle', timeout=30000)
-                
+            async with pool.page() as page:
+                if MODE == 'capture':
+                    [html] = await capture(page, '/contact/branch', url=url, resource_types=('document',),
+                                           body='text')
+                    return {'branches': parse_branches(html), 'lastPageLink': last_page_link(html)}
+                await goto(page, url, wait_for='.col-md-4 h4', wait_timeout=5000)
                 # Using evaluate to run JavaScript in the page context to get the data
-                branches_on_page = await page.evaluate('''( () => {
-                    const data = [];
-                    const containers = document.querySelectorAll('.col-md-4');
-                    containers.forEach(branch => {
-                        const name = branch.querySelector('h4');
-                        const address = branch.querySelector('p');
-                        if (name) {
-                            data.push({
-                                "Branch Name": name.innerText.trim(),
-                                "Address": address ? address.innerText.trim() : 'NA'
-                            });
-                        }
-                    });
-                    return data;
-                } )''')
-
-                if not branches_on_page:
-                    print(f"No more branches found on page {page_num}. Stopping.")
-                    break
-                
-                all_branches.extend(branches_on_page)
-
-            except Exception as e:
-                print(f"An error occurred on page {page_num}: {e}")
-                break
+                return await page.evaluate(EXTRACT_BRANCHES_JS)
 
-        await browser.close()
+        pages, failures = await paginate_async(
+            fetch_page,
+            parse_page=lambda result: result['branches'],
+            page_count=lambda result: result['lastPageLink'],
+            workers=PAGE_WORKERS,
+            name='Shivalik',
+        )
+        for page_num, error in failures:
+            print(f"An error occurred on page {page_num}: {error}")
+        all_branches = [branch for _, branches in pages for branch in branches]
 
     # Save to CSV
     output_file = 'shivalik_branches.csv'
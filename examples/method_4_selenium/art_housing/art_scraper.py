@@ -1,240 +1,383 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait, Select
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import csv
-import json
-import time
-
-# Set up Chrome options with performance logging
-chrome_options = Options()
-chrome_options.add_argument("--headless")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--window-size=1920,1080")
-chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
-
-# Initialize the WebDriver
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
-
-# URL of the page to scrape
-url = "https://arthfc.com/contact-details-statewise/"  # Replace with actual URL
-driver.get(url)
-
-# Wait for the page to load
-WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'bl-state-select')))
-
-# List to store scraped data
-data = []
-
-# Function to safely click an element
-def safe_click(element):
-    try:
-        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        time.sleep(0.5)
-        element.click()
-        return True
-    except Exception as e:
-        try:
-            driver.execute_script("arguments[0].click();", element)
-            return True
-        except:
-            return False
-
-# Function to get AJAX response from network logs
-def get_ajax_response():
-    logs = driver.get_log('performance')
-    for log in logs:
-        log_data = json.loads(log['message'])['message']
-        if log_data['method'] == 'Network.responseReceived':
-            url = log_data['params']['response']['url']
-            if 'admin-ajax.php' in url:
-                request_id = log_data['params']['requestId']
-                try:
-                    response = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
-                    if 'body' in response and response['body']:
-                        # Try to parse as JSON
-                        try:
-                            return json.loads(response['body'])
-                        except json.JSONDecodeError:
-                            # If not JSON, return the raw body
-                            return {'raw_body': response['body']}
-                    else:
-                        print("Empty response body")
-                        return None
-                except Exception as e:
-                    print(f"Error getting response body: {e}")
-                    return None
-    return None
-
-# Function to extract data from DOM as fallback
-def extract_from_dom():
-    try:
-        # Wait for the branch details to be visible
-        WebDriverWait(driver, 5).until(
-            EC.visibility_of_element_located((By.CSS_SELECTOR, '#bl-branch-details .branch-box'))
-        )
-        
-        branch_box = driver.find_element(By.CSS_SELECTOR, '#bl-branch-details .branch-box')
-        
-        # Get branch name
-        branch_title = branch_box.find_element(By.TAG_NAME, 'h4').text.strip()
-        
-        # Get address
-        address_element = branch_box.find_element(By.CSS_SELECTOR, 'p.max-w80')
-        address = address_element.text.strip()
-        
-        return {
-            'title': branch_title,
-            'address': address
-        }
-    except Exception as e:
-        print(f"Error extracting from DOM: {e}")
-        return None
-
-# Get all state options first
-state_dropdown = driver.find_element(By.CSS_SELECTOR, '.nice-select')
-safe_click(state_dropdown)
-state_options = driver.find_elements(By.CSS_SELECTOR, '.nice-select ul li.option')
-
-# Store state information
-states = []
-for i in range(1, len(state_options)):
-    state_option = state_options[i]
-    state_name = state_option.text.strip()
-    state_value = state_option.get_attribute('data-value')
-    states.append({'name': state_name, 'value': state_value})
-
-# Process each state
-for state in states:
-    state_name = state['name']
-    state_value = state['value']
-    
-    print(f"Processing state: {state_name}")
-    
-    # Reopen the state dropdown
-    state_dropdown = driver.find_element(By.CSS_SELECTOR, '.nice-select')
-    safe_click(state_dropdown)
-    
-    # Find and click the state option
-    state_options = driver.find_elements(By.CSS_SELECTOR, '.nice-select ul li.option')
-    state_found = False
-    for option in state_options:
-        if option.get_attribute('data-value') == state_value:
-            if safe_click(option):
-                state_found = True
-                break
-    
-    if not state_found:
-        print(f"Could not find state: {state_name}")
-        continue
-    
-    # Get the currently selected state name from the dropdown
-    try:
-        current_state_element = driver.find_element(By.CSS_SELECTOR, '.nice-select .current')
-        current_state_name = current_state_element.text.strip()
-        print(f"Current state selected: {current_state_name}")
-    except Exception as e:
-        print(f"Error getting current state: {e}")
-        current_state_name = state_name  # Fallback to stored name
-    
-    # Wait for the branch dropdown to load
-    try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'bl-branch-select')))
-    except:
-        print(f"Branch dropdown not found for state: {current_state_name}")
-        continue
-    
-    # Get all branch options
-    branch_select = driver.find_element(By.ID, 'bl-branch-select')
-    branch_options = branch_select.find_elements(By.TAG_NAME, 'option')
-    
-    # Store branch information
-    branches = []
-    for j in range(1, len(branch_options)):
-        branch_option = branch_options[j]
-        branch_name = branch_option.text.strip()
-        branch_value = branch_option.get_attribute('value')
-        branches.append({'name': branch_name, 'value': branch_value})
-    
-    # Process each branch
-    for branch in branches:
-        branch_name = branch['name']
-        branch_value = branch['value']
-        
-        print(f"  Processing branch: {branch_name}")
-        
-        # Select the branch
-        branch_select = driver.find_element(By.ID, 'bl-branch-select')
-        select = Select(branch_select)
-        select.select_by_value(branch_value)
-        
-        # Wait for AJAX response
-        time.sleep(1)
-        
-        # Try to get AJAX response
-        ajax_response = get_ajax_response()
-        
-        # Initialize variables
-        address = ''
-        title = ''
-        
-        if ajax_response:
-            try:
-                # Check if response is in expected format
-                if 'raw_body' in ajax_response:
-                    # Handle non-JSON response
-                    print(f"    Non-JSON response: {ajax_response['raw_body'][:100]}...")
-                    # Try DOM extraction as fallback
-                    dom_data = extract_from_dom()
-                    if dom_data:
-                        address = dom_data.get('address', '')
-                        title = dom_data.get('title', '')
-                else:
-                    # Extract data from JSON response
-                    address = ajax_response.get('address', '')
-                    title = ajax_response.get('title', '')
-                    
-                    # If address or title is missing, try DOM extraction
-                    if not address or not title:
-                        dom_data = extract_from_dom()
-                        if dom_data:
-                            address = dom_data.get('address', address)
-                            title = dom_data.get('title', title)
-            except Exception as e:
-                print(f"    Error extracting details from AJAX: {e}")
-                # Try DOM extraction as fallback
-                dom_data = extract_from_dom()
-                if dom_data:
-                    address = dom_data.get('address', '')
-                    title = dom_data.get('title', '')
-        else:
-            print(f"    No AJAX response for {branch_name}, trying DOM extraction")
-            # Try DOM extraction as fallback
-            dom_data = extract_from_dom()
-            if dom_data:
-                address = dom_data.get('address', '')
-                title = dom_data.get('title', '')
-        
-        # Add to data list if we have at least some data
-        if address or title:
-            data.append([current_state_name, branch_name, title, address])
-            print(f"    Added: {current_state_name}, {branch_name}, {address[:50]}...")
-        else:
-            print(f"    No data extracted for {branch_name}")
-
-# Write data to CSV file
-with open('art_branches.csv', 'w', newline='', encoding='utf-8') as f:
-    writer = csv.writer(f, delimiter='@')
-    writer.writerow(['State', 'City', 'Branch', 'Address'])
-    writer.writerows(data)
-
-print(f"Scraping complete. {len(data)} records saved to art_branches.csv")
-
-# Close the WebDriver
-driver.quit()
\ No newline at end of file
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support import expected_conditions as EC
+import html
+import os
+import re
+import sys
+
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from selenium_waits import install_ajax_tracker
+from cdp_network import NetworkCapture
+from browser_pool import BrowserPool
+from ajax_replay import RecordedRequest, ReplaySession, replay_many
+from driver_factory import create_chrome_driver
+from checkpoint import CheckpointedCrawl
+from dom_batch import extract_one, select_options
+from dropdowns import choose
+
+# URL of the page to scrape
+url = "https://arthfc.com/contact-details-statewise/"  # Replace with actual URL
+OUTPUT_FILE = 'art_branches.csv'
+CSV_HEADER = ['State', 'City', 'Branch', 'Address']
+
+# Per-state part files with a log of completed branches; merged into OUTPUT_FILE at the end
+CRAWL = CheckpointedCrawl(OUTPUT_FILE, CSV_HEADER, delimiter='@')
+
+# Number of Chrome instances crawling states in parallel
+WORKERS = 4
+
+# 'replay': record the admin-ajax.php calls once in a browser and replay them over HTTP
+# 'browser': drive Chrome for every branch (also used automatically if recording fails)
+MODE = 'replay'
+REPLAY_WORKERS = 8
+
+OPTION_PATTERN = re.compile(r'<option[^>]*value=["\']([^"\']*)["\'][^>]*>(.*?)</option>', re.DOTALL)
+
+# Function to start a lean Chrome instance with performance logging (images/fonts/analytics blocked)
+def create_driver():
+    return create_chrome_driver(network_logging=True, profile='art_housing')
+
+# Function to load the page and start tracking admin-ajax.php calls
+def open_page(driver):
+    driver.get(url)
+
+    # Wait for the page to load (driver.get returns at DOMContentLoaded, so also wait for nice-select,
+    # which means the page's own scripts have initialised the dropdowns)
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, 'bl-state-select')))
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, '.nice-select')))
+
+    # Track admin-ajax.php calls so each step waits for its own response instead of sleeping
+    install_ajax_tracker(driver)
+
+# Function to trigger an AJAX call and capture exactly the response it produced
+def get_ajax_response(ajax_capture, trigger):
+    response = ajax_capture.fetch(trigger, timeout=10)
+    if response is None:
+        return None
+    if not response.body:
+        print("Empty response body")
+        return None
+    # Try to parse as JSON; if not JSON, return the raw body
+    parsed = response.json()
+    return parsed if parsed is not None else {'raw_body': response.body}
+
+# Function to extract data from DOM as fallback
+def extract_from_dom(driver):
+    try:
+        # Wait for the branch details to be visible
+        WebDriverWait(driver, 5).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, '#bl-branch-details .branch-box'))
+        )
+
+        # Read branch name and address in one round-trip
+        dom_data = extract_one(driver, '#bl-branch-details .branch-box', {'title': 'h4', 'address': 'p.max-w80'})
+        if dom_data is None or dom_data['title'] is None or dom_data['address'] is None:
+            print("Error extracting from DOM: branch box is incomplete")
+            return None
+        return dom_data
+    except Exception as e:
+        print(f"Error extracting from DOM: {e}")
+        return None
+
+# Function to read all state options (name and value) from the underlying <select>
+def list_states(driver):
+    open_page(driver)
+
+    # Read all state names and values in one round-trip (skipping the placeholder)
+    return [
+        {'name': option['text'], 'value': option['value']}
+        for option in select_options(driver, '#bl-state-select')[1:]
+    ]
+
+# Function to select a state and read its branch options (returns the state name and branches)
+def select_state(driver, state):
+    state_name = state['name']
+
+    # Set the state <select> directly and fire its change event (nice-select is kept in sync),
+    # then wait only until the branch dropdown has been repopulated
+    try:
+        branch_options = choose(driver, '#bl-state-select', state['value'], dependent='#bl-branch-select',
+                                timeout=10, ajax_url_fragment='admin-ajax.php', skip_placeholder=False)
+    except NoSuchElementException:
+        print(f"Could not find state: {state_name}")
+        return None, []
+
+    # Store branch information (skipping the placeholder)
+    branches = [{'name': option['text'], 'value': option['value']} for option in branch_options[1:]]
+    if not branches:
+        print(f"Branch dropdown not found for state: {state_name}")
+    return state_name, branches
+
+# Function to scrape every branch of one state into its checkpointed part file
+# (runs inside a browser pool worker; returns the number of rows written)
+def scrape_state(driver, state):
+    with CRAWL.part(state['name']) as writer:
+        if writer.is_done():
+            print(f"State already complete: {state['name']}")
+            return writer.rows_written
+        scrape_branches(driver, state, writer)
+        return writer.rows_written
+
+def scrape_branches(driver, state, writer):
+    print(f"Processing state: {state['name']}")
+    open_page(driver)
+    ajax_capture = NetworkCapture(driver, 'admin-ajax.php')
+
+    current_state_name, branches = select_state(driver, state)
+    if current_state_name is None:
+        # The state could not be selected, so its branch list is unknown; leave it open for a retry
+        return
+
+    # Process each branch, skipping those already saved by an earlier run
+    for branch in branches:
+        branch_name = branch['name']
+        branch_value = branch['value']
+        if writer.is_done(branch_value):
+            continue
+
+        print(f"  Processing branch: {branch_name}")
+
+        # Select the branch and capture the AJAX response triggered by this selection
+        ajax_response = get_ajax_response(ajax_capture, lambda: choose(driver, '#bl-branch-select', branch_value))
+
+        # Initialize variables
+        address = ''
+        title = ''
+
+        if ajax_response:
+            try:
+                # Check if response is in expected format
+                if 'raw_body' in ajax_response:
+                    # Handle non-JSON response
+                    print(f"    Non-JSON response: {ajax_response['raw_body'][:100]}...")
+                    # Try DOM extraction as fallback
+                    dom_data = extract_from_dom(driver)
+                    if dom_data:
+                        address = dom_data.get('address', '')
+                        title = dom_data.get('title', '')
+                else:
+                    # Extract data from JSON response
+                    address = ajax_response.get('address', '')
+                    title = ajax_response.get('title', '')
+
+                    # If address or title is missing, try DOM extraction
+                    if not address or not title:
+                        dom_data = extract_from_dom(driver)
+                        if dom_data:
+                            address = dom_data.get('address', address)
+                            title = dom_data.get('title', title)
+            except Exception as e:
+                print(f"    Error extracting details from AJAX: {e}")
+                # Try DOM extraction as fallback
+                dom_data = extract_from_dom(driver)
+                if dom_data:
+                    address = dom_data.get('address', '')
+                    title = dom_data.get('title', '')
+        else:
+            print(f"    No AJAX response for {branch_name}, trying DOM extraction")
+            # Try DOM extraction as fallback
+            dom_data = extract_from_dom(driver)
+            if dom_data:
+                address = dom_data.get('address', '')
+                title = dom_data.get('title', '')
+
+        # Save the branch (and checkpoint it) if we have at least some data
+        if address or title:
+            writer.write((branch_value,), [[current_state_name, branch_name, title, address]])
+            print(f"    Added: {current_state_name}, {branch_name}, {address[:50]}...")
+        else:
+            print(f"    No data extracted for {branch_name}")
+
+    # Branches without data stay open, so they are retried on the next run.
+    # A state whose dropdown legitimately has no branches is complete as it is.
+    if all(writer.is_done(branch['value']) for branch in branches):
+        writer.mark_done()
+
+# Function to turn a branch-details AJAX response into (title, address)
+def parse_branch_details(response):
+    details = response.json()
+    if not isinstance(details, dict):
+        raise ValueError(f"Unexpected response: {response.text[:100]}")
+    return details.get('title', ''), details.get('address', '')
+
+# Function to read branch options out of a state AJAX response (HTML, or JSON wrapping HTML)
+def parse_branch_options(response):
+    text = response.text.replace('\\"', '"').replace('\\/', '/')
+    return [
+        {'name': html.unescape(re.sub(r'<[^>]+>', '', name)).strip(), 'value': value}
+        for value, name in OPTION_PATTERN.findall(text) if value
+    ]
+
+# Function to record the state and branch requests from one short browser session
+def record_endpoints(driver, states):
+    open_page(driver)
+    ajax_capture = NetworkCapture(driver, 'admin-ajax.php')
+
+    for state in states:
+        # Select the state; if the page fetches its branch list via admin-ajax.php, capture that too
+        selected = []
+        state_response = ajax_capture.fetch(lambda: selected.extend(select_state(driver, state)), timeout=3)
+        current_state_name, branches = selected
+        if not branches:
+            continue
+        branch = branches[0]
+
+        # Select the first branch and capture its details request
+        branch_response = ajax_capture.fetch(lambda: choose(driver, '#bl-branch-select', branch['value']), timeout=10)
+        if branch_response is None or branch_response.json() is None:
+            print("Could not capture the branch details request")
+            return None
+
+        branch_request = RecordedRequest.from_capture(branch_response, driver)
+        branch_field = branch_request.field_with_value(branch['value'])
+        if branch_field is None:
+            print(f"Branch value not found in the recorded request: {branch_request}")
+            return None
+
+        state_request, state_field = None, None
+        if state_response is not None:
+            state_request = RecordedRequest.from_capture(state_response, driver)
+            state_field = state_request.field_with_value(state['value'])
+        print(f"Recorded branch request: {branch_request} (field '{branch_field}')")
+        print(f"Recorded state request: {state_request} (field '{state_field}')")
+        return branch_request, branch_field, state_request, state_field
+
+    print("No state with branches found while recording")
+    return None
+
+# Function to scrape everything by replaying the recorded requests over HTTP.
+# Returns (states, failed state names), or None if the requests could not be recorded.
+def scrape_with_replay():
+    # --- 1. RECORD ---
+    # Reasoning: The browser is only needed to find the endpoint, its parameters and
+    # the cookies; after that every branch is one plain POST.
+    driver = create_driver()
+    try:
+        states = list_states(driver)
+        print(f"Found {len(states)} states")
+        completed_states = set()
+        for state in states:
+            with CRAWL.part(state['name']) as writer:
+                if writer.is_done():
+                    completed_states.add(state['name'])
+        if completed_states:
+            print(f"{len(completed_states)} state(s) already complete from an earlier run")
+        recorded = record_endpoints(driver, states)
+        if recorded is None:
+            return None
+        branch_request, branch_field, state_request, state_field = recorded
+
+        # --- 2. STATE -> BRANCH LISTS ---
+        # replayed[state name] = branch list, for every state whose replayed request succeeded
+        replayed = {}
+        if state_field is not None:
+            state_session = ReplaySession(state_request, pool_size=REPLAY_WORKERS)
+            state_results = replay_many(state_session, [{state_field: state['value']} for state in states],
+                                        parse=parse_branch_options, workers=REPLAY_WORKERS)
+            state_session.close()
+            # Reasoning: One state without branches is just an empty state, but if no state
+            # returned any branch the replayed request itself is not working.
+            if any(error is None and branches for _, branches, error in state_results):
+                replayed = {
+                    state['name']: branches
+                    for state, (_, branches, error) in zip(states, state_results) if error is None
+                }
+            else:
+                print("State replay did not return branch lists; reading them in the browser")
+
+        # A branch list of None means it could not be read; that state stays open for a retry.
+        # Reading the branch dropdown per state is cheap; only the per-branch calls are replayed.
+        branch_lists = []
+        for state in states:
+            if state['name'] in completed_states:
+                branch_lists.append((state['name'], []))
+            elif state['name'] in replayed:
+                branch_lists.append((state['name'], replayed[state['name']]))
+            else:
+                current_state_name, branches = select_state(driver, state)
+                branch_lists.append((state['name'], branches if current_state_name is not None else None))
+    finally:
+        driver.quit()
+
+    # --- 3. BRANCH DETAILS ---
+    writers = {state_name: CRAWL.part(state_name) for state_name, _ in branch_lists}
+    try:
+        # Skip branches saved by an earlier, interrupted run
+        jobs = [
+            (state_name, branch) for state_name, branches in branch_lists for branch in branches or []
+            if not writers[state_name].is_done(branch['value'])
+        ]
+        session = ReplaySession(branch_request, pool_size=REPLAY_WORKERS)
+        try:
+            results = replay_many(session, [{branch_field: branch['value']} for _, branch in jobs],
+                                  parse=parse_branch_details, workers=REPLAY_WORKERS)
+        finally:
+            session.close()
+
+        for (state_name, branch), (_, details, error) in zip(jobs, results):
+            if error:
+                print(f"    Failed: {state_name}, {branch['name']}: {error}")
+                continue
+            title, address = details
+            if address or title:
+                writers[state_name].write((branch['value'],), [[state_name, branch['name'], title, address]])
+            else:
+                print(f"    No data extracted for {branch['name']}")
+
+        failed = []
+        for state_name, branches in branch_lists:
+            writer = writers[state_name]
+            if writer.is_done():
+                continue
+            if branches is not None and all(writer.is_done(branch['value']) for branch in branches):
+                writer.mark_done()
+            else:
+                failed.append(state_name)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return [{'name': state_name} for state_name, _ in branch_lists], failed
+
+def scrape_with_browsers():
+    # Read the state list with one short-lived browser
+    driver = create_driver()
+    try:
+        states = list_states(driver)
+    finally:
+        driver.quit()
+    print(f"Found {len(states)} states")
+
+    # Crawl states in parallel, one browser per worker; each state checkpoints to its own part
+    results = BrowserPool(create_driver, workers=WORKERS).run(scrape_state, states)
+    failed = []
+    for state, rows, error in results:
+        if rows is None:
+            print(f"State {state['name']} failed: {error}")
+            failed.append(state['name'])
+            continue
+        # A state with branches still missing data is kept for the next run as well
+        with CRAWL.part(state['name']) as writer:
+            if not writer.is_done():
+                print(f"State {state['name']} incomplete")
+                failed.append(state['name'])
+    return states, failed
+
+def main():
+    result = None
+    if MODE == 'replay':
+        result = scrape_with_replay()
+        if result is None:
+            print("Replay mode unavailable; falling back to the browser crawl")
+    if result is None:
+        result = scrape_with_browsers()
+
+    # Merge the per-state parts in dropdown order; parts are kept for a resume if anything failed
+    states, failed = result
+    written = CRAWL.merge([state['name'] for state in states], failed)
+    print(f"Scraping complete. {written} records saved to {OUTPUT_FILE}")
+
+if __name__ == "__main__":
+    main()
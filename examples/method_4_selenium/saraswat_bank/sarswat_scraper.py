@@ -1,202 +1,279 @@
-import csv
-import time
-import re
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-
-chrome_options = Options()
-chrome_options.add_argument("--headless")  
-chrome_options.add_argument("--no-sandbox")
-chrome_options.add_argument("--disable-dev-shm-usage")
-chrome_options.add_argument("--disable-gpu")
-chrome_options.add_argument("--window-size=1920,1080")
-
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service, options=chrome_options)
-
-url = "https://www.saraswatbank.com/locator.aspx?id=LocateUs"
-driver.get(url)
-
-# Prepare CSV file
-csv_file = open('sarswat_branches.csv', 'w', newline='', encoding='utf-8')
-csv_writer = csv.writer(csv_file, delimiter='@')
-csv_writer.writerow(['State', 'City', 'Area', 'Address'])
-
-try:
-    # Wait for page to load
-    wait = WebDriverWait(driver, 20)
-    
-    # Wait for state dropdown to load
-    state_dropdown = wait.until(EC.presence_of_element_located((By.ID, "ddlState")))
-    
-    # Get all state options (excluding "Select State")
-    state_options = state_dropdown.find_elements(By.TAG_NAME, "option")[1:]
-    print(f"Found {len(state_options)} states")
-    
-    for state_option in state_options:
-        state_value = state_option.get_attribute("value")
-        state_name = state_option.text
-        print(f"Processing state: {state_name}")
-        
-        # Select state
-        state_dropdown.click()
-        state_option.click()
-        
-        # Wait for city dropdown to update and get options
-        city_dropdown = wait.until(EC.presence_of_element_located((By.ID, "ddlCity")))
-        time.sleep(1)  # Allow time for city dropdown to populate
-        
-        city_options = city_dropdown.find_elements(By.TAG_NAME, "option")[1:]
-        print(f"Found {len(city_options)} cities in {state_name}")
-        
-        for city_option in city_options:
-            city_value = city_option.get_attribute("value")
-            city_name = city_option.text
-            print(f"Processing city: {city_name}")
-            
-            # Select city
-            city_dropdown.click()
-            city_option.click()
-            
-            # Wait for area dropdown to update and get options
-            area_dropdown = wait.until(EC.presence_of_element_located((By.ID, "ddlArea")))
-            time.sleep(1)  # Allow time for area dropdown to populate
-            
-            area_options = area_dropdown.find_elements(By.TAG_NAME, "option")[1:]
-            print(f"Found {len(area_options)} areas in {city_name}")
-            
-            for area_option in area_options:
-                area_value = area_option.get_attribute("value")
-                area_name = area_option.text
-                print(f"Processing area: {area_name}")
-                
-                # Select area
-                area_dropdown.click()
-                area_option.click()
-                time.sleep(1)
-                
-                # Click submit button
-                submit_button = driver.find_element(By.CSS_SELECTOR, "input[type='button'][value='Submit']")
-                driver.execute_script("arguments[0].click();", submit_button)
-                
-                # Wait for branch details to appear and stabilize
-                try:
-                    # First, wait for the branch details element to be present
-                    branch_details = wait.until(
-                        EC.presence_of_element_located((By.ID, "branchDetails"))
-                    )
-                    
-                    # Then wait for it to be visible (not hidden)
-                    wait.until(
-                        EC.visibility_of_element_located((By.ID, "branchDetails"))
-                    )
-                    
-                    # Additional wait to ensure content is loaded
-                    time.sleep(2)
-                    
-                    # Check if the branch details section has content
-                    if branch_details.text.strip() == "":
-                        print(f"No branch details content for {state_name}, {city_name}, {area_name}")
-                        address = "N/A"
-                    else:
-                        # Extract address using multiple methods
-                        address = "N/A"
-                        
-                        # Method 1: Try to find address element by XPath
-                        try:
-                            address_element = branch_details.find_element(By.XPATH, ".//li[span[text()='Address']]")
-                            address = address_element.text.replace("Address", "").strip()
-                            if address:
-                                print(f"Found address (method 1): {address}")
-                        except:
-                            pass
-                        
-                        # Method 2: If method 1 failed, try to find by CSS selector
-                        if address == "N/A":
-                            try:
-                                address_element = branch_details.find_element(By.CSS_SELECTOR, "li:has(span:contains('Address'))")
-                                # Get the text of the li element and remove the span part
-                                address = address_element.text.replace("Address", "").strip()
-                                if address:
-                                    print(f"Found address (method 2): {address}")
-                            except:
-                                pass
-                        
-                        # Method 3: If methods 1 and 2 failed, try to extract from the entire HTML
-                        if address == "N/A":
-                            try:
-                                # Get the HTML of the branch details
-                                branch_html = branch_details.get_attribute('innerHTML')
-                                
-                                # Use regex to extract address
-                                address_match = re.search(r'<li>\s*<span>Address</span>(.*?)</li>', branch_html, re.DOTALL)
-                                if address_match:
-                                    address = address_match.group(1).strip()
-                                    # Remove any HTML tags
-                                    address = re.sub(r'<[^>]+>', '', address)
-                                    if address:
-                                        print(f"Found address (method 3): {address}")
-                            except:
-                                pass
-                        
-                        # Method 4: If all else failed, try to find any list item containing "Address"
-                        if address == "N/A":
-                            try:
-                                list_items = branch_details.find_elements(By.TAG_NAME, "li")
-                                for item in list_items:
-                                    if "Address" in item.text:
-                                        # Split by "Address" and take the second part
-                                        parts = item.text.split("Address", 1)
-                                        if len(parts) > 1:
-                                            address = parts[1].strip()
-                                            if address:
-                                                print(f"Found address (method 4): {address}")
-                                                break
-                            except:
-                                pass
-                        
-                        # If we still don't have an address, get the entire text of branch_details
-                        if address == "N/A":
-                            print(f"Branch details text: {branch_details.text}")
-                            print(f"Branch details HTML: {branch_details.get_attribute('innerHTML')}")
-                    
-                    # Write to CSV
-                    csv_writer.writerow([state_name, city_name, area_name, address])
-                    print(f"Saved to CSV: {state_name}, {city_name}, {area_name}, {address}")
-                    
-                except Exception as e:
-                    print(f"No branch details found for {state_name}, {city_name}, {area_name}: {str(e)}")
-                    continue
-                
-                # Reset area dropdown for next iteration
-                area_dropdown = driver.find_element(By.ID, "ddlArea")
-                area_dropdown.click()
-                driver.find_element(By.CSS_SELECTOR, "#ddlArea option[value='-1']").click()
-                time.sleep(0.5)
-                
-                # Clear branch details to avoid mixing data
-                driver.execute_script("document.getElementById('branchDetails').innerHTML = '';")
-                time.sleep(0.5)
-            
-            # Reset city dropdown for next iteration
-            city_dropdown = driver.find_element(By.ID, "ddlCity")
-            city_dropdown.click()
-            driver.find_element(By.CSS_SELECTOR, "#ddlCity option[value='-1']").click()
-            time.sleep(0.5)
-        
-        # Reset state dropdown for next iteration
-        state_dropdown = driver.find_element(By.ID, "ddlState")
-        state_dropdown.click()
-        driver.find_element(By.CSS_SELECTOR, "#ddlState option[value='-1']").click()
-        time.sleep(0.5)
-
-finally:
-    # Clean up
-    csv_file.close()
-    driver.quit()
-    print("Scraping completed. Data saved to sarswat_branches.csv")
\ No newline at end of file
+import os
+import re
+import sys
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from selenium_waits import install_ajax_tracker, ajax_count, ajax_completed, ajax_idle, text_stabilized
+from browser_pool import BrowserPool
+from checkpoint import CheckpointedCrawl
+from driver_factory import create_chrome_driver
+from dom_batch import labelled_values, select_options
+from dropdowns import choose
+
+URL = "https://www.saraswatbank.com/locator.aspx?id=LocateUs"
+OUTPUT_FILE = 'sarswat_branches.csv'
+CSV_HEADER = ['State', 'City', 'Area', 'Address']
+
+# Per-state part files with a log of completed (city, area) keys; merged into OUTPUT_FILE at the end
+CRAWL = CheckpointedCrawl(OUTPUT_FILE, CSV_HEADER, delimiter='@')
+
+# Number of Chrome instances crawling states in parallel
+WORKERS = 4
+
+
+def create_driver():
+    # Lean headless Chrome with images/fonts/analytics blocked and a warm per-worker profile
+    return create_chrome_driver(profile='saraswat_bank')
+
+
+def open_locator(driver):
+    """Loads the locator page and returns a WebDriverWait for it."""
+    driver.get(URL)
+
+    # Track the UpdatePanel postbacks so each dropdown waits for its own refresh instead of sleeping
+    install_ajax_tracker(driver)
+
+    # Wait for page to load
+    wait = WebDriverWait(driver, 20, poll_frequency=0.1)
+
+    # Wait for state dropdown to load
+    wait.until(EC.presence_of_element_located((By.ID, "ddlState")))
+    return wait
+
+
+def choose_and_list(driver, dropdown_id, value, dependent_id):
+    """
+    Selects `value` in one dropdown (value set + change event, which fires the
+    AutoPostBack) and returns the repopulated dependent dropdown's options,
+    without the "Select ..." placeholder.
+    """
+    return choose(driver, f"#{dropdown_id}", value, dependent=f"#{dependent_id}",
+                  timeout=20, skip_placeholder=False)[1:]
+
+
+def extract_address(branch_details):
+    """Extracts the address from the branch details panel, trying 4 methods in turn."""
+    address = "N/A"
+
+    # Method 1: Try to find address element by XPath
+    try:
+        address_element = branch_details.find_element(By.XPATH, ".//li[span[text()='Address']]")
+        address = address_element.text.replace("Address", "").strip()
+        if address:
+            print(f"Found address (method 1): {address}")
+    except:
+        pass
+
+    # Method 2: If method 1 failed, try to find by CSS selector
+    if address == "N/A":
+        try:
+            address_element = branch_details.find_element(By.CSS_SELECTOR, "li:has(span:contains('Address'))")
+            # Get the text of the li element and remove the span part
+            address = address_element.text.replace("Address", "").strip()
+            if address:
+                print(f"Found address (method 2): {address}")
+        except:
+            pass
+
+    # Method 3: If methods 1 and 2 failed, try to extract from the entire HTML
+    if address == "N/A":
+        try:
+            # Get the HTML of the branch details
+            branch_html = branch_details.get_attribute('innerHTML')
+
+            # Use regex to extract address
+            address_match = re.search(r'<li>\s*<span>Address</span>(.*?)</li>', branch_html, re.DOTALL)
+            if address_match:
+                address = address_match.group(1).strip()
+                # Remove any HTML tags
+                address = re.sub(r'<[^>]+>', '', address)
+                if address:
+                    print(f"Found address (method 3): {address}")
+        except:
+            pass
+
+    # Method 4: If all else failed, try to find any list item containing "Address"
+    if address == "N/A":
+        try:
+            list_items = branch_details.find_elements(By.TAG_NAME, "li")
+            for item in list_items:
+                if "Address" in item.text:
+                    # Split by "Address" and take the second part
+                    parts = item.text.split("Address", 1)
+                    if len(parts) > 1:
+                        address = parts[1].strip()
+                        if address:
+                            print(f"Found address (method 4): {address}")
+                            break
+        except:
+            pass
+
+    # If we still don't have an address, get the entire text of branch_details
+    if address == "N/A":
+        print(f"Branch details text: {branch_details.text}")
+        print(f"Branch details HTML: {branch_details.get_attribute('innerHTML')}")
+
+    return address
+
+
+def list_states(driver):
+    """Returns (value, name) for every state in the dropdown (excluding "Select State")."""
+    open_locator(driver)
+    return [(option["value"], option["text"]) for option in select_options(driver, "#ddlState")[1:]]
+
+
+def scrape_area(driver, wait, state_name, city_name, area_option):
+    """Selects one area, submits the form and returns its row, or None if no details loaded."""
+    area_name = area_option["text"]
+    print(f"Processing area: {area_name}")
+
+    # Select area
+    choose(driver, "#ddlArea", area_option["value"])
+    wait.until(ajax_idle())
+
+    # Click submit button
+    submit_button = driver.find_element(By.CSS_SELECTOR, "input[type='button'][value='Submit']")
+    completed_before = ajax_count(driver)
+    driver.execute_script("arguments[0].click();", submit_button)
+
+    # Wait for branch details to appear and stabilize
+    try:
+        # First, wait for the branch details element to be present
+        branch_details = wait.until(
+            EC.presence_of_element_located((By.ID, "branchDetails"))
+        )
+
+        # Then wait for it to be visible (not hidden)
+        wait.until(
+            EC.visibility_of_element_located((By.ID, "branchDetails"))
+        )
+
+        # Wait for the submit request, then for the content to stop changing,
+        # instead of a fixed delay
+        try:
+            wait.until(ajax_completed(None, completed_before))
+        except TimeoutException:
+            pass
+        wait.until(text_stabilized((By.ID, "branchDetails"), quiet_period=0.3, allow_empty=True))
+
+        # Check if the branch details section has content
+        if branch_details.text.strip() == "":
+            print(f"No branch details content for {state_name}, {city_name}, {area_name}")
+            address = "N/A"
+        else:
+            # Read all "<li><span>Label</span> value</li>" pairs in one round-trip;
+            # fall back to the element-by-element methods only if that finds nothing
+            address = (labelled_values(driver, "#branchDetails") or {}).get("Address")
+            if address:
+                print(f"Found address (batched): {address}")
+            else:
+                address = extract_address(branch_details)
+
+        print(f"Scraped: {state_name}, {city_name}, {area_name}, {address}")
+        row = [state_name, city_name, area_name, address]
+
+    except Exception as e:
+        print(f"No branch details found for {state_name}, {city_name}, {area_name}: {str(e)}")
+        return None
+
+    # Reset area dropdown for next iteration
+    choose(driver, "#ddlArea", "-1")
+    wait.until(ajax_idle())
+
+    # Clear branch details to avoid mixing data
+    driver.execute_script("document.getElementById('branchDetails').innerHTML = '';")
+    return row
+
+
+def scrape_state(driver, state):
+    """
+    Scrapes every city and area of one state into its checkpointed part file.
+    Runs inside a browser pool worker and returns the number of rows written.
+
+    Each area is recorded as done once its row is on disk, and each city once all of
+    its areas are, so a rerun after a crash skips straight to the first unfinished area.
+    """
+    state_value, state_name = state
+    with CRAWL.part(state_name) as writer:
+        if writer.is_done():
+            print(f"State already complete: {state_name}")
+            return writer.rows_written
+
+        wait = open_locator(driver)
+        print(f"Processing state: {state_name}")
+
+        # Select state and read the city list it loads
+        city_options = choose_and_list(driver, "ddlState", state_value, "ddlCity")
+        print(f"Found {len(city_options)} cities in {state_name}")
+
+        for city_option in city_options:
+            city_name = city_option["text"]
+            if writer.is_done(city_name):
+                continue
+            print(f"Processing city: {city_name}")
+
+            # Select city and read the area list it loads
+            area_options = choose_and_list(driver, "ddlCity", city_option["value"], "ddlArea")
+            print(f"Found {len(area_options)} areas in {city_name}")
+
+            for area_option in area_options:
+                if writer.is_done(city_name, area_option["text"]):
+                    continue
+                row = scrape_area(driver, wait, state_name, city_name, area_option)
+                if row is not None:
+                    writer.write((city_name, area_option["text"]), [row])
+
+            # Reset city dropdown for next iteration
+            choose(driver, "#ddlCity", "-1")
+            wait.until(ajax_idle())
+
+            # Areas that failed stay open, so the city is retried on the next run
+            if all(writer.is_done(city_name, area_option["text"]) for area_option in area_options):
+                writer.mark_done(city_name)
+
+        if all(writer.is_done(city_option["text"]) for city_option in city_options):
+            writer.mark_done()
+        return writer.rows_written
+
+
+def scrape_with_browsers():
+    """Crawls every state in the browser pool; returns (states, names of states not finished)."""
+    # Read the state list with one short-lived browser
+    driver = create_driver()
+    try:
+        states = list_states(driver)
+    finally:
+        driver.quit()
+    print(f"Found {len(states)} states")
+
+    # Crawl states in parallel, one browser per worker; each state checkpoints to its own part
+    results = BrowserPool(create_driver, workers=WORKERS).run(scrape_state, states)
+    failed = []
+    for (_, state_name), rows, error in results:
+        if rows is None:
+            print(f"State {state_name} failed: {error}")
+            failed.append(state_name)
+            continue
+        # A state with areas that found no details is kept for the next run as well
+        with CRAWL.part(state_name) as writer:
+            if not writer.is_done():
+                print(f"State {state_name} incomplete")
+                failed.append(state_name)
+    return states, failed
+
+
+def main():
+    states, failed = scrape_with_browsers()
+
+    # Merge the parts in dropdown order; parts are kept for a resume if any state is unfinished
+    CRAWL.merge([state_name for _, state_name in states], failed)
+    print(f"Scraping completed. Data saved to {OUTPUT_FILE}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,127 +1,389 @@
+"""
+TVS Credit branch scraper: one entry point that uses the fastest path that works.
 
-import time
+The branch locator page only uses the browser to fire two WordPress
+admin-ajax.php POSTs (get_state_value -> cities, get_branch_locators ->
+branches), so the browser is only needed when those calls stop working.
+
+The process is as follows:
+1. Read the state list from the locator page (hardcoded list as a fallback).
+2. API path: fetch every state's cities and every city's branches with
+   concurrent POSTs over one pooled keep-alive session.
+3. Browser path: states whose API calls failed (or returned nothing) are
+   scraped again through the dropdowns, one Chrome per worker.
+4. Write all branches in state order, plus the per-state timings and the path
+   each state took.
+
+Set MODE to 'api' or 'browser' to force one path.
+"""
+
+import concurrent.futures
 import csv
-from selenium import webdriver
+import os
+import re
+import sys
+import time
+import timeit
+from itertools import zip_longest
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from selenium.webdriver.chrome.service import Service as ChromeService
-from webdriver_manager.chrome import ChromeDriverManager
 
-def main():
-    # Setup headless Chrome
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    
-    driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=chrome_options)
-    
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from ajax_replay import RecordedRequest, ReplaySession
+from browser_pool import BrowserPool
+from dom_batch import extract_fields
+from driver_factory import create_chrome_driver
+from dropdowns import choose
+from selenium_waits import install_ajax_tracker, ajax_count, ajax_completed, wait_for
+
+URL = "https://www.tvscredit.com/branch-locator/"
+AJAX_URL = "https://www.tvscredit.com/wp-admin/admin-ajax.php"
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Safari/537.36"
+
+OUTPUT_FILE = 'tvs_credit_branches.csv'
+TIMINGS_FILE = 'tvs_credit_timings.csv'
+CSV_HEADER = ["State", "City", "Address", "Latitude", "Longitude", "Google_Maps_URL"]
+
+# 'auto': API first, browser only for the states where the API failed
+# 'api' / 'browser': force one path
+MODE = 'auto'
+
+# Concurrent states, and concurrent get_branch_locators calls shared by all states
+STATE_WORKERS = 4
+API_WORKERS = 8
+# Number of Chrome instances for the browser fallback
+BROWSER_WORKERS = 2
+
+# Fallback list of states from the website's HTML, used if the page cannot be read
+STATES = [
+    "Andhra Pradesh", "Assam", "Bihar", "Chhattisgarh", "Delhi", "Goa",
+    "Gujarat", "Haryana", "Jharkhand", "Karnataka", "Kerala",
+    "Madhya Pradesh", "Maharashtra", "Odisha", "Pondicherry", "Punjab",
+    "Rajasthan", "Tamil Nadu", "Telangana", "Uttar Pradesh",
+    "Uttarakhand", "West Bengal"
+]
+
+STATE_SELECT_PATTERN = re.compile(r'<select[^>]*id=["\']state["\'][^>]*>(.*?)</select>', re.DOTALL)
+OPTION_VALUE_PATTERN = re.compile(r'value="([^"]*)"')
+# A get_branch_locators fragment holds the address paragraph and the directions link.
+ADDRESS_PATTERN = re.compile(r"<p><i class='fas fa-map-marker-alt'></i>(.*?)</p>")
+HREF_PATTERN = re.compile(r"href='(.*?)'")
+
+
+def create_session():
+    """A pooled keep-alive session for the admin-ajax.php endpoint, with retries."""
+    endpoint = RecordedRequest(AJAX_URL, 'POST', headers={
+        'User-Agent': USER_AGENT,
+        'X-Requested-With': 'XMLHttpRequest',
+        'Referer': URL,
+    })
+    return ReplaySession(endpoint, pool_size=STATE_WORKERS + API_WORKERS)
+
+
+def list_states(session):
+    """Reads the state dropdown from the locator page (this also picks up the site's cookies)."""
+    try:
+        response = session.session.get(URL, timeout=session.timeout)
+        response.raise_for_status()
+        match = STATE_SELECT_PATTERN.search(response.text)
+        states = [state for state in OPTION_VALUE_PATTERN.findall(match.group(1)) if state] if match else []
+    except Exception as e:
+        print(f"Could not read the state list from {URL}: {e}")
+        states = []
+    if not states:
+        print("Using the built-in state list.")
+        return list(STATES)
+    return states
+
+
+def parse_coordinates(directions_link):
+    """Latitude and longitude from a maps.google.com "Get Directions" link."""
+    lat, lon = "N/A", "N/A"
+    if directions_link and "maps.google.com" in directions_link and '?' in directions_link:
+        query_params = directions_link.split('?')[1]
+        for param in query_params.split('&'):
+            if 'q=' in param:
+                coords = param.replace('q=', '').split(',')
+                if len(coords) == 2:
+                    lat, lon = coords[0], coords[1]
+                break
+    return lat, lon
+
+
+# --- API PATH ---
+
+def get_cities_for_state(session, state):
+    """Fetches the list of cities for a given state."""
+    response = session.send(action="get_state_value", state=state)
+    return [city for city in OPTION_VALUE_PATTERN.findall(response.text) if city]
+
+
+def get_branches_for_city(session, state, city):
+    """Fetches and parses the branches of a given state and city."""
+    branch_data = session.send(action="get_branch_locators", state=state, city=city).json()
+    return parse_branch_locators(state, city, branch_data)
+
+
+def parse_branch_fragment(address_html):
+    """
+    (address, Google Maps URL) from one address fragment: the first address paragraph and
+    the first href anywhere in the fragment, as the original per-item regexes read them.
+    """
+    address_html = address_html or ''
+    address_match = ADDRESS_PATTERN.search(address_html)
+    url_match = HREF_PATTERN.search(address_html)
+    return (address_match.group(1).strip() if address_match else "N/A",
+            url_match.group(1) if url_match else "N/A")
+
+
+def parse_branch_locators(state, city, branch_data):
+    """
+    Rows from a get_branch_locators payload: parallel 'address' (HTML fragments) and
+    'markers' ({lat, lng}) lists.
+
+    Reasoning: The two lists are paired with zip_longest instead of indexing markers[i],
+    so a payload with fewer markers than addresses (or the reverse) keeps every branch
+    with N/A for the missing half instead of raising IndexError and losing the city.
+    """
+    if not isinstance(branch_data, dict):
+        return []
+    addresses = branch_data.get('address') or []
+    markers = branch_data.get('markers') or []
+    if len(addresses) != len(markers):
+        print(f"    {city}, {state}: {len(addresses)} addresses but {len(markers)} markers")
+
+    rows = []
+    for address_html, marker in zip_longest(addresses, markers):
+        address, google_maps_url = parse_branch_fragment(address_html)
+        marker = marker if isinstance(marker, dict) else {}
+        rows.append([state, city, address, marker.get('lat', "N/A"), marker.get('lng', "N/A"), google_maps_url])
+    return rows
+
+
+def scrape_state_api(session, city_executor, state):
+    """
+    All branches of one state over the API. Raises if any call fails, so the whole
+    state can be retried in the browser instead of being saved half-complete.
+    """
+    cities = get_cities_for_state(session, state)
+    if not cities:
+        raise ValueError("no cities returned")
+
+    # Reasoning: Cities go to an executor shared by all states, so a state with many
+    # cities does not hold the run back while the other states' workers sit idle.
+    futures = [city_executor.submit(get_branches_for_city, session, state, city) for city in cities]
+    rows = []
+    for future in futures:
+        rows.extend(future.result())
+    return rows
+
+
+def scrape_with_api(states):
+    """Returns {state: (rows, error, seconds)}; rows is None for states that failed."""
+    session = create_session()
+    results = {}
+
     try:
-        url = "https://www.tvscredit.com/branch-locator/"
-        print(f"Navigating to {url}")
-        driver.get(url)
-
-        # Wait for the state dropdown to be populated
-        WebDriverWait(driver, 60).until(
-            EC.presence_of_element_located((By.ID, "state")))
-        
-        state_dropdown = Select(driver.find_element(By.ID, "state"))
-        # Get all state options except the first one which is a placeholder
-        state_options = [option.get_attribute('value') for option in state_dropdown.options if option.get_attribute('value')]
-
-        print(f"Found {len(state_options)} states to scrape.")
-        
-        all_branches = []
-        
-        for state_value in state_options:
-            try:
-                # Re-locate the dropdowns in each iteration to avoid stale element reference
-                state_dropdown = Select(driver.find_element(By.ID, "state"))
-                state_dropdown.select_by_value(state_value)
-                print(f"\nScraping state: {state_value}")
-
-                # Wait for the city dropdown to be populated for the selected state
-                time.sleep(2) # A small static wait can be helpful here
-
-                city_dropdown = Select(driver.find_element(By.ID, "city"))
-                city_options = [option.get_attribute('value') for option in city_dropdown.options if option.get_attribute('value')]
-
-                if not city_options:
-                    print(f"  No cities found for {state_value}.")
-                    continue
-
-                for city_value in city_options:
-                    try:
-                        city_dropdown = Select(driver.find_element(By.ID, "city"))
-                        city_dropdown.select_by_value(city_value)
-                        print(f"  - Scraping city: {city_value}")
-
-                        # Trigger the search/filter
-                        driver.find_element(By.ID, "branch-search").click()
-                        
-                        # Wait for the branch details to appear
-                        time.sleep(2)
-
-                        # Find all branch cards
-                        branch_cards = driver.find_elements(By.CLASS_NAME, "branch-info")
-                        if not branch_cards:
-                            print("    No branch info cards found for this city.")
-                            continue
-                            
-                        for card in branch_cards:
-                            try:
-                                address = card.find_element(By.TAG_NAME, "p").text.strip()
-                                # The "Get Directions" link contains the coordinates
-                                directions_link = card.find_element(By.TAG_NAME, "a").get_attribute('href')
-                                
-                                lat, lon = "N/A", "N/A"
-                                if directions_link and "maps.google.com" in directions_link:
-                                    # Extract lat/lon from the google maps link
-                                    query_params = directions_link.split('?')[1]
-                                    for param in query_params.split('&'):
-                                        if 'q=' in param:
-                                            coords = param.replace('q=', '').split(',')
-                                            if len(coords) == 2:
-                                                lat, lon = coords[0], coords[1]
-                                            break
-                                
-                                all_branches.append({
-                                    "State": state_value,
-                                    "City": city_value,
-                                    "Address": address,
-                                    "Latitude": lat,
-                                    "Longitude": lon,
-                                    "Google_Maps_URL": directions_link
-                                })
-                            except NoSuchElementException:
-                                print("    Could not extract details from a branch card.")
-                                continue
-
-                    except (NoSuchElementException, TimeoutException) as e:
-                        print(f"    Could not process city {city_value}. Error: {e}")
-                        continue
-            
-            except (NoSuchElementException, TimeoutException) as e:
-                print(f"  Could not process state {state_value}. Error: {e}")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=API_WORKERS) as city_executor, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=STATE_WORKERS) as state_executor:
+
+            def run_state(state):
+                started = time.time()
+                try:
+                    rows = scrape_state_api(session, city_executor, state)
+                    return rows, None, time.time() - started
+                except Exception as e:
+                    return None, str(e), time.time() - started
+
+            for state, (rows, error, seconds) in zip(states, state_executor.map(run_state, states)):
+                results[state] = (rows, error, seconds)
+                status = f"{len(rows)} branches" if rows is not None else f"FAILED ({error})"
+                print(f"  [api] {state}: {status} in {seconds:.1f}s")
+    finally:
+        session.close()
+    return results
+
+
+# --- BROWSER PATH ---
+
+def create_driver():
+    # Lean headless Chrome (images, fonts and analytics blocked)
+    return create_chrome_driver(user_agent=USER_AGENT, profile='tvs_credit')
+
+
+def scrape_state_browser(driver, state):
+    """All branches of one state through the dropdowns (runs inside a browser pool worker)."""
+    driver.get(URL)
+    WebDriverWait(driver, 60).until(EC.presence_of_element_located((By.ID, "state")))
+
+    # Track admin-ajax.php calls so each step waits for its own response instead of sleeping
+    install_ajax_tracker(driver)
+
+    cities = choose(driver, "#state", state, dependent="#city", ajax_url_fragment='admin-ajax.php')
+    if not cities:
+        print(f"  No cities found for {state}.")
+        return []
+
+    rows = []
+    for city in cities:
+        city_value = city['value']
+        try:
+            choose(driver, "#city", city_value)
+
+            completed_before = ajax_count(driver, 'admin-ajax.php')
+            driver.find_element(By.ID, "branch-search").click()
+            # Wait for this search's get_branch_locators response
+            wait_for(driver, ajax_completed('admin-ajax.php', completed_before), timeout=15)
+        except (TimeoutException, NoSuchElementException) as e:
+            # One slow or broken city should not cost the rest of the state
+            print(f"    Skipping {city_value}, {state}: {type(e).__name__}")
+            continue
+
+        # Read every card's address and directions link in one round-trip
+        for card in extract_fields(driver, ".branch-info", {"address": "p", "directions_link": ("a", "href")}):
+            if card["address"] is None or card["directions_link"] is None:
+                print(f"    Could not extract details from a branch card in {city_value}.")
                 continue
+            lat, lon = parse_coordinates(card["directions_link"])
+            rows.append([state, city_value, card["address"], lat, lon, card["directions_link"]])
+    return rows
+
+
+def scrape_with_browsers(states):
+    """Returns {state: (rows, error, seconds)}; rows is None for states that failed."""
+    pool = BrowserPool(create_driver, workers=BROWSER_WORKERS)
+    results = pool.run(scrape_state_browser, states)
+    return {
+        state: (rows, error, seconds)
+        for (state, rows, error), seconds in zip(results, pool.timings)
+    }
+
+
+# --- PARSER BENCHMARK ---
+
+def legacy_parse_branch_locators(state, city, branch_data):
+    """The previous parser (two uncompiled regexes per fragment, markers[i] indexing), for comparison."""
+    rows = []
+    if branch_data and 'markers' in branch_data:
+        for i, address_html in enumerate(branch_data.get('address', [])):
+            marker = branch_data['markers'][i]
+            address_match = re.search(r"<p><i class='fas fa-map-marker-alt'></i>(.*?)</p>", address_html)
+            address = address_match.group(1).strip() if address_match else "N/A"
+            url_match = re.search(r"href='(.*?)'", address_html)
+            google_maps_url = url_match.group(1) if url_match else "N/A"
+            rows.append([state, city, address, marker.get('lat'), marker.get('lng'), google_maps_url])
+    return rows
 
-        # Save to CSV
-        csv_file = 'tvs_credit_branches.csv'
-        csv_headers = ["State", "City", "Address", "Latitude", "Longitude", "Google_Maps_URL"]
-        print(f"\nWriting {len(all_branches)} branches to {csv_file}...")
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=csv_headers)
-            writer.writeheader()
-            writer.writerows(all_branches)
-        print("Scraping complete.")
 
+def benchmark_parsers(fragments=5000, repeat=5):
+    """Times both parsers on a synthetic get_branch_locators payload of `fragments` branches."""
+    # Every tenth card also has a phone link before its address, which both parsers must
+    # return as the URL (the first href in the fragment).
+    branch_data = {
+        'address': [
+            "<div class='branch-info'>%s<h4>Branch %d</h4><p><i class='fas fa-map-marker-alt'></i> TVS CREDIT "
+            "SERVICES LIMITED, No. %d, Main Road, Near Bus Stand, Anantapur, Andhra Pradesh-515004 </p>"
+            "<a href='https://maps.google.com/?q=14.68%d,77.60%d' target='_blank'>Get Directions</a></div>"
+            % ("<a href='tel:0800%d'>Call</a>" % i if i % 10 == 0 else "", i, i, i, i)
+            for i in range(fragments)
+        ],
+        'markers': [{'lat': f"14.68{i}", 'lng': f"77.60{i}"} for i in range(fragments)],
+    }
+    if legacy_parse_branch_locators('S', 'C', branch_data) != parse_branch_locators('S', 'C', branch_data):
+        raise AssertionError("Parsers disagree on the benchmark payload")
+
+    print(f"Parsing {fragments} address fragments (best of {repeat}):")
+    timings = {}
+    for name, parser in (('per-item regex', legacy_parse_branch_locators), ('precompiled', parse_branch_locators)):
+        timings[name] = min(timeit.repeat(lambda: parser('S', 'C', branch_data), number=1, repeat=repeat))
+        print(f"  {name:<15} {timings[name] * 1000:8.1f} ms")
+    print(f"  speed-up        {timings['per-item regex'] / timings['precompiled']:8.2f}x")
+
+    # Mismatched lists: the old parser loses the whole city, the new one keeps every branch.
+    short_markers = dict(branch_data, markers=branch_data['markers'][:-1])
+    try:
+        legacy_parse_branch_locators('S', 'C', short_markers)
+        print("  per-item regex handled mismatched lists")
+    except IndexError:
+        print("  per-item regex raised IndexError on mismatched lists")
+    print(f"  precompiled kept {len(parse_branch_locators('S', 'C', short_markers))} rows on mismatched lists")
+
+
+# --- OUTPUT ---
+
+def save_results(states, results):
+    """Writes the branches in state order and the per-state timings; returns the branch count."""
+    written = 0
+    with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter='@')
+        writer.writerow(CSV_HEADER)
+        for state in states:
+            rows = results[state]['rows']
+            if rows:
+                writer.writerows(rows)
+                written += len(rows)
+
+    with open(TIMINGS_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["State", "Path", "Seconds", "Branches", "Error"])
+        for state in states:
+            result = results[state]
+            rows = result['rows']
+            writer.writerow([state, result['path'], f"{result['seconds']:.2f}",
+                             len(rows) if rows is not None else '', result['error'] or ''])
+    return written
+
+
+def main():
+    start_time = time.time()
+    print("Starting TVS Credit scraper...")
+
+    session = create_session()
+    try:
+        states = list_states(session)
     finally:
-        print("Closing browser.")
-        driver.quit()
+        session.close()
+    print(f"Found {len(states)} states.")
+
+    # --- 1. API PATH ---
+    results = {}
+    pending = list(states)
+    if MODE in ('auto', 'api'):
+        print("\nFetching branches over the API...")
+        for state, (rows, error, seconds) in scrape_with_api(states).items():
+            results[state] = {'path': 'api', 'rows': rows, 'error': error, 'seconds': seconds}
+        pending = [state for state in states if results[state]['rows'] is None]
+
+    # --- 2. BROWSER FALLBACK ---
+    if pending and MODE in ('auto', 'browser'):
+        print(f"\nScraping {len(pending)} state(s) in the browser: {', '.join(pending)}")
+        for state, (rows, error, seconds) in scrape_with_browsers(pending).items():
+            # Reasoning: Keep the API time too, so the timings show what the fallback cost.
+            api_seconds = results[state]['seconds'] if state in results else 0
+            results[state] = {'path': 'browser', 'rows': rows, 'error': error, 'seconds': api_seconds + seconds}
+
+    # --- 3. SAVE ---
+    written = save_results(states, results)
+
+    print("\nPer-state timings:")
+    for state in states:
+        result = results[state]
+        status = f"{len(result['rows'])} branches" if result['rows'] is not None else "FAILED"
+        print(f"  {state:<20} {result['path']:<8} {result['seconds']:>7.1f}s  {status}")
+    failed = [state for state in states if results[state]['rows'] is None]
+    if failed:
+        print(f"Failed states: {', '.join(failed)}")
+
+    print(f"\nWrote {written} branches to {OUTPUT_FILE} and timings to {TIMINGS_FILE} "
+          f"in {time.time() - start_time:.1f} seconds.")
+
 
 if __name__ == "__main__":
-    main()
+    if '--benchmark' in sys.argv:
+        benchmark_parsers()
+    else:
+        main()
@@ -1,26 +1,12 @@
-import requests
+# Explore the branch details endpoint: prints the raw JSON for one branch ID.
+# Uses the same session, headers and URL as extract_aavas_data.py.
+import sys
 
-url = "https://www.aavas.in/branch-pin-code?id=380&type=state"
+from extract_aavas_data import create_aavas_session, fetch_branch
 
-payload = {}
-headers = {
-  'accept': 'application/json, text/javascript, */*; q=0.01',
-  'accept-language': 'en-GB,en-US;q=0.9,en;q=0.8',
-  'cache-control': 'no-cache',
-  'pragma': 'no-cache',
-  'priority': 'u=1, i',
-  'sec-ch-ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
-  'sec-ch-ua-mobile': '?1',
-  'sec-ch-ua-platform': '"Android"',
-  'sec-fetch-dest': 'empty',
-  'sec-fetch-mode': 'cors',
-  'sec-fetch-site': 'same-origin',
-  'user-agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
-  'x-requested-with': 'XMLHttpRequest',
-  # NOTE: Obtain fresh PHPSESSID and csrfToken by visiting https://www.aavas.in/branch-locator
-  'Cookie': 'PHPSESSID=YOUR_SESSION_ID; csrfToken=YOUR_CSRF_TOKEN'
-}
+branch_id = sys.argv[1] if len(sys.argv) > 1 else "380"
 
-response = requests.request("GET", url, headers=headers, data=payload)
+with create_aavas_session() as session:
+    response = fetch_branch(session, branch_id)
 
 print(response.text)
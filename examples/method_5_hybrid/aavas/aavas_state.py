@@ -1,32 +1,15 @@
-import requests
+# Explore the branches-by-state endpoint: prints the raw JSON for one state.
+# Uses the same session, headers and URL as extract_aavas_data.py.
+import sys
 
-url = "https://www.aavas.in/ajax-branch-by-state?id=CHHATTISGARH"
+from extract_aavas_data import STATES, create_aavas_session, fetch_state
 
-payload = {}
-headers = {
-  'accept': 'application/json, text/javascript, */*; q=0.01',
-  'accept-language': 'en-GB,en-US;q=0.9,en;q=0.8',
-  'cache-control': 'no-cache',
-  'pragma': 'no-cache',
-  'priority': 'u=1, i',
-  'sec-ch-ua': '"Not;A=Brand";v="99", "Google Chrome";v="139", "Chromium";v="139"',
-  'sec-ch-ua-mobile': '?1',
-  'sec-ch-ua-platform': '"Android"',
-  'sec-fetch-dest': 'empty',
-  'sec-fetch-mode': 'cors',
-  'sec-fetch-site': 'same-origin',
-  'user-agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
-  'x-requested-with': 'XMLHttpRequest',
-  # NOTE: Obtain fresh PHPSESSID and csrfToken by visiting https://www.aavas.in/branch-locator
-  'Cookie': 'PHPSESSID=YOUR_SESSION_ID; csrfToken=YOUR_CSRF_TOKEN'
-}
+state = sys.argv[1] if len(sys.argv) > 1 else "CHHATTISGARH"
 
-response = requests.request("GET", url, headers=headers, data=payload)
+with create_aavas_session() as session:
+    response = fetch_state(session, state.replace(' ', '%20'))
 
 print(response.text)
 
-states = [
-"CHHATTISGARH", "DELHI", "GUJARAT", "HARYANA", "HIMACHAL%20PRADESH",
-"KARNATAKA", "MADHYA%20PRADESH", "MAHARASHTRA", "ODISHA", "PUNJAB",
-"RAJASTHAN", "TAMIL%20NADU", "UTTAR%20PRADESH", "UTTARAKHAND"
-]
\ No newline at end of file
+print("\nStates used by extract_aavas_data.py:")
+print(STATES)
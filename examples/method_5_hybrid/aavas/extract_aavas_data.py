@@ -1,66 +1,90 @@
+import os
+import sys
 
-import requests
-import csv
-import json
+# Shared scraping helpers live in pipeline/scraping/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'pipeline', 'scraping'))
+from api_crawl import run_crawl
+from session_manager import SessionManager
 
-def extract_aavas_data():
-    states = [
-        "CHHATTISGARH", "DELHI", "GUJARAT", "HARYANA", "HIMACHAL%20PRADESH",
-        "KARNATAKA", "MADHYA%20PRADESH", "MAHARASHTRA", "ODISHA", "PUNJAB",
-        "RAJASTHAN", "TAMIL%20NADU", "UTTAR%20PRADESH", "UTTARAKHAND"
-    ]
+LANDING_URL = "https://www.aavas.in/branch-locator"
+STATE_URL = "https://www.aavas.in/ajax-branch-by-state?id={state}"
+BRANCH_URL = "https://www.aavas.in/branch-pin-code?id={branch_id}&type=state"
+
+STATES = [
+    "CHHATTISGARH", "DELHI", "GUJARAT", "HARYANA", "HIMACHAL%20PRADESH",
+    "KARNATAKA", "MADHYA%20PRADESH", "MAHARASHTRA", "ODISHA", "PUNJAB",
+    "RAJASTHAN", "TAMIL%20NADU", "UTTAR%20PRADESH", "UTTARAKHAND"
+]
 
-    headers = {
-        'accept': 'application/json, text/javascript, */*; q=0.01',
-        'accept-language': 'en-GB,en-US;q=0.9,en;q=0.8',
-        'user-agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
-        'x-requested-with': 'XMLHttpRequest',
-        # NOTE: Obtain fresh PHPSESSID and csrfToken by visiting https://www.aavas.in/branch-locator
-        'Cookie': 'PHPSESSID=YOUR_SESSION_ID; csrfToken=YOUR_CSRF_TOKEN'
-    }
+HEADERS = {
+    'accept': 'application/json, text/javascript, */*; q=0.01',
+    'accept-language': 'en-GB,en-US;q=0.9,en;q=0.8',
+    'user-agent': 'Mozilla/5.0 (Linux; Android 6.0; Nexus 5 Build/MRA58N) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/139.0.0.0 Mobile Safari/537.36',
+    'x-requested-with': 'XMLHttpRequest',
+    'referer': LANDING_URL,
+    # PHPSESSID and csrfToken come from LANDING_URL; SessionManager fetches and refreshes them
+}
 
-    all_branches_data = []
+# State and branch calls share one pool; a state's branch calls start as soon as it answers
+WORKERS = 16
 
-    for state in states:
-        print(f"Fetching branches for {state.replace('%20', ' ')}...")
-        try:
-            state_url = f"https://www.aavas.in/ajax-branch-by-state?id={state}"
-            response = requests.get(state_url, headers=headers)
-            response.raise_for_status()
-            branches_in_state = response.json()
+# Two-tier API: state -> branch IDs (ajax-branch-by-state), then branch ID -> details (branch-pin-code)
+SPEC = {
+    'name': 'Aavas',
+    'session': {'landing_url': LANDING_URL, 'headers': HEADERS},
+    'parents': [{'state': state} for state in STATES],
+    'steps': [
+        {
+            'url': STATE_URL,
+            'items': '',
+            'fields': {'branch_id': 'id'},
+            'require': ['branch_id'],
+        },
+        {
+            # The details call returns a list; an empty one means the API has no details for the branch
+            'url': BRANCH_URL,
+            'items': '0',
+            'fields': {
+                'state_name': 'state_name',
+                'branch_city': 'branch_city',
+                'branch_name': 'branch_name',
+                'branch_address': 'branch_address',
+                'latitude': 'latitude',
+                'longitude': 'longitude',
+            },
+        },
+    ],
+    'columns': {
+        'State': 'state_name',
+        'City': 'branch_city',
+        'Branch': 'branch_name',
+        'Address': 'branch_address',
+        'Latitude': 'latitude',
+        'Longitude': 'longitude',
+    },
+    'output': 'aavas_branches.csv',
+}
 
-            for branch_summary in branches_in_state:
-                branch_id = branch_summary.get('id')
-                if not branch_id:
-                    continue
+def create_aavas_session():
+    # The same bootstrapped session the crawl uses, for the exploration scripts
+    return SessionManager(LANDING_URL, HEADERS)
 
-                branch_url = f"https://www.aavas.in/branch-pin-code?id={branch_id}&type=state"
-                branch_response = requests.get(branch_url, headers=headers)
-                branch_response.raise_for_status()
-                branch_details_list = branch_response.json()
+def fetch_state(session, state):
+    """Raw response of the branches-by-state call (a list of branch summaries)."""
+    response = session.get(STATE_URL.format(state=state))
+    response.raise_for_status()
+    return response
 
-                if branch_details_list:
-                    branch_details = branch_details_list[0]
-                    all_branches_data.append([
-                        branch_details.get('state_name', 'NA'),
-                        branch_details.get('branch_city', 'NA'),
-                        branch_details.get('branch_name', 'NA'),
-                        branch_details.get('branch_address', 'NA'),
-                        branch_details.get('latitude', 'NA'),
-                        branch_details.get('longitude', 'NA')
-                    ])
-        except requests.exceptions.RequestException as e:
-            print(f"Could not fetch data for state {state}: {e}")
-        except json.JSONDecodeError as e:
-            print(f"Could not parse JSON for state {state}: {e}")
+def fetch_branch(session, branch_id):
+    """Raw response of the branch details call."""
+    response = session.get(BRANCH_URL.format(branch_id=branch_id))
+    response.raise_for_status()
+    return response
 
-    # Write to CSV
-    with open('aavas_branches.csv', 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['State', 'City', 'Branch', 'Address', 'Latitude', 'Longitude'])
-        writer.writerows(all_branches_data)
-    
-    print(f"\nSuccessfully extracted {len(all_branches_data)} branches to aavas_branches.csv")
+def extract_aavas_data():
+    # A failed state or branch is reported and skipped; the rest of the crawl is kept
+    written, _ = run_crawl(SPEC, workers=WORKERS)
+    print(f"\nSuccessfully extracted {written} branches to {SPEC['output']}")
 
 if __name__ == '__main__':
     extract_aavas_data()
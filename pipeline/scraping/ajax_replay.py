@@ -0,0 +1,129 @@
+"""
+"Discover once, replay over HTTP" for AJAX endpoints found with Selenium.
+
+Many locator pages only use the browser to fire WordPress `admin-ajax.php`
+POSTs (TVS Credit's direct API scraper shows the same calls work without a
+browser). Driving Chrome for every branch makes each row cost a full
+click -> request -> render cycle.
+
+The hybrid approach:
+1. Drive the page once in Selenium and capture one real request with
+   NetworkCapture (endpoint, method, form fields, headers).
+2. Copy the browser's cookies and User-Agent into a pooled requests.Session.
+3. Replay the same request for every other state/city/branch with only the
+   varying form field changed, over several threads.
+
+Usage:
+    capture = NetworkCapture(driver, 'admin-ajax.php')
+    response = capture.fetch(lambda: select.select_by_value(branch_value))
+    endpoint = RecordedRequest.from_capture(response, driver)
+    field = endpoint.field_with_value(branch_value)
+
+    session = ReplaySession(endpoint, pool_size=8)
+    results = replay_many(session, [{field: value} for value in branch_values], parse=lambda r: r.json())
+"""
+
+import concurrent.futures
+import time
+from urllib.parse import parse_qsl
+
+from http_session import create_session
+
+# Request headers that are tied to one request (or set by requests itself) and must not be replayed.
+SKIPPED_HEADERS = {'content-length', 'cookie', 'host', 'connection', 'accept-encoding'}
+
+
+class RecordedRequest:
+    """Everything needed to send a captured browser request again without the browser."""
+
+    def __init__(self, url, method='POST', form=None, headers=None, cookies=None):
+        self.url = url
+        self.method = method
+        self.form = dict(form or {})
+        self.headers = dict(headers or {})
+        self.cookies = list(cookies or [])
+
+    @classmethod
+    def from_capture(cls, response, driver):
+        """
+        Builds a RecordedRequest from a CapturedResponse and the driver that sent it.
+        The form fields are parsed from the request's url-encoded post data.
+        """
+        form = dict(parse_qsl(response.post_data or '', keep_blank_values=True))
+        headers = {
+            name: value for name, value in (response.request_headers or {}).items()
+            if name.lower() not in SKIPPED_HEADERS
+        }
+        # Reasoning: The performance log omits some headers Chrome adds later, so make
+        # sure the replay identifies as the same browser that earned the cookies.
+        if not any(name.lower() == 'user-agent' for name in headers):
+            headers['User-Agent'] = driver.execute_script("return navigator.userAgent;")
+        return cls(response.url, response.method or 'POST', form, headers, driver.get_cookies())
+
+    def field_with_value(self, value):
+        """Name of the form field that carried `value` (e.g. the selected branch), or None."""
+        for name, field_value in self.form.items():
+            if field_value == value:
+                return name
+        return None
+
+    def __repr__(self):
+        return f"RecordedRequest({self.method} {self.url} fields={sorted(self.form)})"
+
+
+class ReplaySession:
+    """A keep-alive requests.Session primed with a recorded request's headers and cookies."""
+
+    def __init__(self, recorded, pool_size=8, timeout=20, retries=2):
+        self.recorded = recorded
+        self.timeout = timeout
+        # Reasoning: One connection per worker thread, so concurrent replays reuse warm
+        # keep-alive connections instead of opening a new TLS session per branch.
+        self.session = create_session(recorded.headers, pool_size=pool_size, retries=retries)
+        for cookie in recorded.cookies:
+            self.session.cookies.set(cookie['name'], cookie['value'],
+                                     domain=cookie.get('domain'), path=cookie.get('path', '/'))
+
+    def send(self, **overrides):
+        """Sends the recorded request with some form fields replaced. Raises for HTTP errors."""
+        form = dict(self.recorded.form)
+        form.update(overrides)
+        if self.recorded.method.upper() == 'GET':
+            response = self.session.get(self.recorded.url, params=form, timeout=self.timeout)
+        else:
+            response = self.session.post(self.recorded.url, data=form, timeout=self.timeout)
+        response.raise_for_status()
+        return response
+
+    def close(self):
+        self.session.close()
+
+
+def replay_many(session, overrides_list, parse, workers=8):
+    """
+    Replays the recorded request once per dict in `overrides_list`, `workers` at a time.
+
+    Returns a list of (overrides, parsed, error) in input order; `parse(response)` turns
+    each response into the caller's data. A failing item only records its error.
+    """
+    overrides_list = list(overrides_list)
+    results = [None] * len(overrides_list)
+    start_time = time.time()
+
+    def replay(overrides):
+        return parse(session.send(**overrides))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        future_to_index = {
+            executor.submit(replay, overrides): i for i, overrides in enumerate(overrides_list)
+        }
+        for future in concurrent.futures.as_completed(future_to_index):
+            i = future_to_index[future]
+            try:
+                results[i] = (overrides_list[i], future.result(), None)
+            except Exception as e:
+                results[i] = (overrides_list[i], None, str(e))
+
+    failed = sum(1 for _, _, error in results if error)
+    print(f"Replayed {len(results)} requests in {time.time() - start_time:.1f} seconds ({failed} failed).")
+    return results
@@ -0,0 +1,254 @@
+"""
+Declarative crawl engine for direct-API branch locators.
+
+The direct-API scrapers all run the same loop: for every parent key (a state,
+a city), call a list endpoint, maybe call a detail endpoint per returned ID,
+then write one CSV row per result. This module runs that loop from a spec, so
+a new lender only describes its endpoints and fields and gets pooling,
+concurrency, retries, per-run caching and streaming output for free.
+
+A spec is a plain dict:
+
+    SPEC = {
+        'name': 'APAC Finance',
+        'session': {'headers': {...}, 'landing_url': 'https://...'},  # landing_url: optional cookie bootstrap
+        'parents': [{'state_id': '1', 'state': 'Maharashtra'}, ...],  # starting contexts
+        'steps': [
+            {
+                'url': 'https://apacfin.com/findBranch?id={state_id}',  # {name}: a context value
+                'items': '',                              # path to the list of results ('' = whole body)
+                'fields': {'branch_id': 'id', 'branch': 'branch'},  # context values taken from each item
+                'require': ['branch_id'],                 # skip items without these
+            },
+            {
+                'url': 'https://apacfin.com/findPincode?id={branch_id}',
+                'fields': {'address': 'branch_address'},  # no 'items': the body is one result
+            },
+        ],
+        'columns': {'State': 'state', 'Branch': 'branch', 'Address': 'address'},
+        'output': 'branches.csv',
+    }
+
+Step keys:
+    url      URL template; {name} is replaced with the context value `name`, any other
+             braces are kept as-is; values in `params` / `data` dicts are templated the same way
+    method   'GET' (default) or 'POST'
+    format   'json' (default) or 'text'
+    items    a path ('markers', 'data.0'), a compiled regex (findall on text), or a
+             callable(body) returning the list; omitted = the body is a single item
+    fields   {context_name: path or callable(item)}; paths are dot-separated keys and
+             list indexes, '' being the item itself
+    require  context names that must be non-empty for the item to be kept
+
+Each item of the last step becomes one row; `columns` maps CSV headers to context
+names or callables(context). Missing values are written as spec.get('missing', 'NA').
+
+The process is as follows:
+1. Every parent context is submitted to one thread pool as a step-0 request.
+2. When a request finishes, each item it returned becomes a child context
+   (parent values + fields) and is submitted as the next step's request
+   immediately, so slow parents never hold back fast ones.
+3. Children of the last step are buffered per parent and written to the CSV as
+   soon as that parent and every parent before it have finished, so the file is
+   in parent order (and item order within a parent) on every run.
+4. A failed request is reported with its context; the rest of the crawl continues.
+"""
+
+import collections
+import concurrent.futures
+import csv
+import json
+import re
+import threading
+import time
+
+from http_session import create_session
+from session_manager import SessionManager
+
+# A {name} field of a URL / params / data template
+TEMPLATE_FIELD = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+
+def get_path(value, path):
+    """Follows a dot-separated path of dict keys and list indexes; None if any part is missing."""
+    if callable(path):
+        return path(value)
+    if path in (None, ''):
+        return value
+    for part in str(path).split('.'):
+        if isinstance(value, dict):
+            value = value.get(part)
+        elif isinstance(value, (list, tuple)) and part.lstrip('-').isdigit():
+            index = int(part)
+            value = value[index] if -len(value) <= index < len(value) else None
+        else:
+            return None
+        if value is None:
+            return None
+    return value
+
+
+def _render(template, context):
+    """Fills the {name} fields of a template string, or of every string value of a dict template."""
+    if template is None:
+        return None
+    if isinstance(template, dict):
+        return {name: _render(value, context) for name, value in template.items()}
+    if isinstance(template, str):
+        # Reasoning: str.format() would also parse literal braces (a JSON body, a regex
+        # parameter) and raise, so only {name} fields naming a context value are substituted.
+        return TEMPLATE_FIELD.sub(
+            lambda match: str(context[match.group(1)]) if match.group(1) in context else match.group(0), template)
+    return template
+
+
+def _items(step, body):
+    if 'items' not in step:
+        # An empty detail response means "nothing here", not a row of missing values.
+        return [] if body in (None, '', {}, []) else [body]
+    spec = step['items']
+    if hasattr(spec, 'findall'):
+        return spec.findall(body if isinstance(body, str) else json.dumps(body))
+    items = get_path(body, spec)
+    if items is None:
+        return []
+    return items if isinstance(items, list) else [items]
+
+
+class ApiCrawl:
+    """Runs one crawl spec. Use run_crawl(spec) unless you need the session or cache afterwards."""
+
+    def __init__(self, spec, workers=8, timeout=20, retries=2, cache_size=1024):
+        self.spec = spec
+        self.steps = spec['steps']
+        self.workers = workers
+        self.timeout = timeout
+        session_spec = spec.get('session', {})
+        headers = session_spec.get('headers')
+        if session_spec.get('landing_url'):
+            self.session = SessionManager(session_spec['landing_url'], headers, pool_size=workers,
+                                          timeout=timeout, retries=retries)
+        else:
+            self.session = create_session(headers, pool_size=workers, retries=retries)
+        # Per-run cache: the same request (e.g. a branch listed under two cities) is sent once.
+        # Repeats are usually close together, so the most recent `cache_size` bodies are kept.
+        self._cache = collections.OrderedDict()
+        self.cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self.requests_sent = 0
+        self.cache_hits = 0
+
+    def fetch(self, step, context):
+        method = step.get('method', 'GET').upper()
+        url = _render(step['url'], context)
+        params = _render(step.get('params'), context)
+        data = _render(step.get('data'), context)
+        key = (method, url, json.dumps(params, sort_keys=True), json.dumps(data, sort_keys=True))
+
+        with self._cache_lock:
+            if key in self._cache:
+                self.cache_hits += 1
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        response = self.session.request(method, url, params=params, data=data, timeout=self.timeout)
+        response.raise_for_status()
+        body = response.text if step.get('format', 'json') == 'text' else response.json()
+
+        with self._cache_lock:
+            self.requests_sent += 1
+            if self.cache_size:
+                self._cache[key] = body
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return body
+
+    def run_step(self, level, context):
+        """Runs one request and returns the child contexts of the items it returned."""
+        step = self.steps[level]
+        body = self.fetch(step, context)
+        children = []
+        for item in _items(step, body):
+            child = dict(context)
+            for name, path in step.get('fields', {}).items():
+                child[name] = get_path(item, path)
+            if all(child.get(name) not in (None, '') for name in step.get('require', ())):
+                children.append(child)
+        return children
+
+    def row(self, context):
+        missing = self.spec.get('missing', 'NA')
+        row = []
+        for source in self.spec['columns'].values():
+            value = source(context) if callable(source) else context.get(source)
+            row.append(missing if value is None else value)
+        return row
+
+    def run(self, output=None):
+        """Crawls every parent and streams rows to the output CSV. Returns (rows written, failures)."""
+        output = output or self.spec['output']
+        name = self.spec.get('name', output)
+        parents = self.spec['parents']
+        written = 0
+        failures = []
+        start_time = time.time()
+
+        # Per parent: requests still in flight, and finished rows keyed by their item path
+        pending = [0] * len(parents)
+        buffered = [[] for _ in parents]
+        next_parent = 0
+
+        try:
+            with open(output, 'w', newline='', encoding='utf-8') as f, \
+                    concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+                writer = csv.writer(f, delimiter=self.spec.get('delimiter', ','))
+                writer.writerow(list(self.spec['columns']))
+
+                future_to_task = {}
+
+                def submit(level, context, path):
+                    future = executor.submit(self.run_step, level, context)
+                    future_to_task[future] = (level, context, path)
+                    pending[path[0]] += 1
+
+                for i, parent in enumerate(parents):
+                    submit(0, dict(parent), (i,))
+
+                # Reasoning: Only this thread touches the CSV writer, so worker threads never
+                # contend for the file. Rows are held back only until every earlier parent is
+                # done, which keeps the output order identical from run to run.
+                while future_to_task:
+                    done, _ = concurrent.futures.wait(future_to_task, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        level, context, path = future_to_task.pop(future)
+                        pending[path[0]] -= 1
+                        try:
+                            children = future.result()
+                        except Exception as e:
+                            failures.append((level, context, str(e)))
+                            label = ', '.join(f"{k}={v}" for k, v in context.items() if not isinstance(v, (dict, list)))
+                            print(f"[{name}] Step {level + 1} failed for {label}: {e}")
+                            continue
+                        for j, child in enumerate(children):
+                            if level + 1 < len(self.steps):
+                                submit(level + 1, child, path + (j,))
+                            else:
+                                buffered[path[0]].append((path + (j,), self.row(child)))
+
+                    while next_parent < len(parents) and pending[next_parent] == 0:
+                        rows = sorted(buffered[next_parent], key=lambda item: item[0])
+                        writer.writerows(row for _, row in rows)
+                        written += len(rows)
+                        buffered[next_parent] = None
+                        next_parent += 1
+        finally:
+            self.session.close()
+
+        print(f"[{name}] Wrote {written} rows to {output} in {time.time() - start_time:.1f} seconds "
+              f"({self.requests_sent} requests, {self.cache_hits} cache hits, {len(failures)} failed).")
+        return written, failures
+
+
+def run_crawl(spec, workers=8, output=None, **options):
+    """Runs a crawl spec; returns (rows written, failures) where failures are (step, context, error)."""
+    return ApiCrawl(spec, workers=workers, **options).run(output)
@@ -0,0 +1,288 @@
+"""
+Parallel Selenium crawling with a pool of headless Chrome workers.
+
+Dropdown-driven sites (state -> city -> branch) are crawled one option at a
+time, and a single browser spends most of its time waiting on the server. The
+pool runs N worker processes, each with its own Chrome, and hands them
+independent partitions of the crawl (usually one state each).
+
+- Partitions are processed in parallel; results are returned (and written) in
+  partition order, so the output does not depend on which worker was fastest.
+- A worker restarts its browser when the Chrome process tree grows past
+  `memory_limit_mb`, or when scraping a partition raises (driver crash).
+- If a whole worker process dies (OOM kill, segfault), it is replaced and its
+  in-flight partition is queued again.
+
+Usage:
+    def create_driver(): ...                  # module-level, returns a WebDriver
+    def scrape_state(driver, state): ...      # module-level, returns a list of rows
+
+    if __name__ == "__main__":
+        pool = BrowserPool(create_driver, workers=4)
+        results = pool.run(scrape_state, states)
+        write_partitioned_csv('out.csv', header, results)
+
+Both callables must be defined at module level (they are sent to worker
+processes), and the script's own crawl must sit under `if __name__ == "__main__":`.
+"""
+
+import csv
+import multiprocessing
+import os
+import queue
+import time
+import traceback
+from collections import deque
+
+PAGE_SIZE_KB = (os.sysconf('SC_PAGE_SIZE') // 1024) if hasattr(os, 'sysconf') else 4
+
+
+def process_tree_rss_mb(root_pid):
+    """
+    Resident memory of a process and all its descendants, in MB, read from /proc.
+
+    Chromedriver starts Chrome, which starts renderer/GPU/utility processes; the
+    renderers are where memory grows. Returns None where /proc is not available.
+    """
+    if not os.path.isdir('/proc'):
+        return None
+
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # The command name may contain spaces, so split after its closing ')'.
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total_pages = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total_pages += int(f.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            pass
+        pending.extend(children.get(pid, ()))
+    return total_pages * PAGE_SIZE_KB / 1024
+
+
+def driver_memory_mb(driver):
+    """Memory of the chromedriver + Chrome process tree behind `driver`, or None if unknown."""
+    try:
+        return process_tree_rss_mb(driver.service.process.pid)
+    except AttributeError:
+        return None
+
+
+def quit_driver(driver):
+    if driver is None:
+        return
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _worker_main(worker_id, create_driver, scrape_partition, task_queue, result_queue,
+                 memory_limit_mb, max_retries):
+    driver = None
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            index, partition = task
+
+            rows, error = None, None
+            started = time.time()
+            for attempt in range(max_retries + 1):
+                try:
+                    if driver is None:
+                        driver = create_driver()
+                    rows = scrape_partition(driver, partition)
+                    error = None
+                    break
+                except Exception:
+                    error = traceback.format_exc(limit=3)
+                    print(f"[worker {worker_id}] Partition {partition!r} failed "
+                          f"(attempt {attempt + 1}/{max_retries + 1}); restarting browser.")
+                    quit_driver(driver)
+                    driver = None
+
+            result_queue.put((worker_id, index, rows, error, time.time() - started))
+
+            # Reasoning: Long crawls leak memory in the renderer. Restarting between
+            # partitions is cheap compared to the whole box swapping or OOM-killing Chrome.
+            if driver is not None and memory_limit_mb:
+                memory_mb = driver_memory_mb(driver)
+                if memory_mb is not None and memory_mb > memory_limit_mb:
+                    print(f"[worker {worker_id}] Browser using {memory_mb:.0f} MB "
+                          f"(limit {memory_limit_mb} MB); restarting it.")
+                    quit_driver(driver)
+                    driver = None
+    finally:
+        quit_driver(driver)
+
+
+class BrowserPool:
+    """Runs `scrape_partition(driver, partition)` over many partitions with N browsers in parallel."""
+
+    def __init__(self, create_driver, workers=4, memory_limit_mb=1500, max_retries=2,
+                 max_worker_restarts=None):
+        self.create_driver = create_driver
+        self.workers = workers
+        self.memory_limit_mb = memory_limit_mb
+        self.max_retries = max_retries
+        self.max_worker_restarts = max_worker_restarts if max_worker_restarts is not None else workers * 3
+        # Reasoning: 'spawn' gives each worker a clean interpreter. Forking a process
+        # that already holds WebDriver sockets and threads is not safe.
+        self._context = multiprocessing.get_context('spawn')
+        # Seconds each partition took in its worker (retries included), in partition order after run().
+        self.timings = []
+
+    def _start_worker(self, worker_id, scrape_partition, result_queue):
+        task_queue = self._context.Queue()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.create_driver, scrape_partition, task_queue, result_queue,
+                  self.memory_limit_mb, self.max_retries),
+            daemon=True,
+        )
+        process.start()
+        return process, task_queue
+
+    def run(self, scrape_partition, partitions):
+        """
+        Scrapes every partition and returns a list of (partition, rows, error) tuples
+        in the same order as `partitions`. `rows` is what scrape_partition returned (a
+        list of rows, or a row count for scrapers that write checkpointed output
+        themselves), or None when a partition failed. Afterwards `self.timings` holds
+        the seconds each partition took, in the same order.
+        """
+        partitions = list(partitions)
+        if not partitions:
+            return []
+
+        # Reasoning: Each worker gets its own task queue and the parent hands out one
+        # partition at a time, so the parent always knows which partition a worker was
+        # holding if that worker dies without reporting back.
+        pending = deque(range(len(partitions)))
+        result_queue = self._context.Queue()
+        workers = {}
+        in_flight = {}
+        results = {}
+        timings = {}
+        crash_counts = {}
+        restarts = 0
+        next_worker_id = 0
+        start_time = time.time()
+
+        def dispatch(worker_id):
+            process, task_queue = workers[worker_id]
+            if pending:
+                index = pending.popleft()
+                in_flight[worker_id] = index
+                task_queue.put((index, partitions[index]))
+
+        def start_worker():
+            nonlocal next_worker_id
+            worker_id = next_worker_id
+            next_worker_id += 1
+            workers[worker_id] = self._start_worker(worker_id, scrape_partition, result_queue)
+            dispatch(worker_id)
+
+        worker_count = min(self.workers, len(partitions))
+        for _ in range(worker_count):
+            start_worker()
+
+        try:
+            while len(results) < len(partitions):
+                try:
+                    worker_id, index, rows, error, seconds = result_queue.get(timeout=1)
+                except queue.Empty:
+                    worker_id = None
+
+                if worker_id is not None:
+                    in_flight.pop(worker_id, None)
+                    if index not in results:
+                        results[index] = (partitions[index], rows, error)
+                        timings[index] = seconds
+                        if rows is None:
+                            status = "FAILED"
+                        else:
+                            status = f"{rows if isinstance(rows, int) else len(rows)} rows"
+                        print(f"[pool] {len(results)}/{len(partitions)} partitions done "
+                              f"({partitions[index]!r}: {status} in {seconds:.1f}s)")
+                    if worker_id in workers:
+                        dispatch(worker_id)
+                    continue
+
+                # Replace workers that died without reporting, and requeue their partition.
+                for worker_id, (process, _) in list(workers.items()):
+                    if process.is_alive():
+                        continue
+                    del workers[worker_id]
+                    lost_index = in_flight.pop(worker_id, None)
+                    if lost_index is None or lost_index in results:
+                        continue
+                    crash_counts[lost_index] = crash_counts.get(lost_index, 0) + 1
+                    if crash_counts[lost_index] > self.max_retries:
+                        results[lost_index] = (partitions[lost_index], None,
+                                               f"worker exited with code {process.exitcode}")
+                    else:
+                        pending.appendleft(lost_index)
+                    if restarts < self.max_worker_restarts and pending:
+                        restarts += 1
+                        print(f"[pool] Worker {worker_id} exited (code {process.exitcode}); starting a replacement.")
+                        start_worker()
+
+                if not workers and len(results) < len(partitions):
+                    raise RuntimeError("All browser workers crashed; giving up.")
+
+                # Idle workers (e.g. after a requeue) pick up pending partitions.
+                for worker_id in workers:
+                    if worker_id not in in_flight:
+                        dispatch(worker_id)
+        finally:
+            for process, task_queue in workers.values():
+                task_queue.put(None)
+            for process, _ in workers.values():
+                process.join(timeout=30)
+                if process.is_alive():
+                    process.terminate()
+
+        print(f"[pool] Finished {len(partitions)} partitions with {worker_count} browsers "
+              f"in {time.time() - start_time:.1f} seconds.")
+        self.timings = [timings.get(index) for index in range(len(partitions))]
+        return [results[index] for index in range(len(partitions))]
+
+
+def write_partitioned_csv(filename, header, results, delimiter=','):
+    """
+    Writes pool results to one CSV in partition order and reports failed partitions.
+
+    Reasoning: Workers finish in any order. Writing in partition order makes two runs
+    over the same data produce the same file, which keeps diffs between crawls clean.
+    """
+    written = 0
+    failed = []
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(header)
+        for partition, rows, error in results:
+            if rows is None:
+                failed.append((partition, error))
+                continue
+            writer.writerows(rows)
+            written += len(rows)
+
+    print(f"Saved {written} rows to {filename}")
+    for partition, error in failed:
+        print(f"Partition {partition!r} failed: {error}")
+    return written, failed
@@ -0,0 +1,161 @@
+"""
+Targeted capture of network responses from Chrome via the DevTools protocol.
+
+The usual approach (see the original ART Housing scraper) pulls the whole
+performance log, JSON-decodes every entry and returns the first response whose
+URL matches. That can return a stale response from an earlier step, and its
+cost grows with the amount of traffic on the page.
+
+NetworkCapture instead:
+1. Drains the log right before the action ("arm"), so older traffic is ignored.
+2. Skips log entries with a substring check before decoding them, so only
+   entries that mention the URL pattern or the tracked request are parsed.
+3. Remembers the requestId of the first matching Network.requestWillBeSent and
+   waits for Network.loadingFinished for that exact request.
+4. Fetches that one body with Network.getResponseBody.
+
+Chromedriver only exposes CDP events through the performance log, so the log is
+still the event source; it is just read incrementally and filtered early.
+
+Usage:
+    enable_network_logging(chrome_options)
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    capture = NetworkCapture(driver, 'admin-ajax.php')
+    response = capture.fetch(lambda: select.select_by_value(value), timeout=10)
+    data = response.json() if response else None
+"""
+
+import base64
+import json
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+
+def enable_network_logging(chrome_options):
+    """
+    Turns on Chrome's performance log with only the Network domain enabled.
+
+    Page and timeline events are switched off so the log carries far fewer entries.
+    """
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.add_experimental_option('perfLoggingPrefs', {
+        'enableNetwork': True,
+        'enablePage': False,
+    })
+    return chrome_options
+
+
+class CapturedResponse:
+    """One captured request/response pair."""
+
+    def __init__(self, request_id, url, method, post_data, request_headers):
+        self.request_id = request_id
+        self.url = url
+        self.method = method
+        self.post_data = post_data
+        self.request_headers = request_headers
+        self.status = None
+        self.response_headers = {}
+        self.mime_type = None
+        self.body = None
+
+    def json(self):
+        """The body decoded as JSON, or None if it is not valid JSON."""
+        if not self.body:
+            return None
+        try:
+            return json.loads(self.body)
+        except json.JSONDecodeError:
+            return None
+
+    def __repr__(self):
+        return f"CapturedResponse({self.method} {self.url} -> {self.status})"
+
+
+class NetworkCapture:
+    """Captures the response to the next request whose URL contains `url_pattern`."""
+
+    def __init__(self, driver, url_pattern, poll_interval=0.05):
+        self.driver = driver
+        self.url_pattern = url_pattern
+        self.poll_interval = poll_interval
+        self._pattern_token = json.dumps(url_pattern)[1:-1]
+        self.driver.execute_cdp_cmd('Network.enable', {})
+
+    def arm(self):
+        """Discards all log entries recorded so far. Call right before triggering the request."""
+        self.driver.get_log('performance')
+
+    def fetch(self, trigger, timeout=10):
+        """Arms the capture, runs `trigger()` and returns the matching CapturedResponse (or None)."""
+        self.arm()
+        trigger()
+        return self.wait_for_response(timeout)
+
+    def wait_for_response(self, timeout=10):
+        """
+        Waits for the first request matching the pattern since arm() to finish loading.
+        Returns a CapturedResponse with its body, or None on timeout or failure.
+        """
+        deadline = time.monotonic() + timeout
+        captured = None
+        request_token = None
+
+        while time.monotonic() < deadline:
+            for entry in self.driver.get_log('performance'):
+                message = entry['message']
+
+                # Cheap substring checks first; only promising entries are JSON-decoded.
+                if captured is None:
+                    if 'Network.requestWillBeSent' not in message or self._pattern_token not in message:
+                        continue
+                elif request_token not in message:
+                    continue
+
+                event = json.loads(message)['message']
+                method = event.get('method')
+                params = event.get('params', {})
+
+                if captured is None:
+                    request = params.get('request', {})
+                    if method != 'Network.requestWillBeSent' or self.url_pattern not in request.get('url', ''):
+                        continue
+                    captured = CapturedResponse(
+                        request_id=params['requestId'],
+                        url=request.get('url'),
+                        method=request.get('method'),
+                        post_data=request.get('postData'),
+                        request_headers=request.get('headers', {}),
+                    )
+                    request_token = json.dumps(captured.request_id)
+                    continue
+
+                if params.get('requestId') != captured.request_id:
+                    continue
+                if method == 'Network.responseReceived':
+                    response = params.get('response', {})
+                    captured.status = response.get('status')
+                    captured.response_headers = response.get('headers', {})
+                    captured.mime_type = response.get('mimeType')
+                elif method == 'Network.loadingFinished':
+                    return self._with_body(captured)
+                elif method == 'Network.loadingFailed':
+                    print(f"Request failed: {captured.url} ({params.get('errorText')})")
+                    return None
+
+            time.sleep(self.poll_interval)
+
+        return None
+
+    def _with_body(self, captured):
+        try:
+            response = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': captured.request_id})
+        except WebDriverException as e:
+            print(f"Error getting response body: {e}")
+            return None
+        body = response.get('body')
+        if body and response.get('base64Encoded'):
+            body = base64.b64decode(body).decode('utf-8', errors='replace')
+        captured.body = body
+        return captured
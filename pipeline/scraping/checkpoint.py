@@ -0,0 +1,172 @@
+"""
+Crash-safe, resumable CSV output for long crawls.
+
+A crawl that keeps its rows in memory, or one CSV handle open for hours, loses
+everything (or leaves a half-flushed file) when the driver or the box dies.
+Here output goes to one part file per partition (usually a state), next to a
+log of completed keys:
+
+    sarswat_branches.csv.parts/
+        Maharashtra.csv        rows, appended and fsync'ed per key
+        Maharashtra.csv.done   one JSON line per completed key + CSV offset
+
+1. write(key, rows) appends the rows, fsyncs, then logs the key with the new
+   end offset of the CSV. A key is only "done" once its rows are on disk.
+2. On restart, the CSV is truncated back to the last logged offset, which
+   drops rows of a key that was interrupted halfway, and is_done(key) lets
+   the scraper skip every completed key without re-walking the site.
+3. Mark a parent key done (e.g. a whole city) after its children so a
+   restart skips it without even selecting it.
+4. When every partition has finished, merge() writes the final CSV in
+   partition order and removes the parts.
+
+Each partition is written by one process at a time (one browser-pool worker per
+state), so no locking is needed.
+
+Usage:
+    crawl = CheckpointedCrawl('out.csv', header, delimiter='@')
+    with crawl.part(state_name) as writer:
+        if not writer.is_done(city, area):
+            writer.write((city, area), rows)
+    crawl.merge([state_name, ...])
+"""
+
+import csv
+import json
+import os
+import re
+import shutil
+
+
+def _fsync(f):
+    f.flush()
+    os.fsync(f.fileno())
+
+
+class CheckpointedCSVWriter:
+    """One append-only CSV with a sidecar log of the keys whose rows are fully written."""
+
+    def __init__(self, filename, header, delimiter=','):
+        self.filename = filename
+        self.done_file = f"{filename}.done"
+        self.completed = set()
+        self.rows_written = 0
+
+        offset = self._load_log()
+        if offset is None:
+            # Fresh start: header only, then log its end as the first safe offset.
+            self.file = open(filename, 'w', newline='', encoding='utf-8')
+            csv.writer(self.file, delimiter=delimiter).writerow(header)
+            _fsync(self.file)
+            self.log = open(self.done_file, 'w', encoding='utf-8')
+            self._log_entry(None)
+        else:
+            # Resume: cut off rows of a key that was interrupted after its last checkpoint.
+            self.file = open(filename, 'r+', newline='', encoding='utf-8')
+            self.file.truncate(offset)
+            self.file.seek(offset)
+            # Rewrite the log without a torn last line, so new entries start on a clean line.
+            self.log = open(self.done_file, 'w', encoding='utf-8')
+            self.log.writelines(self._valid_log_lines)
+            _fsync(self.log)
+            if self.completed:
+                print(f"Resuming {filename}: {len(self.completed)} completed key(s)")
+        self.writer = csv.writer(self.file, delimiter=delimiter)
+
+    def _load_log(self):
+        """Reads the completed keys; returns the last safe CSV offset, or None to start fresh."""
+        if not (os.path.exists(self.filename) and os.path.exists(self.done_file)):
+            return None
+        offset = None
+        self._valid_log_lines = []
+        with open(self.done_file, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # A torn last line from a crash; everything before it is valid.
+                self._valid_log_lines.append(line if line.endswith('\n') else line + '\n')
+                offset = entry['offset']
+                if entry['key'] is not None:
+                    self.completed.add(tuple(entry['key']))
+        return offset
+
+    def _log_entry(self, key):
+        entry = {'key': list(key) if key is not None else None, 'offset': self.file.tell()}
+        self.log.write(json.dumps(entry) + '\n')
+        _fsync(self.log)
+
+    def is_done(self, *key):
+        return tuple(key) in self.completed
+
+    def write(self, key, rows):
+        """Appends the rows for `key` and records `key` as completed (rows may be empty)."""
+        key = tuple(key)
+        self.writer.writerows(rows)
+        _fsync(self.file)
+        self._log_entry(key)
+        self.completed.add(key)
+        self.rows_written += len(rows)
+
+    def mark_done(self, *key):
+        self.write(key, [])
+
+    def close(self):
+        self.file.close()
+        self.log.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class CheckpointedCrawl:
+    """Per-partition checkpointed parts of one output CSV, merged in order at the end."""
+
+    def __init__(self, output_file, header, delimiter=','):
+        self.output_file = output_file
+        self.header = header
+        self.delimiter = delimiter
+        self.parts_dir = f"{output_file}.parts"
+
+    def part_file(self, partition_name):
+        safe_name = re.sub(r'[^A-Za-z0-9_-]+', '_', str(partition_name)).strip('_') or 'part'
+        return os.path.join(self.parts_dir, f"{safe_name}.csv")
+
+    def part(self, partition_name):
+        """Opens (or resumes) the checkpointed writer of one partition."""
+        os.makedirs(self.parts_dir, exist_ok=True)
+        return CheckpointedCSVWriter(self.part_file(partition_name), self.header, self.delimiter)
+
+    def merge(self, partition_names, failed=()):
+        """
+        Concatenates the parts in `partition_names` order into the output file.
+
+        Parts are kept while any partition has failed, so the next run resumes from them.
+        Returns the number of data rows written.
+        """
+        written = 0
+        tmp_file = f"{self.output_file}.tmp"
+        with open(tmp_file, 'w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out, delimiter=self.delimiter)
+            writer.writerow(self.header)
+            for name in partition_names:
+                path = self.part_file(name)
+                if not os.path.exists(path):
+                    continue
+                with open(path, newline='', encoding='utf-8') as f:
+                    reader = csv.reader(f, delimiter=self.delimiter)
+                    next(reader, None)
+                    for row in reader:
+                        writer.writerow(row)
+                        written += 1
+        os.replace(tmp_file, self.output_file)
+
+        print(f"Saved {written} rows to {self.output_file}")
+        if failed:
+            print(f"{len(failed)} partition(s) incomplete; progress kept in {self.parts_dir} for the next run.")
+        else:
+            shutil.rmtree(self.parts_dir, ignore_errors=True)
+        return written
@@ -0,0 +1,148 @@
+"""
+Reads paginated DataTables / TablePress tables in one call instead of page by page.
+
+The usual way to scrape a paginated table is: serialize driver.page_source,
+parse the whole document with BeautifulSoup, read the visible rows, click
+Next, sleep, repeat. Every page costs a full-document serialization and parse
+plus a fixed wait that is either too long or too short.
+
+But a DataTables table (TablePress is DataTables underneath) already holds every
+row in memory; pagination only decides which ones are attached to the DOM.
+
+The process is as follows:
+1. One execute_script call: if the table is a DataTables instance, read every
+   row through its API (rows().every(), node or data), so all pages come back
+   at once without clicking anything.
+2. Otherwise read only the table's <tbody> rows, in the same call.
+3. Click Next, wait until the <tbody> content changes (not a fixed sleep), read
+   the <tbody> again, and repeat until Next is missing or disabled.
+
+Each row comes back as a list of cells, each cell {'text': ..., 'href': ...}:
+the cell's text nodes stripped and joined (like BeautifulSoup's
+get_text(strip=True)) and the href of its first link, or None.
+
+Usage:
+    rows = read_table(driver, '#tablepress-9')
+    for cells in rows:
+        name, link = cells[0]['text'], cells[6]['href']
+"""
+
+from selenium.common.exceptions import TimeoutException
+
+from selenium_waits import wait_for
+
+# DataTables 1.x (TablePress) and 2.x pagination buttons
+NEXT_BUTTON_SELECTOR = '.paginate_button.next, .dt-paging-button.next'
+
+READ_TABLE_JS = r"""
+var table = document.querySelector(arguments[0]);
+var useApi = arguments[1];
+if (!table) { return null; }
+
+function cellText(cell) {
+    var walker = document.createTreeWalker(cell, NodeFilter.SHOW_TEXT);
+    var parts = [];
+    while (walker.nextNode()) {
+        var text = walker.currentNode.nodeValue.trim();
+        if (text) { parts.push(text); }
+    }
+    return parts.join('');
+}
+function readRow(row) {
+    return Array.prototype.filter.call(row.children, function (cell) { return cell.tagName === 'TD'; })
+        .map(function (cell) {
+            var link = cell.querySelector('a[href]');
+            return { text: cellText(cell), href: link ? link.getAttribute('href') : null };
+        });
+}
+
+var jq = window.jQuery;
+if (useApi && jq && jq.fn && jq.fn.dataTable && jq.fn.dataTable.isDataTable(table)) {
+    var rows = [];
+    jq(table).DataTable().rows().every(function () {
+        var node = this.node();
+        if (node) { rows.push(readRow(node)); return; }
+        // deferRender tables have no <tr> yet for undrawn rows: build one from the row data.
+        var data = this.data();
+        var row = document.createElement('tr');
+        (Array.isArray(data) ? data : Object.values(data)).forEach(function (value) {
+            var cell = document.createElement('td');
+            cell.innerHTML = value === null || value === undefined ? '' : String(value);
+            row.appendChild(cell);
+        });
+        rows.push(readRow(row));
+    });
+    return { method: 'datatables', rows: rows };
+}
+
+var body = table.tBodies[0];
+return { method: 'page', rows: body ? Array.prototype.map.call(body.rows, readRow) : [] };
+"""
+
+TBODY_SIGNATURE_JS = r"""
+var table = document.querySelector(arguments[0]);
+var body = table && table.tBodies[0];
+return body ? body.textContent : null;
+"""
+
+# Clicks the first enabled Next button; returns false when there is none.
+CLICK_NEXT_JS = r"""
+var buttons = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < buttons.length; i++) {
+    var button = buttons[i];
+    if (button.classList.contains('disabled') || button.disabled ||
+            button.getAttribute('aria-disabled') === 'true') {
+        continue;
+    }
+    button.click();
+    return true;
+}
+return false;
+"""
+
+
+class tbody_changed:
+    """Waits until the table's <tbody> text differs from `previous` (a TBODY_SIGNATURE_JS result)."""
+
+    def __init__(self, table_selector, previous):
+        self.table_selector = table_selector
+        self.previous = previous
+
+    def __call__(self, driver):
+        signature = driver.execute_script(TBODY_SIGNATURE_JS, self.table_selector)
+        return signature is not None and signature != self.previous
+
+
+def read_table(driver, table_selector, next_selector=NEXT_BUTTON_SELECTOR, use_api=True, timeout=10,
+               max_pages=1000):
+    """
+    Every row of a (possibly paginated) table as lists of {'text', 'href'} cells,
+    or None if the table is not on the page.
+    """
+    result = driver.execute_script(READ_TABLE_JS, table_selector, use_api)
+    if result is None:
+        return None
+    rows = list(result['rows'])
+    if result['method'] == 'datatables':
+        print(f"Read {len(rows)} rows of {table_selector} from its DataTables instance in one call.")
+        return rows
+
+    # Reasoning: No DataTables API to ask, so walk the pages, but read only the <tbody>
+    # each time and continue as soon as the page has redrawn instead of sleeping.
+    pages = 1
+    signature = driver.execute_script(TBODY_SIGNATURE_JS, table_selector)
+    seen = {signature}
+    while pages < max_pages and driver.execute_script(CLICK_NEXT_JS, next_selector):
+        try:
+            wait_for(driver, tbody_changed(table_selector, signature), timeout=timeout)
+        except TimeoutException:
+            print(f"Page {pages + 1} of {table_selector} did not load within {timeout}s; stopping.")
+            break
+        signature = driver.execute_script(TBODY_SIGNATURE_JS, table_selector)
+        if signature in seen:
+            break
+        seen.add(signature)
+        rows.extend(driver.execute_script(READ_TABLE_JS, table_selector, False)['rows'])
+        pages += 1
+    print(f"Read {len(rows)} rows of {table_selector} from {pages} pages.")
+    return rows
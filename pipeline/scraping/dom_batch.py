@@ -0,0 +1,113 @@
+"""
+Batched DOM extraction for Selenium: one execute_script call per result block.
+
+Every find_element, .text and get_attribute call is a separate WebDriver
+round-trip (HTTP to chromedriver, then CDP to the page). Reading 20 branch
+cards with 3 fields each costs 60+ round-trips. These helpers run one piece of
+JavaScript that walks the block and returns plain JSON instead, the same
+technique the Shivalik Playwright scraper uses with page.evaluate().
+
+Field specs (used by extract_fields / extract_one):
+    'h4'              innerText of the first matching descendant
+    ('a', 'href')     an attribute of the first matching descendant
+    ('p', 'html')     innerHTML of the first matching descendant
+    ('', 'data-id')   '' means the container element itself
+A field whose element is missing comes back as None.
+
+Usage:
+    cards = extract_fields(driver, '.branch-info', {'address': 'p', 'link': ('a', 'href')})
+    options = select_options(driver, '#city')            # [{'value': ..., 'text': ...}, ...]
+    details = labelled_values(driver, '#branchDetails')  # {'Address': '...', 'Phone': '...'}
+"""
+
+EXTRACT_FIELDS_JS = r"""
+var containers = document.querySelectorAll(arguments[0]);
+var fields = arguments[1];
+var limit = arguments[2];
+var rows = [];
+for (var i = 0; i < containers.length && (limit === null || rows.length < limit); i++) {
+    var row = {};
+    for (var name in fields) {
+        var selector = fields[name][0], attribute = fields[name][1];
+        var element = selector ? containers[i].querySelector(selector) : containers[i];
+        if (!element) { row[name] = null; continue; }
+        if (attribute === 'text') { row[name] = (element.innerText || element.textContent || '').trim(); }
+        else if (attribute === 'html') { row[name] = element.innerHTML; }
+        // Like Selenium's get_attribute(): the property if there is one (absolute href), else the attribute
+        else if (typeof element[attribute] === 'string') { row[name] = element[attribute]; }
+        else { row[name] = element.getAttribute(attribute); }
+    }
+    rows.push(row);
+}
+return rows;
+"""
+
+SELECT_OPTIONS_JS = r"""
+var select = document.querySelector(arguments[0]);
+if (!select) { return null; }
+return Array.from(select.options).map(function (option) {
+    return { value: option.value, text: (option.text || '').trim() };
+});
+"""
+
+LABELLED_VALUES_JS = r"""
+var container = document.querySelector(arguments[0]);
+if (!container) { return null; }
+var items = container.querySelectorAll(arguments[1]);
+var labelSelector = arguments[2];
+var values = {};
+for (var i = 0; i < items.length; i++) {
+    var label = items[i].querySelector(labelSelector);
+    if (!label) { continue; }
+    var key = (label.innerText || label.textContent || '').trim();
+    var text = (items[i].innerText || items[i].textContent || '').trim();
+    // Drop the label from the front of the item's text, leaving only the value
+    if (text.indexOf(key) === 0) { text = text.slice(key.length).trim(); }
+    if (key && !(key in values)) { values[key] = text; }
+}
+return values;
+"""
+
+
+def _normalize_fields(fields):
+    normalized = {}
+    for name, spec in fields.items():
+        if isinstance(spec, str):
+            normalized[name] = [spec, 'text']
+        else:
+            selector, attribute = spec
+            normalized[name] = [selector or '', attribute]
+    return normalized
+
+
+def extract_fields(driver, container_selector, fields, limit=None):
+    """
+    Returns one dict per element matching `container_selector`, with the given fields,
+    in a single round-trip.
+    """
+    return driver.execute_script(EXTRACT_FIELDS_JS, container_selector, _normalize_fields(fields), limit) or []
+
+
+def extract_one(driver, container_selector, fields):
+    """Like extract_fields() for the first matching container only; None if there is none."""
+    rows = extract_fields(driver, container_selector, fields, limit=1)
+    return rows[0] if rows else None
+
+
+def select_options(driver, select_selector, skip_placeholder=False):
+    """
+    All options of a <select> as [{'value', 'text'}], or [] if the select does not exist.
+    `skip_placeholder` drops options with an empty value (e.g. "Select City").
+    """
+    options = driver.execute_script(SELECT_OPTIONS_JS, select_selector) or []
+    if skip_placeholder:
+        options = [option for option in options if option['value']]
+    return options
+
+
+def labelled_values(driver, container_selector, item_selector='li', label_selector='span'):
+    """
+    Reads "<li><span>Label</span> value</li>" style detail lists into {label: value}.
+    Returns None if the container does not exist.
+    """
+    return driver.execute_script(LABELLED_VALUES_JS, container_selector, item_selector, label_selector)
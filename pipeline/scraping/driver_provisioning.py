@@ -0,0 +1,133 @@
+"""
+Resolves the chromedriver binary once and reuses it across runs and processes.
+
+`ChromeDriverManager().install()` checks the latest driver version online on
+every call, and may download it. With a browser pool that happens once per
+worker and per browser restart, and it fails outright without network access.
+
+chromedriver_path() looks in this order and stops at the first hit:
+1. The CHROMEDRIVER_PATH environment variable (explicit pin, always offline).
+2. The path already resolved in this process.
+3. The pin file (~/.cache/multi-scraper/chromedriver.json), as long as the
+   driver still exists and the installed Chrome binary has not changed since.
+4. A chromedriver on PATH.
+5. webdriver-manager, run once under a file lock so parallel workers do not
+   all download at the same time. The result is written to the pin file.
+
+Usage:
+    service = Service(chromedriver_path())
+
+    # Refresh the pin after a Chrome update, from the command line:
+    python driver_provisioning.py --refresh
+"""
+
+import json
+import os
+import shutil
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows: no lock; the worst case is two workers resolving at once.
+    fcntl = None
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'multi-scraper')
+PIN_FILE = os.path.join(CACHE_DIR, 'chromedriver.json')
+LOCK_FILE = os.path.join(CACHE_DIR, 'chromedriver.lock')
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+_resolved_path = None
+
+
+def chrome_fingerprint():
+    """
+    Path and modification time of the installed Chrome, used to notice browser updates.
+
+    Reasoning: Asking Chrome for its version starts a process; a stat() call is enough to
+    tell that the binary was replaced, which is when a pinned driver may stop matching.
+    """
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            real_path = os.path.realpath(path)
+            return {'chrome': real_path, 'chrome_mtime': int(os.path.getmtime(real_path))}
+    return {'chrome': None, 'chrome_mtime': None}
+
+
+def read_pin():
+    try:
+        with open(PIN_FILE) as f:
+            pin = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not os.path.isfile(pin.get('path', '')):
+        return None
+    fingerprint = chrome_fingerprint()
+    # A pin made without a detectable Chrome stays valid until Chrome shows up.
+    if pin.get('chrome') and fingerprint['chrome'] and pin.get('chrome_mtime') != fingerprint['chrome_mtime']:
+        return None
+    return pin['path']
+
+
+def write_pin(path, source):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    pin = {'path': path, 'source': source, **chrome_fingerprint()}
+    tmp_file = f"{PIN_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(pin, f, indent=2)
+    os.replace(tmp_file, PIN_FILE)
+
+
+def _download_with_webdriver_manager():
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        raise RuntimeError(
+            "No chromedriver found. Set CHROMEDRIVER_PATH, put chromedriver on PATH, "
+            "or install webdriver-manager."
+        )
+    return ChromeDriverManager().install()
+
+
+def chromedriver_path(refresh=False):
+    """Absolute path to a chromedriver binary. Only touches the network when nothing is pinned."""
+    global _resolved_path
+
+    explicit = os.environ.get('CHROMEDRIVER_PATH')
+    if explicit:
+        return explicit
+    if _resolved_path and not refresh:
+        return _resolved_path
+
+    if not refresh:
+        pinned = read_pin()
+        if pinned:
+            _resolved_path = pinned
+            return pinned
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(LOCK_FILE, 'w') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+        # Another process may have resolved the driver while this one waited for the lock.
+        pinned = None if refresh else read_pin()
+        if pinned:
+            _resolved_path = pinned
+            return pinned
+
+        on_path = None if refresh else shutil.which('chromedriver')
+        if on_path:
+            path, source = os.path.realpath(on_path), 'PATH'
+        else:
+            print("Resolving chromedriver with webdriver-manager (one-time download)...")
+            path, source = _download_with_webdriver_manager(), 'webdriver-manager'
+        write_pin(path, source)
+
+    print(f"Pinned chromedriver: {path} (from {source})")
+    _resolved_path = path
+    return path
+
+
+if __name__ == "__main__":
+    print(chromedriver_path(refresh='--refresh' in sys.argv))
@@ -0,0 +1,85 @@
+"""
+Driving cascading <select> dropdowns without clicking through them.
+
+Clicking a dropdown open and then clicking the option costs several WebDriver
+calls per item, and scripts that re-find the option list for every item grow
+quadratically. choose() instead:
+
+1. Sets the <select>'s value and dispatches input/change events in one
+   execute_script call (this fires jQuery handlers and ASP.NET AutoPostBack
+   just like a user selection), returning the dependent dropdown's current
+   options from the same call.
+2. Waits only until the dependent dropdown has been repopulated, or until the
+   AJAX call the change triggered has finished (a parent with no children
+   leaves the list unchanged).
+3. Reads the new options in one more call.
+
+Usage:
+    install_ajax_tracker(driver)
+    for state in read_options(driver, '#state'):
+        for city in choose(driver, '#state', state['value'], dependent='#city'):
+            choose(driver, '#city', city['value'])
+"""
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from dom_batch import select_options
+from selenium_waits import ajax_completed, ajax_count, option_values_changed
+
+SET_VALUE_JS = r"""
+var select = document.querySelector(arguments[0]);
+var wanted = arguments[1];
+if (!select) { return {error: 'missing'}; }
+var dependent = arguments[2] ? document.querySelector(arguments[2]) : null;
+var previous = dependent ? Array.from(dependent.options).map(function (o) { return o.value; }) : [];
+
+var option = Array.from(select.options).find(function (o) { return o.value === wanted; });
+if (!option) { return {error: 'no-option'}; }
+select.value = option.value;
+option.selected = true;
+select.dispatchEvent(new Event('input', {bubbles: true}));
+select.dispatchEvent(new Event('change', {bubbles: true}));
+
+// Skinned dropdowns (jQuery nice-select) draw their own list; keep it in sync with the <select>.
+if (window.jQuery && window.jQuery.fn && window.jQuery.fn.niceSelect) {
+    try { window.jQuery(select).niceSelect('update'); } catch (e) {}
+}
+return {previous: previous};
+"""
+
+
+def read_options(driver, select_selector, skip_placeholder=True):
+    """All options of a <select> as [{'value', 'text'}], read once, placeholder dropped by default."""
+    return select_options(driver, select_selector, skip_placeholder=skip_placeholder)
+
+
+def choose(driver, select_selector, value, dependent=None, timeout=15, ajax_url_fragment=None,
+           skip_placeholder=True):
+    """
+    Selects `value` in the <select> at `select_selector` and dispatches its change event.
+
+    With `dependent` (a CSS selector), waits for that dropdown to be repopulated and
+    returns its new options; otherwise returns None. `ajax_url_fragment` narrows the
+    "request finished" signal (needs install_ajax_tracker(); without it only the option
+    change is awaited).
+    """
+    completed_before = ajax_count(driver, ajax_url_fragment)
+    result = driver.execute_script(SET_VALUE_JS, select_selector, value, dependent)
+    if result.get('error') == 'missing':
+        raise NoSuchElementException(f"No <select> matches {select_selector}")
+    if result.get('error') == 'no-option':
+        raise NoSuchElementException(f"{select_selector} has no option with value {value!r}")
+    if dependent is None:
+        return None
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1).until(EC.any_of(
+            option_values_changed((By.CSS_SELECTOR, dependent), result['previous']),
+            ajax_completed(ajax_url_fragment, completed_before),
+        ))
+    except TimeoutException:
+        print(f"Timed out waiting for {dependent} to refresh after choosing {value!r}")
+    return select_options(driver, dependent, skip_placeholder=skip_placeholder)
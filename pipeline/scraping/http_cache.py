@@ -0,0 +1,216 @@
+"""
+On-disk HTTP response cache with record/replay and conditional revalidation.
+
+Tweaking a parser (a regex over address HTML, a JSON field path) should not
+mean re-hitting every endpoint, and a scheduled re-crawl should only transfer
+what changed. CachingAdapter plugs into a requests.Session, so every scraper
+built on http_session.create_session() (and SessionManager, ReplaySession,
+api_crawl) gets the cache without code changes.
+
+Entries are keyed by a SHA-256 of method, URL and request body, and stored as
+<key>.json (status, headers, validators) plus <key>.body (raw bytes) under
+~/.cache/multi-scraper/http/ (or SCRAPER_CACHE_DIR).
+
+Modes (SCRAPER_CACHE environment variable, or HttpCache(mode=...)):
+    off         no caching (default)
+    revalidate  send If-None-Match / If-Modified-Since when the cached response
+                had an ETag / Last-Modified; a 304 is served from disk. Entries
+                without validators are fetched again.
+    replay      offline: serve everything from disk, never touch the network.
+                A request that was never recorded raises CacheMiss.
+    record      always fetch, and store every successful response.
+
+Usage:
+    SCRAPER_CACHE=record python extract_aavas_data.py   # crawl once
+    SCRAPER_CACHE=replay python extract_aavas_data.py   # iterate on parsing at disk speed
+    SCRAPER_CACHE=revalidate python extract_aavas_data.py  # re-crawl, transfer only changes
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'multi-scraper', 'http')
+MODES = ('off', 'revalidate', 'replay', 'record')
+
+# Headers that describe the transfer rather than the content, and would be wrong on a replayed body.
+SKIPPED_RESPONSE_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection', 'set-cookie'}
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class CacheMiss(ConnectionError):
+    """Raised in replay mode for a request that is not in the cache."""
+
+
+class HttpCache:
+    """A directory of cached responses, shared by every session that mounts it."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, mode='revalidate'):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cache mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.directory = directory
+        self.mode = mode
+        self.stats = {'hits': 0, 'revalidated': 0, 'fetched': 0, 'stored': 0, 'misses': 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """The cache configured by SCRAPER_CACHE / SCRAPER_CACHE_DIR, or None when caching is off."""
+        mode = os.environ.get('SCRAPER_CACHE', 'off').lower()
+        if mode == 'off':
+            return None
+        return cls(os.environ.get('SCRAPER_CACHE_DIR', DEFAULT_CACHE_DIR), mode)
+
+    def key(self, request):
+        body = request.body or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        digest = hashlib.sha256()
+        digest.update(request.method.upper().encode())
+        digest.update(b'\0')
+        digest.update(request.url.encode())
+        digest.update(b'\0')
+        digest.update(body)
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        folder = os.path.join(self.directory, key[:2])
+        return os.path.join(folder, f"{key}.json"), os.path.join(folder, f"{key}.body")
+
+    def load(self, key):
+        """(metadata, body bytes) of a cached response, or None."""
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, request, response):
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        headers = {name: value for name, value in response.headers.items()
+                   if name.lower() not in SKIPPED_RESPONSE_HEADERS}
+        meta = {
+            'method': request.method,
+            'url': request.url,
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': headers,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        # Body first, metadata last: an entry only counts once its metadata exists.
+        _write_atomic(body_path, response.content)
+        _write_atomic(meta_path, json.dumps(meta, indent=2).encode('utf-8'))
+        self.count('stored')
+
+    def count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def summary(self):
+        return ', '.join(f"{count} {name}" for name, count in self.stats.items())
+
+
+def cached_response(request, meta, body):
+    """Builds a requests.Response from a cache entry."""
+    response = Response()
+    response.status_code = meta['status']
+    response.reason = meta.get('reason') or 'OK'
+    response.headers = CaseInsensitiveDict(meta['headers'])
+    response._content = body
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.url = meta['url']
+    response.request = request
+    response.from_cache = True
+    return response
+
+
+class CachingAdapter(HTTPAdapter):
+    """An HTTPAdapter (pooling and retries unchanged) that reads and writes an HttpCache."""
+
+    def __init__(self, cache, **kwargs):
+        self.cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        cache = self.cache
+        if request.method.upper() not in ('GET', 'POST'):
+            return super().send(request, **kwargs)
+
+        key = cache.key(request)
+        entry = cache.load(key) if cache.mode != 'record' else None
+
+        if cache.mode == 'replay':
+            if entry is None:
+                cache.count('misses')
+                raise CacheMiss(f"Not in the HTTP cache (replay mode): {request.method} {request.url}",
+                                request=request)
+            cache.count('hits')
+            return cached_response(request, *entry)
+
+        if entry is not None:
+            meta, _ = entry
+            if meta.get('etag'):
+                request.headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                request.headers['If-Modified-Since'] = meta['last_modified']
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            # Reasoning: Only the headers crossed the network; the body is unchanged on disk.
+            # The 304's own headers still apply (a refreshed session cookie or CSRF token),
+            # and requests reads Set-Cookie from response.raw, so both are carried over.
+            response.close()
+            cache.count('revalidated')
+            revalidated = cached_response(request, *entry)
+            revalidated.headers.update({name: value for name, value in response.headers.items()
+                                        if name.lower() not in SKIPPED_RESPONSE_HEADERS - {'set-cookie'}})
+            revalidated.raw = response.raw
+            return revalidated
+
+        cache.count('fetched')
+        if 200 <= response.status_code < 300:
+            cache.store(key, request, response)
+        return response
+
+
+# One HttpCache per (mode, directory), so sessions sharing a setting share its stats
+_env_caches = {}
+_env_caches_lock = threading.Lock()
+
+
+def cache_from_env():
+    """
+    The cache selected by SCRAPER_CACHE / SCRAPER_CACHE_DIR right now, or None when caching is off.
+    The environment is read on every call (each new session), not once per process.
+    """
+    cache = HttpCache.from_env()
+    if cache is None:
+        return None
+    with _env_caches_lock:
+        key = (cache.mode, cache.directory)
+        if key not in _env_caches:
+            _env_caches[key] = cache
+            print(f"HTTP cache: {cache.mode} mode, {cache.directory}")
+            atexit.register(lambda: print(f"HTTP cache ({cache.mode}): {cache.summary()}"))
+        return _env_caches[key]
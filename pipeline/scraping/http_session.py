@@ -0,0 +1,52 @@
+"""
+Pooled HTTP sessions for JSON/AJAX APIs.
+
+Done with bare requests.get() calls, every request of a direct-API scraper
+opens a new TLS connection, and concurrent workers throw away connections as
+soon as they outnumber requests' default pool.
+
+- create_session() returns a keep-alive requests.Session whose connection
+  pool matches the number of worker threads, with retries on 429/5xx.
+- Sessions pick up the on-disk response cache from http_cache.py when the
+  SCRAPER_CACHE environment variable is set (record / replay / revalidate).
+
+Parent -> child crawls (state -> branch IDs -> details) run on these sessions
+through api_crawl.run_crawl().
+
+Usage:
+    session = create_session(headers, pool_size=16)
+    branches = session.get(state_url).json()
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from http_cache import CachingAdapter, cache_from_env
+
+
+def create_session(headers=None, pool_size=8, retries=2, backoff_factor=0.5, cache=None):
+    """
+    A keep-alive requests.Session with `pool_size` connections per host and retries.
+    `cache` is an http_cache.HttpCache; by default the one selected by SCRAPER_CACHE (if any).
+    """
+    session = requests.Session()
+
+    # Retry strategy for handling temporary failures
+    retry_strategy = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=None,
+    )
+    cache = cache if cache is not None else cache_from_env()
+    # Reasoning: requests keeps only 10 connections per host by default; with more worker
+    # threads than that, the extra requests open (and throw away) a new connection each time.
+    adapter_options = dict(pool_connections=4, pool_maxsize=pool_size, max_retries=retry_strategy)
+    adapter = CachingAdapter(cache, **adapter_options) if cache else HTTPAdapter(**adapter_options)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if headers:
+        session.headers.update(headers)
+    return session
@@ -0,0 +1,281 @@
+"""
+Concurrent pagination for page-numbered listings (?page=1, ?page=2, ...).
+
+Walking pages one at a time until the first empty page costs one round-trip per
+page, and a hard-coded upper bound (range(1, 11)) silently drops everything past
+it once the listing grows. Many sites also never return an empty page: Laravel
+and WordPress clamp ?page=999 to the last page, so "stop at the first empty
+page" never stops and the last page is saved over and over.
+
+The process is as follows:
+1. Fetch the first page. If a page_count(first_page_body) hint is given (e.g. the
+   highest number in the pagination links), start the search there.
+2. Gallop: probe pages 2, 4, 8, 16, ... (or hint + 1, hint + 2, hint + 4, ...)
+   until one is past the end, i.e. empty or a repeat of a page already seen.
+3. Binary-search between the last good probe and the first bad one for the
+   last page, then for the first copy of that page in case the site clamps.
+   This takes O(log n) sequential requests instead of n.
+4. Fetch every page up to the last one concurrently (probed pages are reused),
+   then drop empty pages and pages whose items repeat an earlier page.
+
+A probe that fails is retried (probe_retries); if it still fails the search
+raises instead of guessing, since treating an error as "past the end" would
+silently cut the listing short. fetch_page should therefore return an empty
+page, not raise, for a page number the site reports as nonexistent.
+
+Pages are fetched through a caller-supplied fetch_page(page_number) that returns
+the page body, and parse_page(body) turns it into the page's items (a list of
+rows or dicts; by default the body already is that list). The same engine runs
+over requests, SessionManager or a Playwright page.
+
+Usage:
+    pages, failures = paginate(
+        lambda page_number: session.get(url, params={'page': page_number}).text,
+        parse_page=parse_branches,
+        page_count=lambda html: max(map(int, re.findall(r'[?&]page=(\d+)', html)), default=1),
+        workers=8,
+    )
+    branches = [branch for _, items in pages for branch in items]
+
+async def fetch_page(...) works the same way with `await paginate_async(...)`.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import threading
+import time
+
+
+def page_fingerprint(items):
+    """A hash of a page's items, so identical pages can be recognised."""
+    encoded = json.dumps(items, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class Paginator:
+    """Finds the last page of a listing and fetches all of its pages. Use paginate() / paginate_async()."""
+
+    def __init__(self, fetch_page, parse_page=None, workers=8, page_count=None, first_page=1,
+                 max_pages=10000, probe_retries=2, name='pages'):
+        self.fetch_page = fetch_page
+        self.parse_page = parse_page
+        self.workers = workers
+        self.page_count = page_count
+        self.first_page = first_page
+        self.max_pages = max_pages
+        self.probe_retries = probe_retries
+        self.name = name
+        self.pages = {}        # page number -> items
+        self.failures = {}     # page number -> error message
+        self.probes = 0
+        self._first_body = None
+        self._lock = threading.Lock()
+
+    def _record(self, page, body=None, error=None):
+        if error is None:
+            try:
+                items = self.parse_page(body) if self.parse_page else body
+            except Exception as e:
+                error = f"could not parse: {e}"
+        if error is not None:
+            self.failures[page] = error
+            print(f"[{self.name}] Page {page} failed: {error}")
+            return
+        self.pages[page] = list(items or [])
+        if page == self.first_page:
+            self._first_body = body
+
+    def _check_probe(self, page):
+        if page in self.failures:
+            raise RuntimeError(f"[{self.name}] Page {page} could not be fetched while searching for the last page "
+                               f"({self.failures[page]}); stopping rather than truncating the listing.")
+
+    def _past_end(self, page):
+        """Whether a probed page is beyond the listing: empty, or a repeat of another page."""
+        self._check_probe(page)
+        items = self.pages[page]
+        if not items:
+            return True
+        fingerprint = page_fingerprint(items)
+        return any(other != page and other_items and page_fingerprint(other_items) == fingerprint
+                   for other, other_items in self.pages.items())
+
+    def _same_items(self, page, fingerprint):
+        items = self.pages.get(page)
+        return bool(items) and page_fingerprint(items) == fingerprint
+
+    def _search(self):
+        """
+        Generator that yields the page numbers to probe, one at a time, and returns the last page.
+        The sync and async drivers both run it, sending nothing back: they record each probe
+        in self.pages / self.failures before resuming it.
+        """
+        first = self.first_page
+        yield first
+        self._check_probe(first)
+        if not self.pages[first]:
+            return first - 1
+
+        last_good = first
+        if self.page_count:
+            hint = self.page_count(self._first_body)
+            if hint and hint > first:
+                # Reasoning: The hint is verified, not trusted: a stale or truncated page list
+                # only costs the probes needed to walk past it.
+                hint = min(int(hint), first + self.max_pages - 1)
+                yield hint
+                if not self._past_end(hint):
+                    last_good = hint
+
+        # Gallop: double the step until a probe lands past the end.
+        step = 1
+        bad = None
+        while True:
+            probe = last_good + step
+            if probe >= first + self.max_pages:
+                print(f"[{self.name}] Stopped searching at max_pages={self.max_pages}")
+                return first + self.max_pages - 1
+            yield probe
+            if self._past_end(probe):
+                bad = probe
+                break
+            last_good = probe
+            step *= 2
+
+        # Binary search: last_good is inside the listing, bad is past its end.
+        while bad - last_good > 1:
+            middle = (last_good + bad) // 2
+            yield middle
+            if self._past_end(middle):
+                bad = middle
+            else:
+                last_good = middle
+
+        # Sites that clamp ?page=N to the last page return the same items for every number past
+        # the end, so last_good may be one of those copies: find the first page showing them.
+        end_fingerprint = page_fingerprint(self.pages[last_good])
+        lower = max((page for page in self.pages if page < last_good and not self._same_items(page, end_fingerprint)),
+                    default=first - 1)
+        while last_good - lower > 1:
+            middle = (lower + last_good) // 2
+            yield middle
+            self._check_probe(middle)
+            if self._same_items(middle, end_fingerprint):
+                last_good = middle
+            else:
+                lower = middle
+        return last_good
+
+    def _load(self, page):
+        if page in self.pages or page in self.failures:
+            return
+        with self._lock:
+            self.probes += 1
+        try:
+            self._record(page, self.fetch_page(page))
+        except Exception as e:
+            self._record(page, error=str(e))
+
+    async def _load_async(self, page):
+        if page in self.pages or page in self.failures:
+            return
+        self.probes += 1
+        try:
+            self._record(page, await self.fetch_page(page))
+        except Exception as e:
+            self._record(page, error=str(e))
+
+    def _probe(self, page):
+        for _ in range(self.probe_retries + 1):
+            self.failures.pop(page, None)
+            self._load(page)
+            if page not in self.failures:
+                return
+
+    async def _probe_async(self, page):
+        for _ in range(self.probe_retries + 1):
+            self.failures.pop(page, None)
+            await self._load_async(page)
+            if page not in self.failures:
+                return
+
+    def _find_last_page(self):
+        search = self._search()
+        try:
+            while True:
+                self._probe(next(search))
+        except StopIteration as stop:
+            return stop.value
+
+    async def _find_last_page_async(self):
+        search = self._search()
+        try:
+            while True:
+                await self._probe_async(next(search))
+        except StopIteration as stop:
+            return stop.value
+
+    def _remaining(self, last_page):
+        """Pages up to last_page that were not fetched during the search."""
+        return [page for page in range(self.first_page, last_page + 1) if page not in self.pages]
+
+    def _collect(self, last_page, start_time):
+        """(page, items) for every page up to last_page, minus empty and duplicate pages."""
+        results = []
+        seen = set()
+        dropped = 0
+        for page in range(self.first_page, last_page + 1):
+            items = self.pages.get(page)
+            if not items:
+                dropped += page not in self.failures
+                continue
+            fingerprint = page_fingerprint(items)
+            if fingerprint in seen:
+                dropped += 1
+                continue
+            seen.add(fingerprint)
+            results.append((page, items))
+
+        failures = sorted(self.failures.items())
+        item_count = sum(len(items) for _, items in results)
+        print(f"[{self.name}] {last_page - self.first_page + 1} pages ({self.probes} requests), {item_count} items "
+              f"in {time.time() - start_time:.1f} seconds; {dropped} empty or duplicate pages dropped, "
+              f"{len(failures)} failed.")
+        return results, failures
+
+    def run(self):
+        start_time = time.time()
+        last_page = self._find_last_page()
+        remaining = self._remaining(last_page)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(self._load, remaining))
+        return self._collect(last_page, start_time)
+
+    async def run_async(self):
+        start_time = time.time()
+        last_page = await self._find_last_page_async()
+        remaining = self._remaining(last_page)
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def load(page):
+            async with semaphore:
+                await self._load_async(page)
+
+        await asyncio.gather(*(load(page) for page in remaining))
+        return self._collect(last_page, start_time)
+
+
+def paginate(fetch_page, parse_page=None, workers=8, **options):
+    """
+    Fetches every page of a listing with fetch_page(page_number) -> body, parse_page(body) -> items.
+    Returns (pages, failures): pages is [(page number, items)] in page order without empty or
+    duplicate pages, failures is [(page number, error)].
+    """
+    return Paginator(fetch_page, parse_page, workers=workers, **options).run()
+
+
+async def paginate_async(fetch_page, parse_page=None, workers=8, **options):
+    """paginate() for an async fetch_page; at most `workers` pages are fetched at once."""
+    return await Paginator(fetch_page, parse_page, workers=workers, **options).run_async()
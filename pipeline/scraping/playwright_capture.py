@@ -0,0 +1,120 @@
+"""
+Capture the JSON (or HTML) a page downloads, instead of rendering and scraping its DOM.
+
+A JS-rendered branch locator gets its data from one or two XHR/fetch calls and
+then spends most of its load time on images, fonts, map tiles and layout. If
+the scraper only needs that data, it can read the response bodies as they
+arrive and stop there, with everything else aborted at the network layer, which
+makes a browser-backed scrape nearly as cheap as calling the API directly (and
+still works where plain HTTP is blocked, since the browser sends the request).
+
+The process is as follows:
+1. block_resources() installs a page.route (or context.route) handler that aborts
+   image, font and media requests (or everything except an allow-list).
+2. ResponseCapture listens for page.on("response") events whose URL matches a
+   substring, regex or predicate, and reads each body as JSON or text.
+3. capture() starts the navigation (or runs a trigger such as a click) and
+   returns as soon as the expected number of payloads has arrived, without
+   waiting for the page to finish loading.
+
+Usage:
+    await block_resources(page)
+    payloads = await capture(page, 'admin-ajax.php', url="https://example.com/branch-locator")
+
+    # Server-rendered pages: take the HTML of the document itself and skip everything else.
+    await block_resources(page, keep=('document',))
+    [html] = await capture(page, '/contact/branch', url=url, resource_types=('document',), body='text')
+"""
+
+import asyncio
+
+# Never needed to read a page's data
+BLOCKED_RESOURCE_TYPES = ('image', 'font', 'media')
+
+
+async def block_resources(target, resource_types=BLOCKED_RESOURCE_TYPES, keep=None):
+    """
+    Aborts requests of the given resource types on a page or browser context.
+    With keep=('document', ...), every resource type not listed is aborted instead.
+    """
+    blocked = set(resource_types)
+    kept = set(keep) if keep else None
+
+    async def handle(route):
+        resource_type = route.request.resource_type
+        if (kept is not None and resource_type not in kept) or (kept is None and resource_type in blocked):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    await target.route('**/*', handle)
+
+
+def _matcher(match):
+    if callable(match):
+        return match
+    if hasattr(match, 'search'):
+        return lambda response: match.search(response.url) is not None
+    return lambda response: match in response.url
+
+
+class ResponseCapture:
+    """Collects the bodies of matching responses on one page. Use capture() unless you need it across steps."""
+
+    def __init__(self, page, match, expected=1, resource_types=('xhr', 'fetch'), body='json'):
+        self.page = page
+        self.matches = _matcher(match)
+        self.expected = expected
+        self.resource_types = set(resource_types) if resource_types else None
+        self.body = body
+        self.payloads = []
+        self.errors = []
+        self._done = asyncio.Event()
+
+    async def _on_response(self, response):
+        if self.resource_types is not None and response.request.resource_type not in self.resource_types:
+            return
+        if not self.matches(response):
+            return
+        try:
+            payload = await (response.json() if self.body == 'json' else response.text())
+        except Exception as e:
+            # Redirects and aborted requests have no body; keep waiting for a real one.
+            self.errors.append(f"{response.url}: {e}")
+            return
+        self.payloads.append(payload)
+        if len(self.payloads) >= self.expected:
+            self._done.set()
+
+    def __enter__(self):
+        self.page.on('response', self._on_response)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.page.remove_listener('response', self._on_response)
+
+    async def wait(self, timeout=30000):
+        """Waits until `expected` payloads have arrived; returns them (raises TimeoutError otherwise)."""
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout / 1000)
+        except asyncio.TimeoutError:
+            details = f"; errors: {'; '.join(self.errors)}" if self.errors else ''
+            raise TimeoutError(f"Captured {len(self.payloads)} of {self.expected} responses "
+                               f"within {timeout} ms{details}") from None
+        return list(self.payloads)
+
+
+async def capture(page, match, url=None, trigger=None, expected=1, resource_types=('xhr', 'fetch'),
+                  body='json', timeout=30000):
+    """
+    Navigates to `url` (or awaits `trigger()`, e.g. a click) and returns the bodies of the first
+    `expected` responses matching `match`, as soon as they have arrived.
+    """
+    with ResponseCapture(page, match, expected, resource_types, body) as responses:
+        if url is not None:
+            # Reasoning: 'commit' returns as soon as the navigation starts; the data responses
+            # are what the caller waits for, not the load event of the whole page.
+            await page.goto(url, wait_until='commit', timeout=timeout)
+        if trigger is not None:
+            await trigger()
+        return await responses.wait(timeout)
@@ -0,0 +1,157 @@
+"""
+Concurrent Playwright crawling: a pool of pages in one browser.
+
+An async scraper that opens one page and awaits page.goto(url,
+wait_until='networkidle') once per URL gets nothing out of asyncio: the URLs
+still load one after another, and networkidle waits an extra 500 ms after
+the last analytics beacon or map tile on every page.
+
+PagePool keeps `size` pages open in one browser (in one shared context, or one
+context each when cookies must not be shared) and hands them out to tasks
+under a queue, so `size` navigations are in flight at once and a multi-page
+source finishes in roughly the time of its slowest page.
+
+The process is as follows:
+1. Launch Chromium once and open `size` pages (contexts=True: one context each).
+2. crawl_pages() runs visit(page, item) for every item, at most `size` at a
+   time; each task borrows a page and returns it when done.
+3. goto() navigates with wait_until='domcontentloaded' and then waits only for
+   the selector the scraper actually needs (if any), instead of networkidle.
+4. A task that fails records its error; its page is replaced if it crashed or
+   was closed, and the rest of the crawl continues.
+
+Usage:
+    async def visit(page, url):
+        await goto(page, url, wait_for='#branches tr')
+        return await page.evaluate(EXTRACT_JS)
+
+    results = await crawl_pages(urls, visit, workers=4)
+    for url, rows, error in results: ...
+
+Or, to share one pool across several crawl steps:
+    async with PagePool.launch(size=4) as pool:
+        async with pool.page() as page: ...
+"""
+
+import asyncio
+import contextlib
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
+
+
+async def goto(page, url, wait_for=None, timeout=30000, wait_timeout=10000):
+    """
+    Navigates to `url`, returning at DOMContentLoaded, then waits for the `wait_for` selector.
+    Returns False (instead of raising) when the selector does not appear within `wait_timeout`
+    ms, so a genuinely empty page (e.g. past the end of a listing) is not an error.
+    """
+    response = await page.goto(url, wait_until='domcontentloaded', timeout=timeout)
+    if response is not None and response.status >= 400:
+        raise RuntimeError(f"HTTP {response.status} for {url}")
+    if not wait_for:
+        return True
+    try:
+        await page.wait_for_selector(wait_for, state='attached', timeout=wait_timeout)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+
+class PagePool:
+    """A fixed set of pages in one browser, handed out to concurrent tasks."""
+
+    def __init__(self, browser, size=4, contexts=False, context_options=None, setup=None):
+        self.browser = browser
+        self.size = size
+        self.contexts = contexts
+        self.context_options = context_options or {}
+        # async setup(page), run on every new tab (e.g. playwright_capture.block_resources)
+        self.setup = setup
+        self._shared_context = None
+        self._idle = asyncio.Queue()
+        self._pages = []
+
+    async def _new_page(self):
+        if self.contexts:
+            context = await self.browser.new_context(**self.context_options)
+        else:
+            if self._shared_context is None:
+                self._shared_context = await self.browser.new_context(**self.context_options)
+            context = self._shared_context
+        page = await context.new_page()
+        if self.setup is not None:
+            await self.setup(page)
+        self._pages.append(page)
+        return page
+
+    async def start(self):
+        for page in await asyncio.gather(*(self._new_page() for _ in range(self.size))):
+            self._idle.put_nowait(page)
+        return self
+
+    @contextlib.asynccontextmanager
+    async def page(self):
+        """Borrows an idle page; waits while all `size` pages are busy."""
+        page = await self._idle.get()
+        try:
+            yield page
+        finally:
+            if page.is_closed():
+                # Reasoning: A crashed or closed tab would fail every later task it is handed to.
+                self._pages.remove(page)
+                if self.contexts:
+                    with contextlib.suppress(Exception):
+                        await page.context.close()
+                page = await self._new_page()
+            self._idle.put_nowait(page)
+
+    async def close(self):
+        for page in self._pages:
+            if self.contexts:
+                await page.context.close()
+        if self._shared_context is not None:
+            await self._shared_context.close()
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def launch(cls, size=4, headless=True, contexts=False, context_options=None, setup=None,
+                     **launch_options):
+        """Starts Playwright and Chromium, yields a started pool, and shuts everything down afterwards."""
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(headless=headless, **launch_options)
+            pool = cls(browser, size=size, contexts=contexts, context_options=context_options, setup=setup)
+            try:
+                yield await pool.start()
+            finally:
+                await pool.close()
+                await browser.close()
+
+
+async def run_in_pool(pool, items, visit, name='pages'):
+    """Runs visit(page, item) for every item on `pool`; returns [(item, result, error)] in input order."""
+    items = list(items)
+    start_time = time.time()
+
+    async def run_one(item):
+        async with pool.page() as page:
+            try:
+                return item, await visit(page, item), None
+            except Exception as e:
+                print(f"[{name}] {item} failed: {e}")
+                return item, None, str(e)
+
+    results = await asyncio.gather(*(run_one(item) for item in items))
+    failed = sum(1 for _, _, error in results if error)
+    print(f"[{name}] Visited {len(items)} pages with {pool.size} tabs in {time.time() - start_time:.1f} seconds "
+          f"({failed} failed).")
+    return results
+
+
+async def crawl_pages(items, visit, workers=4, headless=True, contexts=False, context_options=None, setup=None,
+                      name='pages'):
+    """Launches a browser with a pool of `workers` pages and runs run_in_pool() on it."""
+    async with PagePool.launch(size=workers, headless=headless, contexts=contexts,
+                               context_options=context_options, setup=setup) as pool:
+        return await run_in_pool(pool, items, visit, name=name)
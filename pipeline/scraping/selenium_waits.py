@@ -0,0 +1,220 @@
+"""
+Event-driven wait conditions for Selenium scrapers.
+
+Fixed sleeps after every dropdown change either waste time (the page was ready
+long ago) or are too short on a slow response. These conditions plug into
+WebDriverWait so each step continues as soon as the page is actually ready:
+
+- options_count_changed: a dependent <select> has been repopulated
+- text_stabilized: an element's text stopped changing
+- ajax_completed / ajax_idle: XHR/fetch calls (e.g. admin-ajax.php) have finished
+
+Usage:
+    tracker_count = ajax_count(driver, 'admin-ajax.php')
+    select.select_by_value(value)
+    WebDriverWait(driver, 10).until(ajax_completed('admin-ajax.php', tracker_count))
+"""
+
+import time
+
+from selenium.common.exceptions import (
+    JavascriptException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Wraps XMLHttpRequest and fetch so the page keeps count of started and finished
+# requests, per URL. Safe to run more than once per document.
+AJAX_TRACKER_JS = r"""
+(function () {
+    if (window.__ajaxTracker) { return; }
+    var tracker = { started: 0, completed: 0, urls: [] };
+    window.__ajaxTracker = tracker;
+
+    function finished(url) {
+        tracker.completed += 1;
+        tracker.urls.push(String(url || ''));
+    }
+
+    var open = XMLHttpRequest.prototype.open;
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        this.__trackedUrl = url;
+        return open.apply(this, arguments);
+    };
+    XMLHttpRequest.prototype.send = function () {
+        var xhr = this;
+        tracker.started += 1;
+        xhr.addEventListener('loadend', function () { finished(xhr.__trackedUrl); });
+        return send.apply(this, arguments);
+    };
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function (input) {
+            var url = (input && input.url) || input;
+            tracker.started += 1;
+            return originalFetch.apply(this, arguments).finally(function () { finished(url); });
+        };
+    }
+})();
+"""
+
+
+def install_ajax_tracker(driver):
+    """
+    Installs the XHR/fetch tracker in the current page and, on Chrome, in every page
+    loaded afterwards (so ASP.NET postbacks and full reloads stay tracked).
+    """
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': AJAX_TRACKER_JS})
+    except (AttributeError, WebDriverException):
+        # Not a Chromium driver; the tracker is only installed in the current page.
+        pass
+    driver.execute_script(AJAX_TRACKER_JS)
+
+
+def ajax_count(driver, url_fragment=None):
+    """Number of finished XHR/fetch calls (optionally only those whose URL contains `url_fragment`)."""
+    try:
+        return driver.execute_script(
+            """
+            var tracker = window.__ajaxTracker;
+            if (!tracker) { return 0; }
+            var fragment = arguments[0];
+            if (!fragment) { return tracker.completed; }
+            return tracker.urls.filter(function (url) { return url.indexOf(fragment) !== -1; }).length;
+            """,
+            url_fragment,
+        )
+    except JavascriptException:
+        return 0
+
+
+class ajax_completed:
+    """
+    Waits until more than `previous_count` XHR/fetch calls matching `url_fragment`
+    have finished. Take `previous_count` from ajax_count() just before the action
+    that triggers the request.
+    """
+
+    def __init__(self, url_fragment, previous_count):
+        self.url_fragment = url_fragment
+        self.previous_count = previous_count
+
+    def __call__(self, driver):
+        return ajax_count(driver, self.url_fragment) > self.previous_count
+
+
+class ajax_idle:
+    """Waits until every XHR/fetch call the page has started has finished."""
+
+    def __call__(self, driver):
+        try:
+            return driver.execute_script(
+                "var t = window.__ajaxTracker; return !t || t.started === t.completed;"
+            )
+        except JavascriptException:
+            return False
+
+
+class options_count_changed:
+    """
+    Waits until the <select> at `locator` has a different number of <option>s than
+    `previous_count` and at least `min_count` of them. Returns the option count.
+
+    Reasoning: Cascading dropdowns are refilled after the parent changes. Comparing
+    the count (rather than waiting for presence) catches the moment the new list is
+    in place, and re-finding the element each poll survives ASP.NET postbacks that
+    replace it.
+    """
+
+    def __init__(self, locator, previous_count, min_count=1):
+        self.locator = locator
+        self.previous_count = previous_count
+        self.min_count = min_count
+
+    def __call__(self, driver):
+        try:
+            select = driver.find_element(*self.locator)
+            count = len(select.find_elements(By.TAG_NAME, 'option'))
+        except (NoSuchElementException, StaleElementReferenceException):
+            return False
+        if count != self.previous_count and count >= self.min_count:
+            return count
+        return False
+
+
+class option_values_changed:
+    """
+    Waits until the option values of the <select> at `locator` differ from
+    `previous_values` (a tuple). Returns the new tuple of values.
+
+    Use this instead of options_count_changed when two parents can have the same
+    number of children (e.g. two states with three cities each).
+    """
+
+    def __init__(self, locator, previous_values, min_count=1):
+        self.locator = locator
+        self.previous_values = tuple(previous_values)
+        self.min_count = min_count
+
+    def __call__(self, driver):
+        try:
+            select = driver.find_element(*self.locator)
+            values = tuple(driver.execute_script(
+                "return Array.from(arguments[0].options).map(function (o) { return o.value; });",
+                select,
+            ))
+        except (NoSuchElementException, StaleElementReferenceException, JavascriptException):
+            return False
+        if values != self.previous_values and len(values) >= self.min_count:
+            return values
+        return False
+
+
+class text_stabilized:
+    """
+    Waits until the element at `locator` has non-empty text that has not changed for
+    `quiet_period` seconds. Returns the text, or True when it is empty and
+    `allow_empty` is set.
+
+    Reasoning: Some result panels are filled in several steps (heading first, then
+    address, then phone). Waiting for the text to stop changing replaces a fixed
+    "give it two more seconds" sleep.
+    """
+
+    def __init__(self, locator, quiet_period=0.3, allow_empty=False):
+        self.locator = locator
+        self.quiet_period = quiet_period
+        self.allow_empty = allow_empty
+        self._last_text = None
+        self._last_change = None
+
+    def __call__(self, driver):
+        try:
+            text = driver.find_element(*self.locator).text.strip()
+        except (NoSuchElementException, StaleElementReferenceException):
+            self._last_text = None
+            return False
+
+        now = time.monotonic()
+        if text != self._last_text:
+            self._last_text = text
+            self._last_change = now
+            return False
+        if not text and not self.allow_empty:
+            return False
+        if now - self._last_change >= self.quiet_period:
+            # Reasoning: WebDriverWait treats '' as "not yet", so stable empty text must be
+            # reported with a truthy value or an allowed empty panel could only time out.
+            return text or True
+        return False
+
+
+def wait_for(driver, condition, timeout=10, poll_frequency=0.1):
+    """WebDriverWait(...).until(condition) with a faster default poll than Selenium's 0.5s."""
+    return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
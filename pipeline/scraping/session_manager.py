@@ -0,0 +1,142 @@
+"""
+Automatic session cookies and CSRF tokens for cookie-gated AJAX endpoints.
+
+PHP sites (Laravel, CakePHP, CodeIgniter) only answer their AJAX endpoints
+for a browser that has loaded the page first: a session cookie (PHPSESSID,
+laravel_session, ...) plus a CSRF token (XSRF-TOKEN / csrfToken cookie or a
+<meta name="csrf-token"> tag). Pasting these from DevTools works until the
+session times out, after which every remaining request fails.
+
+SessionManager instead:
+1. Loads the landing page once with a pooled session, so the site sets fresh
+   cookies, and copies the CSRF token into the headers the framework checks.
+2. Shares that cookie jar and those headers across all worker threads.
+3. On a 401/403/419 response, loads the landing page again (once, however
+   many threads saw the failure at the same time) and retries the request
+   with the new session.
+
+Usage:
+    session = SessionManager("https://www.aavas.in/branch-locator", headers)
+    response = session.get("https://www.aavas.in/ajax-branch-by-state?id=DELHI")
+    session.close()
+"""
+
+import re
+import threading
+from urllib.parse import unquote
+
+from http_session import create_session
+
+# CSRF cookie -> request header the framework reads it back from
+TOKEN_COOKIES = {
+    'XSRF-TOKEN': 'X-XSRF-TOKEN',   # Laravel (value is URL-encoded)
+    'csrfToken': 'X-CSRF-Token',    # CakePHP
+    'csrf_cookie_name': 'X-CSRF-TOKEN',  # CodeIgniter
+}
+META_TOKEN_PATTERN = re.compile(
+    r'<meta[^>]+name=["\']csrf-token["\'][^>]+content=["\']([^"\']+)["\']', re.IGNORECASE)
+
+# The landing page is loaded like a browser navigation, not with the scraper's XHR/JSON headers:
+# sites that serve different content to AJAX requests would otherwise omit the token.
+# A None value removes that session header for this request.
+BOOTSTRAP_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'X-Requested-With': None,
+    'Content-Type': None,
+    'Origin': None,
+}
+
+# Laravel answers an expired CSRF token with 419; others use 401/403.
+REFRESH_STATUSES = (401, 403, 419)
+
+
+class SessionManager:
+    """A pooled requests session that bootstraps and refreshes its own cookies and CSRF token."""
+
+    def __init__(self, landing_url, headers=None, pool_size=8, timeout=20, retries=2,
+                 refresh_statuses=REFRESH_STATUSES, max_refreshes=5):
+        self.landing_url = landing_url
+        self.timeout = timeout
+        self.refresh_statuses = set(refresh_statuses)
+        self.max_refreshes = max_refreshes
+        # Reasoning: A hand-pasted Cookie header would override the cookie jar on every
+        # request, so the refreshed session would never be sent.
+        headers = {name: value for name, value in (headers or {}).items() if name.lower() != 'cookie'}
+        self.session = create_session(headers, pool_size=pool_size, retries=retries)
+        self.refreshes = 0
+        self._refreshes_without_success = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def bootstrap(self):
+        """Loads the landing page with an empty cookie jar and sets the CSRF headers from it."""
+        self.session.cookies.clear()
+        for header in set(TOKEN_COOKIES.values()):
+            self.session.headers.pop(header, None)
+
+        response = self.session.get(self.landing_url, headers=BOOTSTRAP_HEADERS, timeout=self.timeout)
+        response.raise_for_status()
+
+        tokens = {}
+        match = META_TOKEN_PATTERN.search(response.text)
+        if match:
+            tokens['X-CSRF-TOKEN'] = match.group(1)
+        for cookie_name, header in TOKEN_COOKIES.items():
+            value = self.session.cookies.get(cookie_name)
+            if value:
+                tokens[header] = unquote(value)
+        self.session.headers.update(tokens)
+
+        cookie_names = sorted(cookie.name for cookie in self.session.cookies)
+        print(f"Session from {self.landing_url}: cookies {', '.join(cookie_names) or 'none'}; "
+              f"CSRF headers {', '.join(sorted(tokens)) or 'none'}")
+        self._generation += 1
+
+    def _ensure_session(self, seen_generation):
+        """Bootstraps (or refreshes) unless another thread already did since `seen_generation`."""
+        with self._lock:
+            if self._generation == seen_generation:
+                if seen_generation > 0:
+                    # Reasoning: Only count refreshes that no request has succeeded with, so a long
+                    # run can outlive any number of session timeouts but a blocked client stops.
+                    self._refreshes_without_success += 1
+                    if self._refreshes_without_success > self.max_refreshes:
+                        raise RuntimeError(f"Session for {self.landing_url} refreshed {self.max_refreshes} "
+                                           "times in a row; the site keeps rejecting it.")
+                    self.refreshes += 1
+                    print(f"Session rejected; refreshing from {self.landing_url}")
+                self.bootstrap()
+
+    def request(self, method, url, **kwargs):
+        """Like requests.Session.request(); refreshes the session once and retries on 401/403/419."""
+        kwargs.setdefault('timeout', self.timeout)
+        generation = self._generation
+        if generation == 0:
+            self._ensure_session(0)
+            generation = self._generation
+
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code in self.refresh_statuses:
+            self._ensure_session(generation)
+            response = self.session.request(method, url, **kwargs)
+        if response.status_code not in self.refresh_statuses:
+            self._refreshes_without_success = 0
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,119 @@
+import re
+
+import pandas as pd
+
+# Reasoning: Every validation script looks for the same 6-digit Indian pincode.
+# Compiling the patterns once avoids re-parsing them for every address.
+PINCODE_PATTERN = re.compile(r'\b(\d{6})\b')
+NON_ALPHANUMERIC_PATTERN = re.compile(r'[^a-z0-9\s]')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_and_extract_pincode(address):
+    """
+    Cleans an address string and extracts its 6-digit pincode.
+
+    - It converts text to lowercase.
+    - It removes punctuation and extra whitespace.
+    - It uses a regular expression to find a 6-digit pincode.
+
+    Returns a (clean_address, pincode) tuple. Non-string input yields ('', '').
+    """
+    # Handle cases where the address might be missing (not a string)
+    if not isinstance(address, str):
+        return '', ''
+
+    # Convert to lowercase and remove leading/trailing whitespace
+    clean_address = address.lower().strip()
+
+    # \b ensures we match a whole word (boundary), so we don't match 6 digits inside a longer number.
+    pincode_match = PINCODE_PATTERN.search(clean_address)
+    pincode = pincode_match.group(1) if pincode_match else ''
+
+    # Remove all non-alphanumeric characters (except spaces) to make matching more flexible
+    # For example, "123, main st." becomes "123 main st"
+    clean_address = NON_ALPHANUMERIC_PATTERN.sub('', clean_address)
+    # Replace multiple spaces with a single space
+    clean_address = WHITESPACE_PATTERN.sub(' ', clean_address).strip()
+
+    return clean_address, pincode
+
+
+def build_match_key(clean_address, pincode):
+    """Combines a normalized address and pincode into the key used for exact matching."""
+    return clean_address + '_' + pincode
+
+
+def extract_pincode(address):
+    """Returns the first 6-digit pincode found in an address, or '' if there is none."""
+    if not isinstance(address, str):
+        return ''
+    pincode_match = PINCODE_PATTERN.search(address)
+    return pincode_match.group(1) if pincode_match else ''
+
+
+def normalize_address_column(addresses):
+    """
+    Vectorized version of normalize_and_extract_pincode() for a whole pandas Series.
+
+    Reasoning: Calling the scalar function through .apply(pd.Series) builds one small
+    Series per row. The pandas .str methods run the same regexes in a single pass
+    and give identical results. Returns a DataFrame with 'clean_address' and 'pincode'.
+    """
+    is_text = addresses.map(lambda value: isinstance(value, str))
+    text = addresses.where(is_text, '').astype(str).str.lower().str.strip()
+
+    pincode = text.str.extract(PINCODE_PATTERN, expand=False).fillna('')
+    clean_address = (
+        text.str.replace(NON_ALPHANUMERIC_PATTERN, '', regex=True)
+            .str.replace(WHITESPACE_PATTERN, ' ', regex=True)
+            .str.strip()
+    )
+
+    return pd.DataFrame({'clean_address': clean_address, 'pincode': pincode}, index=addresses.index)
+
+
+def pincode_to_int(pincodes):
+    """Converts a column of 6-character pincode strings to int32, with 0 for 'no pincode'."""
+    return pd.to_numeric(pincodes.where(pincodes != '', '0')).astype('int32')
+
+
+def hash_match_key(clean_addresses, pincodes):
+    """
+    Hashes (clean_address, pincode) pairs to 64-bit integers.
+
+    Reasoning: The string match key repeats the whole address plus the pincode for
+    every row. A uint64 hash is 8 bytes, and set lookups and merges on integers are
+    much cheaper than on strings. With 64 bits, the chance of any collision among
+    10 million distinct keys is about 3 in a million.
+    """
+    key_parts = pd.DataFrame({'clean_address': clean_addresses, 'pincode': pincodes})
+    return pd.util.hash_pandas_object(key_parts, index=False).astype('uint64')
+
+
+def has_pincode(pincodes):
+    """True where a pincode was found, for both string ('') and compact (0) pincode columns."""
+    if pd.api.types.is_integer_dtype(pincodes):
+        return pincodes != 0
+    return pincodes != ''
+
+
+def add_normalized_columns(df, address_column, compact=False):
+    """
+    Adds 'clean_address', 'pincode' and 'match_key' columns to a DataFrame in place.
+
+    With compact=True the columns use a smaller representation for large comparisons:
+    'pincode' is int32 (0 when missing), 'clean_address' is categorical so repeated
+    addresses are stored once, and 'match_key' is a uint64 hash (see hash_match_key).
+    Exact-match results are the same either way.
+    """
+    normalized = normalize_address_column(df[address_column])
+    if compact:
+        df['pincode'] = pincode_to_int(normalized['pincode'])
+        df['match_key'] = hash_match_key(normalized['clean_address'], df['pincode'])
+        df['clean_address'] = normalized['clean_address'].astype('category')
+    else:
+        df['clean_address'] = normalized['clean_address']
+        df['pincode'] = normalized['pincode']
+        df['match_key'] = build_match_key(df['clean_address'], df['pincode'])
+    return df
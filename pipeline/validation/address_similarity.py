@@ -26,23 +26,9 @@ def calculate_similarity_score():
         print(f"Error: The file '{input_filename}' was not found. Please run the previous step first.")
         return
 
-    # --- 2. DEFINE SIMILARITY CALCULATION ---
-    # Reasoning: We define a small wrapper function to handle potential non-string
-    # data and to clearly name the method we are using (Token Sort Ratio).
-    def get_token_sort_ratio(addr1, addr2):
-        # Ensure both inputs are strings before comparing
-        if not isinstance(addr1, str) or not isinstance(addr2, str):
-            return 0
-        return fuzz.token_sort_ratio(addr1, addr2)
-
-    # --- 3. APPLY THE FUNCTION ---
-    # Reasoning: We use the .apply() method with a lambda function to efficiently
-    # run our calculation across every row in the DataFrame.
+    # --- 2 & 3. CALCULATE SIMILARITY ---
     print("Calculating similarity scores for each address pair...")
-    df['Similarity_Score'] = df.apply(
-        lambda row: get_token_sort_ratio(row['SFDC_Address'], row['Scraped_Address']),
-        axis=1
-    )
+    add_similarity_scores(df)
 
     # --- 4. SAVE THE FINAL REPORT ---
     output_filename = "pincode_comparison_with_scores.xlsx"
@@ -51,5 +37,33 @@ def calculate_similarity_score():
     print(f"\nSuccessfully calculated scores and saved the report to '{output_filename}'.")
     print("You can now open this file and sort by 'Similarity_Score' to see the best and worst matches.")
 
+
+def get_token_sort_ratio(addr1, addr2):
+    """
+    Token Sort Ratio between two addresses (0-100).
+
+    Reasoning: We define a small wrapper function to handle potential non-string
+    data and to clearly name the method we are using (Token Sort Ratio).
+    """
+    # Ensure both inputs are strings before comparing
+    if not isinstance(addr1, str) or not isinstance(addr2, str):
+        return 0
+    return fuzz.token_sort_ratio(addr1, addr2)
+
+
+def add_similarity_scores(df, sfdc_column='SFDC_Address', scraped_column='Scraped_Address'):
+    """
+    Adds a 'Similarity_Score' column to a pincode comparison report in place.
+
+    Reasoning: Zipping the two columns avoids building a row Series for every pair,
+    which is what .apply(axis=1) does and is where most of its time goes.
+    """
+    df['Similarity_Score'] = [
+        get_token_sort_ratio(addr1, addr2)
+        for addr1, addr2 in zip(df[sfdc_column], df[scraped_column])
+    ]
+    return df
+
+
 if __name__ == "__main__":
     calculate_similarity_score()
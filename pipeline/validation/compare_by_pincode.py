@@ -1,6 +1,7 @@
 
 import pandas as pd
-import re
+
+from address_normalization import extract_pincode, has_pincode
 
 def compare_addresses_by_pincode():
     """
@@ -8,7 +9,7 @@ def compare_addresses_by_pincode():
 
     The process is as follows:
     1. Load both the SFDC and the newly scraped Excel files.
-    2. Define a function to extract a 6-digit pincode from an address string.
+    2. Use the shared function that extracts a 6-digit pincode from an address string.
     3. Apply this function to both DataFrames to create a 'pincode' column in each.
     4. Perform an 'inner merge' on the two DataFrames. This combines them based on
        matching pincodes, creating rows for every combination of addresses that
@@ -27,12 +28,8 @@ def compare_addresses_by_pincode():
         return
 
     # --- 2. EXTRACT PINCODE FUNCTION ---
-    # Reasoning: A simple, reusable function to find a 6-digit pincode in a string.
-    def extract_pincode(address):
-        if not isinstance(address, str):
-            return ''
-        pincode_match = re.search(r'\b(\d{6})\b', address)
-        return pincode_match.group(1) if pincode_match else ''
+    # Reasoning: extract_pincode() is shared with the other validation scripts via
+    # address_normalization.py, so every stage agrees on what a pincode is.
 
     # --- 3. APPLY PINCODE EXTRACTION ---
     # Reasoning: We create a dedicated 'pincode' column in both DataFrames, which makes
@@ -40,9 +37,24 @@ def compare_addresses_by_pincode():
     sfdc_df['pincode'] = sfdc_df['Address_Line_1__c'].apply(extract_pincode)
     scraped_df['pincode'] = scraped_df['Address'].apply(extract_pincode)
 
+    final_report_df = build_pincode_comparison(sfdc_df, scraped_df)
+    save_pincode_comparison(final_report_df)
+
+
+def build_pincode_comparison(sfdc_df, scraped_df):
+    """
+    Steps 4-5 of compare_addresses_by_pincode(): pairs every SFDC address with every
+    scraped address that shares its pincode.
+
+    Both DataFrames must already have a 'pincode' column ('' when none was found, or
+    0 for the compact int32 form).
+    Returns the report DataFrame with 'Pincode', 'SFDC_Address' and 'Scraped_Address'.
+    """
     # Filter out rows where no pincode was found, as they cannot be matched.
-    sfdc_df_filtered = sfdc_df[sfdc_df['pincode'] != ''].copy()
-    scraped_df_filtered = scraped_df[scraped_df['pincode'] != ''].copy()
+    # Reasoning: Only the pincode and address columns are carried into the merge, since
+    # the merge multiplies rows and every extra column multiplies its memory cost too.
+    sfdc_df_filtered = sfdc_df.loc[has_pincode(sfdc_df['pincode']), ['pincode', 'Address_Line_1__c']]
+    scraped_df_filtered = scraped_df.loc[has_pincode(scraped_df['pincode']), ['pincode', 'Address']]
 
     # --- 4. MERGE DATAFRAMES ON PINCODE ---
     # Reasoning: An 'inner' merge is the most efficient way to find all records
@@ -68,6 +80,11 @@ def compare_addresses_by_pincode():
         'Address': 'Scraped_Address'
     })
 
+    return final_report_df
+
+
+def save_pincode_comparison(final_report_df, output_filename='pincode_address_comparison.xlsx'):
+    """Steps 6-7 of compare_addresses_by_pincode(): prints the summary and saves the report."""
     # --- 6. REPORT FINDINGS ---
     # Reasoning: The number of unique pincodes in the final report is the answer
     # to the user's question.
@@ -78,7 +95,6 @@ def compare_addresses_by_pincode():
     print("---------------------------\\n")
 
     # --- 7. SAVE THE REPORT ---
-    output_filename = 'pincode_address_comparison.xlsx'
     final_report_df.to_excel(output_filename, index=False)
 
     print(f"Successfully saved the comparison report to '{output_filename}'")
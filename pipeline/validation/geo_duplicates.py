@@ -0,0 +1,244 @@
+import numpy as np
+import pandas as pd
+
+from address_normalization import add_normalized_columns
+from address_similarity import get_token_sort_ratio
+
+EARTH_RADIUS_M = 6371000.0
+# Must match the sphere haversine_m() measures on, or grid cells come out narrower than the radius.
+METRES_PER_DEGREE_LAT = EARTH_RADIUS_M * np.pi / 180.0
+# Cells are padded slightly: a great circle between two points at the same latitude bends
+# towards the pole, so a pair can be within the radius yet further apart in longitude than
+# radius / (metres per degree of longitude).
+CELL_PADDING = 1.01
+
+SFDC_LAT_COLUMN = 'Latitude__c'
+SFDC_LNG_COLUMN = 'Longitude__c'
+SCRAPED_LAT_COLUMN = 'Latitude'
+SCRAPED_LNG_COLUMN = 'Longitude'
+
+
+def clean_coordinates(lat_series, lng_series):
+    """
+    Converts coordinate columns to floats and masks out unusable values.
+
+    Scraped files use 'N/A', 'NA' or blanks for missing coordinates and some
+    sources emit (0, 0). All of those become NaN so they never match anything.
+    """
+    lat = pd.to_numeric(lat_series, errors='coerce').to_numpy(dtype='float64', copy=True)
+    lng = pd.to_numeric(lng_series, errors='coerce').to_numpy(dtype='float64', copy=True)
+    invalid = (
+        np.isnan(lat) | np.isnan(lng)
+        | (np.abs(lat) > 90) | (np.abs(lng) > 180)
+        | ((lat == 0) & (lng == 0))
+    )
+    lat[invalid] = np.nan
+    lng[invalid] = np.nan
+    return lat, lng
+
+
+def haversine_m(lat1, lng1, lat2, lng2):
+    """Vectorized great-circle distance in metres between two sets of points."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        np.sin((lat2 - lat1) / 2.0) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2.0) ** 2
+    )
+    return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridIndex:
+    """
+    A uniform lat/lng grid over a set of points, for fixed-radius neighbour queries.
+
+    Reasoning: Comparing every scraped branch with every SFDC branch is O(n*m)
+    haversine calls. With cells at least `radius_m` wide, any point within the
+    radius of a query lies in the query's cell or one of its 8 neighbours, so
+    only those few cells need distance checks. The grid is stored as the points
+    sorted by cell id plus a table of where each cell starts, which numpy can
+    build for a million points in well under a second.
+    """
+
+    def __init__(self, lat, lng, radius_m, max_abs_lat=None):
+        self.radius_m = float(radius_m)
+        self.lat = np.asarray(lat, dtype='float64')
+        self.lng = np.asarray(lng, dtype='float64')
+
+        # A degree of longitude shrinks towards the poles, so size the longitude step
+        # for the highest latitude in play. Cells are then wider than needed nearer the
+        # equator, which only adds a few extra candidates.
+        if max_abs_lat is None:
+            max_abs_lat = np.nanmax(np.abs(self.lat)) if np.isfinite(self.lat).any() else 0.0
+        max_abs_lat = min(float(max_abs_lat), 85.0)
+        self.lat_step = self.radius_m * CELL_PADDING / METRES_PER_DEGREE_LAT
+        self.lng_step = self.radius_m * CELL_PADDING / (METRES_PER_DEGREE_LAT * np.cos(np.radians(max_abs_lat)))
+        self.row_span = int(np.ceil(360.0 / self.lng_step)) + 3
+
+        valid = np.flatnonzero(np.isfinite(self.lat) & np.isfinite(self.lng))
+        cell_ids = self._cell_ids(self.lat[valid], self.lng[valid])
+        order = np.argsort(cell_ids, kind='stable')
+
+        self.point_ids = valid[order]
+        sorted_cells = cell_ids[order]
+        self.cells, self.cell_starts, self.cell_counts = np.unique(
+            sorted_cells, return_index=True, return_counts=True
+        )
+
+    def _cell_coords(self, lat, lng):
+        rows = np.floor((lat + 90.0) / self.lat_step).astype('int64')
+        cols = np.floor((lng + 180.0) / self.lng_step).astype('int64')
+        return rows, cols
+
+    def _cell_ids(self, lat, lng):
+        rows, cols = self._cell_coords(lat, lng)
+        return rows * self.row_span + cols
+
+    def query_pairs(self, lat, lng, chunk_size=200000):
+        """
+        Finds every (query, indexed point) pair within `radius_m` of each other.
+
+        Returns three arrays: query positions, indexed point positions and distances
+        in metres. Queries are processed in chunks so memory stays bounded.
+        """
+        lat = np.asarray(lat, dtype='float64')
+        lng = np.asarray(lng, dtype='float64')
+        query_parts, point_parts, distance_parts = [], [], []
+
+        for chunk_start in range(0, len(lat), chunk_size):
+            chunk = np.arange(chunk_start, min(chunk_start + chunk_size, len(lat)))
+            chunk = chunk[np.isfinite(lat[chunk]) & np.isfinite(lng[chunk])]
+            if len(chunk) == 0 or len(self.cells) == 0:
+                continue
+
+            rows, cols = self._cell_coords(lat[chunk], lng[chunk])
+            for d_row in (-1, 0, 1):
+                for d_col in (-1, 0, 1):
+                    neighbour_ids = (rows + d_row) * self.row_span + (cols + d_col)
+                    slot = np.searchsorted(self.cells, neighbour_ids)
+                    slot = np.minimum(slot, len(self.cells) - 1)
+                    hit = self.cells[slot] == neighbour_ids
+                    if not hit.any():
+                        continue
+
+                    queries = chunk[hit]
+                    starts = self.cell_starts[slot[hit]]
+                    counts = self.cell_counts[slot[hit]]
+
+                    # Expand every (query, cell) hit into one row per point in that cell.
+                    query_ids = np.repeat(queries, counts)
+                    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+                    point_ids = self.point_ids[np.repeat(starts, counts) + offsets]
+
+                    distances = haversine_m(lat[query_ids], lng[query_ids],
+                                            self.lat[point_ids], self.lng[point_ids])
+                    within = distances <= self.radius_m
+                    query_parts.append(query_ids[within])
+                    point_parts.append(point_ids[within])
+                    distance_parts.append(distances[within])
+
+        if not query_parts:
+            empty = np.array([], dtype='int64')
+            return empty, empty, np.array([], dtype='float64')
+        return np.concatenate(query_parts), np.concatenate(point_parts), np.concatenate(distance_parts)
+
+
+def match_by_proximity(sfdc_df, scraped_df, radius_m=100, min_similarity=60,
+                       sfdc_coords=(SFDC_LAT_COLUMN, SFDC_LNG_COLUMN),
+                       scraped_coords=(SCRAPED_LAT_COLUMN, SCRAPED_LNG_COLUMN)):
+    """
+    Pairs scraped branches with SFDC branches that are within `radius_m` metres and
+    whose normalized addresses score at least `min_similarity` (token sort ratio).
+
+    Both DataFrames must already carry the 'clean_address' column added by
+    add_normalized_columns(). Returns a DataFrame with one row per accepted pair:
+    'Scraped_Row', 'SFDC_Row', 'Distance_m', 'Similarity_Score', 'SFDC_Address',
+    'Scraped_Address'.
+    """
+    sfdc_lat, sfdc_lng = clean_coordinates(sfdc_df[sfdc_coords[0]], sfdc_df[sfdc_coords[1]])
+    scraped_lat, scraped_lng = clean_coordinates(scraped_df[scraped_coords[0]], scraped_df[scraped_coords[1]])
+
+    max_abs_lat = np.nanmax(np.abs(np.concatenate([sfdc_lat, scraped_lat, [0.0]])))
+    index = GridIndex(sfdc_lat, sfdc_lng, radius_m, max_abs_lat=max_abs_lat)
+    query_ids, point_ids, distances = index.query_pairs(scraped_lat, scraped_lng)
+
+    # Reasoning: Two different branches can sit in the same building or market, so a
+    # nearby point alone is not enough. The fuzzy text check runs only on the handful of
+    # pairs that survived the distance filter, never on the full cross product.
+    sfdc_clean = sfdc_df['clean_address'].to_numpy(dtype=object)
+    scraped_clean = scraped_df['clean_address'].to_numpy(dtype=object)
+    scores = np.array([
+        get_token_sort_ratio(scraped_clean[q], sfdc_clean[p])
+        for q, p in zip(query_ids, point_ids)
+    ], dtype='int64')
+    accepted = scores >= min_similarity
+
+    pairs_df = pd.DataFrame({
+        'Scraped_Row': scraped_df.index.to_numpy()[query_ids[accepted]],
+        'SFDC_Row': sfdc_df.index.to_numpy()[point_ids[accepted]],
+        'Distance_m': np.round(distances[accepted], 1),
+        'Similarity_Score': scores[accepted],
+        'SFDC_Address': sfdc_df['Address_Line_1__c'].to_numpy(dtype=object)[point_ids[accepted]],
+        'Scraped_Address': scraped_df['Address'].to_numpy(dtype=object)[query_ids[accepted]],
+    })
+    return pairs_df.sort_values(['Scraped_Row', 'Distance_m'], kind='stable').reset_index(drop=True)
+
+
+def save_geo_duplicate_reports(scraped_df, pairs_df,
+                               matches_filename='geo_duplicate_matches.xlsx',
+                               unique_filename='unique_branches_geo.xlsx'):
+    """Prints a summary and saves the matched pairs plus the scraped rows with no nearby match."""
+    is_duplicate = scraped_df.index.isin(pairs_df['Scraped_Row'])
+    duplicates_found = int(is_duplicate.sum())
+
+    print("\n--- Proximity Analysis Complete ---")
+    print(f"Total records in newly scraped file: {len(scraped_df)}")
+    print(f"Records with a nearby, similar SFDC branch: {duplicates_found}")
+    print(f"Records with no nearby match: {len(scraped_df) - duplicates_found}")
+    print("-----------------------------------\n")
+
+    pairs_df.to_excel(matches_filename, index=False)
+    unique_df = scraped_df.loc[~is_duplicate].drop(
+        columns=['clean_address', 'pincode', 'match_key'], errors='ignore'
+    )
+    unique_df.to_excel(unique_filename, index=False)
+
+    print(f"Successfully saved {len(pairs_df)} matched pairs to '{matches_filename}'")
+    print(f"Successfully saved {len(unique_df)} unmatched records to '{unique_filename}'")
+    return unique_df
+
+
+def find_geo_duplicates(radius_m=100, min_similarity=60):
+    """
+    This script flags newly scraped branches that sit within `radius_m` metres of an
+    existing SFDC branch with a similar address.
+
+    The process is as follows:
+    1. Load both the SFDC and the newly scraped Excel files.
+    2. Normalize both address columns (same rules as find_duplicates.py).
+    3. Build a grid index over the SFDC coordinates.
+    4. Query every scraped coordinate against the grid to get nearby candidates.
+    5. Keep candidates whose address similarity passes `min_similarity`.
+    6. Save the matched pairs and the scraped rows that had no match.
+    """
+    # --- 1. LOAD FILES ---
+    try:
+        sfdc_df = pd.read_excel("existing_data.xlsx")
+        scraped_df = pd.read_excel("scraped_data.xlsx")
+        print("Successfully loaded both Excel files.")
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Please make sure both Excel files are in the correct directory.")
+        return
+
+    # --- 2. NORMALIZE ---
+    add_normalized_columns(sfdc_df, 'Address_Line_1__c')
+    add_normalized_columns(scraped_df, 'Address')
+
+    # --- 3 to 5. SPATIAL MATCH + TEXT GATE ---
+    pairs_df = match_by_proximity(sfdc_df, scraped_df, radius_m=radius_m, min_similarity=min_similarity)
+
+    # --- 6. SAVE REPORTS ---
+    save_geo_duplicate_reports(scraped_df, pairs_df)
+
+
+if __name__ == "__main__":
+    find_geo_duplicates()
@@ -0,0 +1,185 @@
+import csv
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from address_normalization import add_normalized_columns
+from address_similarity import add_similarity_scores
+from compare_by_pincode import build_pincode_comparison
+
+NO_PINCODE_SHARD = 'none'
+ROW_COLUMN = '_source_row'
+
+
+def iter_chunks(filename, chunk_size=50000):
+    """
+    Yields a file's rows as DataFrames of at most `chunk_size` rows.
+
+    Reasoning: pd.read_excel() always loads the whole sheet. openpyxl's read-only mode
+    streams rows instead, so even an Excel export never has to fit in memory at once.
+    CSV files are streamed with pandas' own chunked reader.
+    """
+    if filename.lower().endswith('.csv'):
+        yield from pd.read_csv(filename, dtype=str, keep_default_na=False, chunksize=chunk_size)
+        return
+
+    workbook = load_workbook(filename, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(name) for name in next(rows, ())]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        workbook.close()
+
+
+def partition_to_shards(filename, address_column, shard_dir, prefix_len=2, chunk_size=50000):
+    """
+    Normalizes a file chunk by chunk and appends each row to an on-disk CSV shard named
+    after the first `prefix_len` digits of its pincode.
+
+    Reasoning: The match key and the pincode comparison both require equal pincodes, so
+    two rows can only ever match if they land in the same shard. Rows without a pincode
+    go to a separate shard, where they can still match each other exactly.
+    Returns the set of shard names written.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    shards = set()
+    rows_seen = 0
+
+    for chunk in iter_chunks(filename, chunk_size):
+        chunk.insert(0, ROW_COLUMN, range(rows_seen, rows_seen + len(chunk)))
+        rows_seen += len(chunk)
+        add_normalized_columns(chunk, address_column)
+
+        shard_keys = chunk['pincode'].str[:prefix_len].where(chunk['pincode'] != '', NO_PINCODE_SHARD)
+        for shard, shard_df in chunk.groupby(shard_keys, sort=False):
+            shard_file = os.path.join(shard_dir, f"{shard}.csv")
+            shard_df.to_csv(shard_file, mode='a', header=shard not in shards, index=False)
+            shards.add(shard)
+
+    print(f"Partitioned {rows_seen} rows from '{filename}' into {len(shards)} shard(s).")
+    return shards
+
+
+def read_shard(shard_dir, shard):
+    shard_file = os.path.join(shard_dir, f"{shard}.csv")
+    if not os.path.exists(shard_file):
+        return None
+    return pd.read_csv(shard_file, dtype=str, keep_default_na=False)
+
+
+def append_csv(df, filename, write_header):
+    df.to_csv(filename, mode='a', header=write_header, index=False, quoting=csv.QUOTE_MINIMAL)
+
+
+def validate_out_of_core(sfdc_file="existing_data.xlsx", scraped_file="scraped_data.xlsx",
+                         work_dir=None, prefix_len=2, chunk_size=50000,
+                         with_scores=True):
+    """
+    Runs exact dedup and pincode comparison on inputs that are too large for memory.
+
+    The process is as follows:
+    1. Stream both files in chunks, normalize each chunk and append its rows to
+       on-disk shards keyed by pincode prefix.
+    2. For each shard, load only that shard of both sides (bounded memory).
+    3. Exact dedup: keep scraped rows whose match key is not in the SFDC shard.
+    4. Pincode comparison: merge the two shards on pincode, optionally with
+       similarity scores.
+    5. Append each shard's results to the output CSVs, then delete the shards.
+
+    Shards are written to a fresh temporary directory, created inside `work_dir` when one
+    is given (e.g. a disk with more space); only that directory is ever deleted.
+
+    Outputs are CSV rather than Excel because a national comparison can exceed Excel's
+    row limit and an Excel file has to be built in memory. Rows are grouped by
+    pincode prefix; '_source_row' gives each scraped row's position in the input.
+    """
+    # Reasoning: A new directory per run means shards from an interrupted run are never appended
+    # to, and the cleanup below can only ever remove what this run created, never the caller's files.
+    if work_dir:
+        os.makedirs(work_dir, exist_ok=True)
+    shard_root = tempfile.mkdtemp(prefix='validation_shards-', dir=work_dir)
+    try:
+        _validate_shards(sfdc_file, scraped_file, shard_root, prefix_len, chunk_size, with_scores)
+    finally:
+        shutil.rmtree(shard_root, ignore_errors=True)
+
+
+def _validate_shards(sfdc_file, scraped_file, shard_root, prefix_len, chunk_size, with_scores):
+    unique_filename = 'unique_branches_to_add.csv'
+    comparison_filename = 'pincode_comparison_with_scores.csv' if with_scores else 'pincode_address_comparison.csv'
+    sfdc_dir = os.path.join(shard_root, 'sfdc')
+    scraped_dir = os.path.join(shard_root, 'scraped')
+
+    # --- 1. PARTITION ---
+    try:
+        sfdc_shards = partition_to_shards(sfdc_file, 'Address_Line_1__c', sfdc_dir, prefix_len, chunk_size)
+        scraped_shards = partition_to_shards(scraped_file, 'Address', scraped_dir, prefix_len, chunk_size)
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Please make sure both files are in the correct directory.")
+        return
+
+    for filename in (unique_filename, comparison_filename):
+        if os.path.exists(filename):
+            os.remove(filename)
+
+    total_scraped = 0
+    duplicates_found = 0
+    comparison_rows = 0
+    matching_pincodes = 0
+    unique_header_written = False
+    comparison_header_written = False
+
+    # --- 2 to 5. PROCESS ONE SHARD AT A TIME ---
+    for shard in sorted(scraped_shards):
+        scraped_df = read_shard(scraped_dir, shard)
+        sfdc_df = read_shard(sfdc_dir, shard) if shard in sfdc_shards else None
+        total_scraped += len(scraped_df)
+
+        # --- 3. EXACT DEDUP ---
+        if sfdc_df is not None:
+            is_duplicate = scraped_df['match_key'].isin(set(sfdc_df['match_key']))
+        else:
+            is_duplicate = pd.Series(False, index=scraped_df.index)
+        duplicates_found += int(is_duplicate.sum())
+
+        unique_df = scraped_df.loc[~is_duplicate].drop(columns=['clean_address', 'pincode', 'match_key'])
+        if len(unique_df):
+            append_csv(unique_df, unique_filename, not unique_header_written)
+            unique_header_written = True
+
+        # --- 4. PINCODE COMPARISON ---
+        if sfdc_df is None or shard == NO_PINCODE_SHARD:
+            continue
+        comparison_df = build_pincode_comparison(sfdc_df, scraped_df)
+        if comparison_df.empty:
+            continue
+        if with_scores:
+            add_similarity_scores(comparison_df)
+        comparison_rows += len(comparison_df)
+        matching_pincodes += comparison_df['Pincode'].nunique()
+        append_csv(comparison_df, comparison_filename, not comparison_header_written)
+        comparison_header_written = True
+
+    print("\n--- Out-of-Core Validation Complete ---")
+    print(f"Total records in newly scraped file: {total_scraped}")
+    print(f"Number of duplicate records found in SFDC data: {duplicates_found}")
+    print(f"Number of new, unique records to be added: {total_scraped - duplicates_found}")
+    print(f"Found {matching_pincodes} unique pincodes that exist in BOTH files ({comparison_rows} address pairs).")
+    print("---------------------------------------\n")
+    print(f"Unique records saved to '{unique_filename}'")
+    print(f"Pincode comparison saved to '{comparison_filename}'")
+
+
+if __name__ == "__main__":
+    validate_out_of_core()
@@ -0,0 +1,74 @@
+import pandas as pd
+
+from address_normalization import add_normalized_columns
+from find_duplicates import save_unique_records
+from compare_by_pincode import build_pincode_comparison, save_pincode_comparison
+from address_similarity import add_similarity_scores
+from geo_duplicates import match_by_proximity, save_geo_duplicate_reports
+
+
+def run_validation(sfdc_file="existing_data.xlsx", scraped_file="scraped_data.xlsx",
+                   geo_radius_m=None, geo_min_similarity=60, compact=True):
+    """
+    Runs the whole validation stage (dedup, pincode comparison and similarity scoring)
+    while reading and normalizing each input file only once.
+
+    Running find_duplicates.py, compare_by_pincode.py and address_similarity.py one after
+    another parses both Excel files twice, normalizes them twice and re-reads the
+    comparison report from disk. Here every stage works on the same in-memory columns.
+
+    The process is as follows:
+    1. Load both the SFDC and the newly scraped Excel files.
+    2. Normalize both address columns once, adding 'clean_address', 'pincode' and 'match_key'.
+    3. Exact dedup: save scraped records whose match key is not in SFDC.
+    4. Pincode comparison: pair SFDC and scraped addresses sharing a pincode.
+    5. Similarity scoring: add a fuzzy 'Similarity_Score' to each pair from step 4.
+    6. Optional, when `geo_radius_m` is set: proximity dedup (see geo_duplicates.py).
+
+    The reports keep the file names produced by the individual scripts.
+
+    With compact=True (the default) the shared columns use int32 pincodes, a categorical
+    clean address and uint64 match-key hashes, so dedup and the pincode merge work on
+    integers. See add_normalized_columns() for details.
+    """
+    # --- 1. LOAD FILES ---
+    try:
+        sfdc_df = pd.read_excel(sfdc_file)
+        scraped_df = pd.read_excel(scraped_file)
+        print("Successfully loaded both Excel files.")
+    except FileNotFoundError as e:
+        print(f"Error: {e}. Please make sure both Excel files are in the correct directory.")
+        return
+
+    # --- 2. NORMALIZE ONCE ---
+    # Reasoning: Every later stage reads from these shared columns instead of running
+    # its own pincode regex over the raw addresses.
+    add_normalized_columns(sfdc_df, 'Address_Line_1__c', compact=compact)
+    add_normalized_columns(scraped_df, 'Address', compact=compact)
+
+    # --- 3. EXACT DEDUP ---
+    sfdc_keys = sfdc_df['match_key'].unique()
+    save_unique_records(scraped_df, sfdc_keys)
+
+    # --- 4. PINCODE COMPARISON ---
+    comparison_df = build_pincode_comparison(sfdc_df, scraped_df)
+    save_pincode_comparison(comparison_df)
+
+    # --- 5. SIMILARITY SCORING ---
+    # Reasoning: The comparison report is still in memory, so there is no need to
+    # write it to Excel and read it back as address_similarity.py does on its own.
+    print("Calculating similarity scores for each address pair...")
+    add_similarity_scores(comparison_df)
+    output_filename = "pincode_comparison_with_scores.xlsx"
+    comparison_df.to_excel(output_filename, index=False)
+    print(f"Successfully calculated scores and saved the report to '{output_filename}'.")
+
+    # --- 6. PROXIMITY DEDUP (OPTIONAL) ---
+    if geo_radius_m:
+        pairs_df = match_by_proximity(sfdc_df, scraped_df, radius_m=geo_radius_m,
+                                      min_similarity=geo_min_similarity)
+        save_geo_duplicate_reports(scraped_df, pairs_df)
+
+
+if __name__ == "__main__":
+    run_validation()
@@ -0,0 +1,188 @@
+import os
+import pickle
+from collections import Counter
+
+import pandas as pd
+
+from address_normalization import normalize_and_extract_pincode, build_match_key
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_FILE = 'sfdc_index.pkl'
+SFDC_ADDRESS_COLUMN = 'Address_Line_1__c'
+
+
+def _as_index_address(address):
+    # Missing addresses (NaN, None, numbers) are stored as None so they all share one entry.
+    return address if isinstance(address, str) else None
+
+
+class SFDCIndex:
+    """
+    A persisted, incrementally updatable index of normalized SFDC addresses.
+
+    The SFDC export changes very little between runs, so re-normalizing every row
+    each time is wasted work. The index remembers:
+    - how many times each raw address appears in the export,
+    - the normalized (clean_address, pincode) pair for each raw address,
+    - a count of every match key, for O(1) exact-duplicate lookups,
+    - the raw addresses that fall under each pincode.
+
+    When the export changes, only raw addresses that were never seen before are
+    normalized; everything else is applied as a count delta.
+    """
+
+    def __init__(self):
+        self.source_signature = None
+        self.address_counts = Counter()
+        self.normalized = {}
+        self.match_keys = Counter()
+        self.pincode_addresses = {}
+
+    # --- PERSISTENCE ---
+
+    @classmethod
+    def load(cls, index_file=DEFAULT_INDEX_FILE):
+        """Loads an index from disk, or returns an empty one if the file is missing or stale."""
+        if not os.path.exists(index_file):
+            return cls()
+        try:
+            with open(index_file, 'rb') as f:
+                payload = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            print(f"Warning: could not read index '{index_file}' ({e}). Starting a fresh index.")
+            return cls()
+
+        if payload.get('version') != INDEX_VERSION:
+            print(f"Index '{index_file}' was built by a different version. Starting a fresh index.")
+            return cls()
+
+        index = cls()
+        index.source_signature = payload['source_signature']
+        index.address_counts = payload['address_counts']
+        index.normalized = payload['normalized']
+        index.match_keys = payload['match_keys']
+        index.pincode_addresses = payload['pincode_addresses']
+        return index
+
+    def save(self, index_file=DEFAULT_INDEX_FILE):
+        """Writes the index atomically so an interrupted save never corrupts the previous copy."""
+        payload = {
+            'version': INDEX_VERSION,
+            'source_signature': self.source_signature,
+            'address_counts': self.address_counts,
+            'normalized': self.normalized,
+            'match_keys': self.match_keys,
+            'pincode_addresses': self.pincode_addresses,
+        }
+        temp_file = index_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, index_file)
+
+    # --- INCREMENTAL UPDATES ---
+
+    def add_addresses(self, addresses):
+        """Adds raw SFDC addresses (e.g. rows from a delta export) to the index."""
+        for address, count in Counter(_as_index_address(a) for a in addresses).items():
+            self._apply_delta(address, count)
+
+    def remove_addresses(self, addresses):
+        """Removes raw SFDC addresses (e.g. rows deleted from SFDC) from the index."""
+        for address, count in Counter(_as_index_address(a) for a in addresses).items():
+            self._apply_delta(address, -min(count, self.address_counts.get(address, 0)))
+
+    def update_from_export(self, sfdc_file, address_column=SFDC_ADDRESS_COLUMN):
+        """
+        Synchronizes the index with a full SFDC export.
+
+        Reasoning: If the export's size and modification time match the last sync, the
+        file is not even opened. Otherwise the address column is read and diffed against
+        the stored counts, so only added/removed rows touch the index.
+        Returns True if the export was re-read and the index needs saving.
+        """
+        stat = os.stat(sfdc_file)
+        signature = (os.path.abspath(sfdc_file), stat.st_size, stat.st_mtime_ns)
+        if signature == self.source_signature:
+            return False
+
+        if sfdc_file.lower().endswith('.csv'):
+            export_df = pd.read_csv(sfdc_file, usecols=[address_column])
+        else:
+            export_df = pd.read_excel(sfdc_file, usecols=[address_column])
+
+        new_counts = Counter(_as_index_address(a) for a in export_df[address_column])
+
+        changed = 0
+        for address in set(self.address_counts) | set(new_counts):
+            delta = new_counts.get(address, 0) - self.address_counts.get(address, 0)
+            if delta:
+                self._apply_delta(address, delta)
+                changed += abs(delta)
+
+        self.source_signature = signature
+        print(f"SFDC index synchronized with '{sfdc_file}': {changed} row change(s) applied.")
+        return True
+
+    def _apply_delta(self, address, delta):
+        if delta == 0:
+            return
+
+        # Reasoning: Normalization is the expensive step, so it runs only for raw
+        # addresses the index has never seen before.
+        if address not in self.normalized:
+            self.normalized[address] = normalize_and_extract_pincode(address)
+        clean_address, pincode = self.normalized[address]
+        match_key = build_match_key(clean_address, pincode)
+
+        self.address_counts[address] += delta
+        self.match_keys[match_key] += delta
+
+        if pincode:
+            addresses_for_pincode = self.pincode_addresses.setdefault(pincode, Counter())
+            addresses_for_pincode[address] += delta
+            if addresses_for_pincode[address] <= 0:
+                del addresses_for_pincode[address]
+            if not addresses_for_pincode:
+                del self.pincode_addresses[pincode]
+
+        if self.address_counts[address] <= 0:
+            del self.address_counts[address]
+            del self.normalized[address]
+        if self.match_keys[match_key] <= 0:
+            del self.match_keys[match_key]
+
+    # --- LOOKUPS ---
+
+    def contains_keys(self, match_keys):
+        """Returns a boolean Series marking which match keys already exist in SFDC."""
+        return pd.Series(match_keys).isin(self.match_keys.keys())
+
+    def addresses_for_pincode(self, pincode):
+        """Returns the raw SFDC addresses that share the given pincode."""
+        return list(self.pincode_addresses.get(pincode, ()))
+
+    def __len__(self):
+        return sum(self.address_counts.values())
+
+
+def load_sfdc_index(sfdc_file="existing_data.xlsx", index_file=DEFAULT_INDEX_FILE):
+    """
+    Loads the persisted SFDC index, refreshes it from the export if the export has
+    changed, and saves it back when anything was updated.
+    """
+    index = SFDCIndex.load(index_file)
+    if os.path.exists(sfdc_file):
+        if index.update_from_export(sfdc_file):
+            index.save(index_file)
+    elif index.source_signature is None:
+        raise FileNotFoundError(f"No SFDC index at '{index_file}' and no export at '{sfdc_file}' to build one.")
+    else:
+        print(f"SFDC export '{sfdc_file}' not found; using the saved index as-is.")
+    return index
+
+
+if __name__ == "__main__":
+    # Build or refresh the index ahead of time so duplicate checks can skip the export.
+    sfdc_index = load_sfdc_index()
+    print(f"SFDC index holds {len(sfdc_index)} rows, {len(sfdc_index.match_keys)} unique match keys "
+          f"and {len(sfdc_index.pincode_addresses)} pincodes.")
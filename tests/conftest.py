@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Shared scraping helpers live in pipeline/scraping/, the validation tools in pipeline/validation/
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'pipeline', 'scraping'))
+sys.path.insert(0, os.path.join(ROOT, 'pipeline', 'validation'))
@@ -0,0 +1,85 @@
+import csv
+import http.server
+import json
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from api_crawl import _render, run_crawl
+
+STATES = {'GOA': [{'id': 1}, {'id': 2}, {'id': None}], 'KERALA': [{'id': 3}]}
+BRANCHES = {
+    '1': [{'branch_name': 'Panaji', 'branch_address': 'MG Road'}],
+    '2': [],
+    '3': [{'branch_name': 'Kochi', 'branch_address': 'Edappally'}],
+}
+
+
+class LocatorHandler(http.server.BaseHTTPRequestHandler):
+    """An Aavas-shaped API: /state?id=... lists branch IDs, /branch?id=... returns a (possibly empty) list."""
+
+    def do_GET(self):
+        url = urllib.parse.urlparse(self.path)
+        key = urllib.parse.parse_qs(url.query)['id'][0]
+        if url.path == '/state':
+            # The first state answers last, so its rows only arrive after the second state's.
+            if key == 'GOA':
+                time.sleep(0.2)
+            body = STATES[key]
+        else:
+            body = BRANCHES[key]
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def base_url():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), LocatorHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_render_substitutes_only_context_fields():
+    context = {'state_id': 7, 'name': 'Goa'}
+    assert _render('https://example.com/find?id={state_id}', context) == 'https://example.com/find?id=7'
+    assert _render({'filter': '{"state": "{name}"}', 'pattern': r'\d{6}', 'other': '{missing}'}, context) == {
+        'filter': '{"state": "Goa"}', 'pattern': r'\d{6}', 'other': '{missing}'}
+    assert _render(None, context) is None
+    assert _render(3, context) == 3
+
+
+def test_crawl_writes_parent_order_and_skips_empty_details(base_url, tmp_path, monkeypatch):
+    monkeypatch.delenv('SCRAPER_CACHE', raising=False)
+    spec = {
+        'name': 'Locator',
+        'parents': [{'state': 'GOA'}, {'state': 'KERALA'}],
+        'steps': [
+            {'url': base_url + '/state?id={state}', 'items': '', 'fields': {'branch_id': 'id'},
+             'require': ['branch_id']},
+            {'url': base_url + '/branch', 'params': {'id': '{branch_id}'}, 'items': '0',
+             'fields': {'branch': 'branch_name', 'address': 'branch_address', 'city': 'city'}},
+        ],
+        'columns': {'State': 'state', 'Branch': 'branch', 'Address': 'address', 'City': 'city'},
+    }
+    output = str(tmp_path / 'branches.csv')
+
+    written, failures = run_crawl(spec, workers=4, output=output)
+
+    assert (written, failures) == (2, [])
+    with open(output, newline='', encoding='utf-8') as f:
+        assert list(csv.reader(f)) == [
+            ['State', 'Branch', 'Address', 'City'],
+            ['GOA', 'Panaji', 'MG Road', 'NA'],
+            ['KERALA', 'Kochi', 'Edappally', 'NA'],
+        ]
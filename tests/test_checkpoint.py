@@ -0,0 +1,72 @@
+import csv
+import os
+
+from checkpoint import CheckpointedCrawl, CheckpointedCSVWriter
+
+HEADER = ['State', 'City', 'Address']
+
+
+def read_rows(filename):
+    with open(filename, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_reopen_truncates_rows_written_after_the_last_checkpoint(tmp_path):
+    filename = str(tmp_path / 'Goa.csv')
+    with CheckpointedCSVWriter(filename, HEADER) as writer:
+        writer.write(('Panaji',), [['Goa', 'Panaji', 'MG Road']])
+    # A crash halfway through the next key: a row and a half on disk, nothing logged.
+    with open(filename, 'a', encoding='utf-8') as f:
+        f.write('Goa,Margao,Station Road\r\nGoa,Mar')
+
+    with CheckpointedCSVWriter(filename, HEADER) as writer:
+        assert writer.is_done('Panaji')
+        assert not writer.is_done('Margao')
+        writer.write(('Margao',), [['Goa', 'Margao', 'Station Road']])
+
+    assert read_rows(filename) == [['Goa', 'Panaji', 'MG Road'], ['Goa', 'Margao', 'Station Road']]
+
+
+def test_reopen_resumes_from_the_offset_log_and_drops_a_torn_log_line(tmp_path):
+    filename = str(tmp_path / 'Goa.csv')
+    with CheckpointedCSVWriter(filename, HEADER) as writer:
+        writer.write(('Panaji', 'Altinho'), [['Goa', 'Panaji', 'MG Road']])
+        writer.mark_done('Panaji')
+    with open(f"{filename}.done", 'a', encoding='utf-8') as f:
+        f.write('{"key": ["Marg')
+
+    with CheckpointedCSVWriter(filename, HEADER) as writer:
+        assert writer.completed == {('Panaji', 'Altinho'), ('Panaji',)}
+        writer.write(('Margao',), [['Goa', 'Margao', 'Station Road']])
+
+    with CheckpointedCSVWriter(filename, HEADER) as writer:
+        assert writer.is_done('Margao')
+    assert read_rows(filename) == [['Goa', 'Panaji', 'MG Road'], ['Goa', 'Margao', 'Station Road']]
+
+
+def test_is_done_tracks_keys_and_the_whole_partition(tmp_path):
+    with CheckpointedCSVWriter(str(tmp_path / 'Goa.csv'), HEADER) as writer:
+        assert not writer.is_done()
+        writer.write(('Panaji', 'Altinho'), [])
+        assert writer.is_done('Panaji', 'Altinho')
+        assert not writer.is_done('Panaji')
+        writer.mark_done()
+        assert writer.is_done()
+        assert writer.rows_written == 0
+
+
+def test_merge_writes_partition_order_and_keeps_parts_while_any_failed(tmp_path):
+    crawl = CheckpointedCrawl(str(tmp_path / 'out.csv'), HEADER)
+    with crawl.part('Kerala') as writer:
+        writer.write(('Kochi',), [['Kerala', 'Kochi', 'Edappally']])
+        writer.mark_done()
+    with crawl.part('Goa') as writer:
+        writer.write(('Panaji',), [['Goa', 'Panaji', 'MG Road']])
+
+    assert crawl.merge(['Goa', 'Kerala', 'Punjab'], failed=['Goa']) == 2
+    assert read_rows(crawl.output_file) == [['Goa', 'Panaji', 'MG Road'], ['Kerala', 'Kochi', 'Edappally']]
+    assert os.path.exists(crawl.part_file('Goa'))
+    assert os.path.exists(crawl.part_file('Kerala'))
+
+    crawl.merge(['Goa', 'Kerala'])
+    assert not os.path.exists(crawl.parts_dir)
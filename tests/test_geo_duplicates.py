@@ -0,0 +1,35 @@
+import numpy as np
+
+from geo_duplicates import EARTH_RADIUS_M, GridIndex, haversine_m
+
+
+def offset_point(lat, lng, distance_m, bearing_deg):
+    """The point `distance_m` metres from (lat, lng) along `bearing_deg`, on the haversine sphere."""
+    lat, lng, bearing = np.radians(lat), np.radians(lng), np.radians(bearing_deg)
+    angle = distance_m / EARTH_RADIUS_M
+    lat2 = np.arcsin(np.sin(lat) * np.cos(angle) + np.cos(lat) * np.sin(angle) * np.cos(bearing))
+    lng2 = lng + np.arctan2(np.sin(bearing) * np.sin(angle) * np.cos(lat),
+                            np.cos(angle) - np.sin(lat) * np.sin(lat2))
+    return np.degrees(lat2), np.degrees(lng2)
+
+
+def test_grid_index_finds_pairs_just_inside_the_radius():
+    rng = np.random.default_rng(0)
+    lat = rng.uniform(8.0, 35.0, 2000)
+    lng = rng.uniform(68.0, 97.0, 2000)
+    bearing = rng.choice([0.0, 90.0, 180.0, 270.0, 45.0], 2000)
+    query_lat, query_lng = offset_point(lat, lng, 99.95, bearing)
+    assert np.all(haversine_m(lat, lng, query_lat, query_lng) < 100)
+
+    index = GridIndex(lat, lng, radius_m=100)
+    query_ids, point_ids, _ = index.query_pairs(query_lat, query_lng)
+
+    found = set(zip(query_ids.tolist(), point_ids.tolist()))
+    assert all((i, i) in found for i in range(len(lat)))
+
+
+def test_grid_index_skips_pairs_outside_the_radius():
+    lat, lng = np.array([19.0760]), np.array([72.8777])
+    query_lat, query_lng = offset_point(lat, lng, 100.5, 0.0)
+    query_ids, _, _ = GridIndex(lat, lng, radius_m=100).query_pairs(query_lat, query_lng)
+    assert len(query_ids) == 0
@@ -0,0 +1,100 @@
+import http.server
+import threading
+
+import pytest
+from requests.adapters import HTTPAdapter
+
+import http_cache
+from http_cache import CacheMiss, CachingAdapter, HttpCache
+from http_session import create_session
+
+
+class BranchHandler(http.server.BaseHTTPRequestHandler):
+    """Serves one JSON body with an ETag; a matching If-None-Match gets a 304 with a fresh cookie and token."""
+
+    def do_GET(self):
+        self.server.requests.append(self.headers.get('If-None-Match'))
+        count = len(self.server.requests)
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.send_header('ETag', '"v1"')
+            self.send_header('Set-Cookie', f'session=s{count}; Path=/')
+            self.send_header('X-CSRF-Token', f't{count}')
+            self.end_headers()
+            return
+        body = b'[{"id": 380}]'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', '"v1"')
+        self.send_header('Set-Cookie', f'session=s{count}; Path=/')
+        self.send_header('X-CSRF-Token', f't{count}')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), BranchHandler)
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}/branches"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_record_then_replay_serves_from_disk(server, tmp_path):
+    httpd, url = server
+    recorded = create_session(cache=HttpCache(str(tmp_path), mode='record')).get(url)
+    assert recorded.json() == [{'id': 380}]
+
+    replay = create_session(cache=HttpCache(str(tmp_path), mode='replay'))
+    response = replay.get(url)
+    assert response.from_cache
+    assert response.json() == [{'id': 380}]
+    assert response.headers['Content-Type'] == 'application/json'
+    assert len(httpd.requests) == 1
+
+    with pytest.raises(CacheMiss):
+        replay.get(url + '?page=2')
+    assert len(httpd.requests) == 1
+
+
+def test_revalidate_keeps_cached_body_and_live_headers_and_cookies(server, tmp_path):
+    httpd, url = server
+    cache = HttpCache(str(tmp_path), mode='revalidate')
+    session = create_session(cache=cache)
+    assert session.get(url).json() == [{'id': 380}]
+    assert session.cookies['session'] == 's1'
+
+    response = session.get(url)
+
+    assert httpd.requests == [None, '"v1"']
+    assert cache.stats['revalidated'] == 1
+    assert response.status_code == 200
+    assert response.json() == [{'id': 380}]
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.headers['X-CSRF-Token'] == 't2'
+    assert session.cookies['session'] == 's2'
+
+
+def test_cache_from_env_is_read_for_every_session(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, '_env_caches', {})
+    monkeypatch.setenv('SCRAPER_CACHE_DIR', str(tmp_path))
+
+    monkeypatch.setenv('SCRAPER_CACHE', 'off')
+    adapter = create_session().get_adapter('https://example.com')
+    assert not isinstance(adapter, CachingAdapter) and isinstance(adapter, HTTPAdapter)
+
+    monkeypatch.setenv('SCRAPER_CACHE', 'replay')
+    first = create_session().get_adapter('https://example.com')
+    second = create_session().get_adapter('https://example.com')
+    assert isinstance(first, CachingAdapter) and first.cache.mode == 'replay'
+    assert second.cache is first.cache
+
+    monkeypatch.setenv('SCRAPER_CACHE', 'record')
+    assert create_session().get_adapter('https://example.com').cache.mode == 'record'
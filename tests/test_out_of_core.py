@@ -0,0 +1,21 @@
+import os
+
+import pandas as pd
+
+from out_of_core import validate_out_of_core
+
+
+def test_validate_out_of_core_only_deletes_its_own_shards(tmp_path, monkeypatch):
+    pd.DataFrame({'Address_Line_1__c': ['12 MG Road, Pune 411001']}).to_csv(tmp_path / 'sfdc.csv', index=False)
+    pd.DataFrame({'Address': ['12 MG Road, Pune 411001', '4 Station Road, Nagpur 440001']}).to_csv(
+        tmp_path / 'scraped.csv', index=False)
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    (work_dir / 'keep.txt').write_text('not a shard')
+    monkeypatch.chdir(tmp_path)
+
+    validate_out_of_core('sfdc.csv', 'scraped.csv', work_dir=str(work_dir), with_scores=False)
+
+    assert os.listdir(work_dir) == ['keep.txt']
+    unique = pd.read_csv(tmp_path / 'unique_branches_to_add.csv', dtype=str)
+    assert unique['Address'].tolist() == ['4 Station Road, Nagpur 440001']
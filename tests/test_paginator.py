@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from paginator import paginate, paginate_async
+
+
+def listing(page_count, clamp=False, per_page=3):
+    """fetch_page for a listing of `page_count` pages; past the end it is empty, or the last page if clamp."""
+    requested = []
+
+    def fetch_page(page):
+        requested.append(page)
+        if page > page_count:
+            if not clamp or page_count == 0:
+                return []
+            page = page_count
+        return [f"branch {page}-{i}" for i in range(per_page)]
+
+    return fetch_page, requested
+
+
+@pytest.mark.parametrize('clamp', [False, True])
+@pytest.mark.parametrize('page_count', list(range(0, 41)) + [63, 64, 65, 100])
+def test_finds_every_page_exactly_once(page_count, clamp):
+    fetch_page, _ = listing(page_count, clamp=clamp)
+    pages, failures = paginate(fetch_page, workers=4)
+    assert failures == []
+    assert [page for page, _ in pages] == list(range(1, page_count + 1))
+
+
+def test_clamping_site_repeats_last_page():
+    fetch_page, requested = listing(37, clamp=True)
+    pages, _ = paginate(fetch_page, workers=4)
+    assert [page for page, _ in pages] == list(range(1, 38))
+    assert pages[-1][1] == ['branch 37-0', 'branch 37-1', 'branch 37-2']
+    # Only O(log n) probes land past the end, however far the site clamps.
+    assert len(set(requested) - set(range(1, 38))) <= 2 * (37).bit_length()
+
+
+def test_single_page_site():
+    fetch_page, requested = listing(1, clamp=True)
+    pages, failures = paginate(fetch_page)
+    assert pages == [(1, ['branch 1-0', 'branch 1-1', 'branch 1-2'])]
+    assert failures == []
+    assert sorted(set(requested)) == [1, 2]
+
+
+def test_page_count_hint_is_verified():
+    fetch_page, _ = listing(12, clamp=True)
+    for hint in (5, 12, 30):
+        pages, _ = paginate(fetch_page, page_count=lambda body, hint=hint: hint)
+        assert [page for page, _ in pages] == list(range(1, 13))
+
+
+def test_max_pages_clamps_the_search():
+    fetch_page, requested = listing(500)
+    pages, _ = paginate(fetch_page, max_pages=20)
+    assert [page for page, _ in pages] == list(range(1, 21))
+    assert max(requested) == 20
+
+    pages, _ = paginate(fetch_page, max_pages=20, page_count=lambda body: 1000)
+    assert [page for page, _ in pages] == list(range(1, 21))
+
+
+def test_first_page_offset():
+    fetch_page, _ = listing(10)
+    pages, _ = paginate(lambda page: fetch_page(page + 1), first_page=0)
+    assert [page for page, _ in pages] == list(range(0, 10))
+
+
+def test_failed_probe_is_retried_then_raises():
+    fetch_page, _ = listing(37)
+    attempts = {}
+
+    def flaky(page):
+        attempts[page] = attempts.get(page, 0) + 1
+        if page == 8 and attempts[page] == 1:
+            raise ConnectionError("reset by peer")
+        return fetch_page(page)
+
+    pages, failures = paginate(flaky)
+    assert [page for page, _ in pages] == list(range(1, 38))
+    assert failures == []
+
+    def broken(page):
+        if page == 8:
+            raise ConnectionError("reset by peer")
+        return fetch_page(page)
+
+    with pytest.raises(RuntimeError):
+        paginate(broken, probe_retries=1)
+
+
+def test_paginate_async_matches_paginate():
+    fetch_page, _ = listing(29, clamp=True)
+
+    async def fetch_page_async(page):
+        await asyncio.sleep(0)
+        return fetch_page(page)
+
+    pages, failures = asyncio.run(paginate_async(fetch_page_async, workers=4))
+    assert pages == paginate(fetch_page)[0]
+    assert failures == []
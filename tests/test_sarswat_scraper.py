@@ -0,0 +1,102 @@
+import csv
+import os
+import sys
+
+from selenium.common.exceptions import TimeoutException
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'examples', 'method_4_selenium',
+                                'saraswat_bank'))
+import sarswat_scraper
+from checkpoint import CheckpointedCrawl
+
+STATES = [('1', 'Goa'), ('2', 'Kerala')]
+CITIES = {'1': [{'value': '10', 'text': 'Panaji'}], '2': [{'value': '20', 'text': 'Kochi'}]}
+AREAS = {
+    '10': [{'value': '100', 'text': 'Altinho'}, {'value': '101', 'text': 'Miramar'}],
+    '20': [{'value': '200', 'text': 'Edappally'}],
+}
+IDLE = object()
+
+
+class FakeElement:
+    text = 'Address on file'
+
+
+class FakeDriver:
+    """Just enough of a WebDriver for scrape_state(); remembers the selected area."""
+
+    def __init__(self, failing_area):
+        self.failing_area = failing_area
+        self.area = None
+
+    def find_element(self, *_):
+        return FakeElement()
+
+    def execute_script(self, *_):
+        return None
+
+    def quit(self):
+        pass
+
+
+class FakeWait:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def until(self, condition):
+        if condition is not IDLE and self.driver.area == self.driver.failing_area:
+            raise TimeoutException("branch details did not load")
+        return FakeElement()
+
+
+class SerialPool:
+    """BrowserPool.run() in this process: (partition, result, error) in partition order."""
+
+    def __init__(self, create_driver, workers):
+        self.create_driver = create_driver
+
+    def run(self, scrape_partition, partitions):
+        results = []
+        for partition in partitions:
+            try:
+                results.append((partition, scrape_partition(self.create_driver(), partition), None))
+            except Exception as e:
+                results.append((partition, None, str(e)))
+        return results
+
+
+def choose(driver, selector, value, **_):
+    if selector == '#ddlArea':
+        driver.area = value
+
+
+def choose_and_list(driver, dropdown_id, value, dependent_id):
+    return CITIES[value] if dropdown_id == 'ddlState' else AREAS[value]
+
+
+def test_unfinished_state_keeps_its_part_after_merge(tmp_path, monkeypatch):
+    crawl = CheckpointedCrawl(str(tmp_path / 'out.csv'), sarswat_scraper.CSV_HEADER, delimiter='@')
+    monkeypatch.setattr(sarswat_scraper, 'CRAWL', crawl)
+    monkeypatch.setattr(sarswat_scraper, 'BrowserPool', SerialPool)
+    monkeypatch.setattr(sarswat_scraper, 'create_driver', lambda: FakeDriver(failing_area='101'))
+    monkeypatch.setattr(sarswat_scraper, 'list_states', lambda driver: STATES)
+    monkeypatch.setattr(sarswat_scraper, 'open_locator', lambda driver: FakeWait(driver))
+    monkeypatch.setattr(sarswat_scraper, 'choose', choose)
+    monkeypatch.setattr(sarswat_scraper, 'choose_and_list', choose_and_list)
+    monkeypatch.setattr(sarswat_scraper, 'ajax_idle', lambda: IDLE)
+    monkeypatch.setattr(sarswat_scraper, 'ajax_count', lambda driver: 0)
+    monkeypatch.setattr(sarswat_scraper, 'ajax_completed', lambda *args: None)
+    monkeypatch.setattr(sarswat_scraper, 'text_stabilized', lambda *args, **kwargs: None)
+    monkeypatch.setattr(sarswat_scraper, 'labelled_values', lambda driver, selector: {'Address': 'MG Road'})
+
+    states, failed = sarswat_scraper.scrape_with_browsers()
+    crawl.merge([state_name for _, state_name in states], failed)
+
+    assert failed == ['Goa']
+    assert os.path.exists(crawl.part_file('Goa'))
+    with crawl.part('Goa') as writer:
+        assert writer.is_done('Panaji', 'Altinho')
+        assert not writer.is_done('Panaji', 'Miramar')
+    with open(tmp_path / 'out.csv', newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f, delimiter='@'))[1:]
+    assert rows == [['Goa', 'Panaji', 'Altinho', 'MG Road'], ['Kerala', 'Kochi', 'Edappally', 'MG Road']]
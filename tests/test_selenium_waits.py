@@ -0,0 +1,37 @@
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+
+import pytest
+
+from selenium_waits import text_stabilized, wait_for
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDriver:
+    def __init__(self, texts):
+        self.texts = list(texts)
+
+    def find_element(self, by, value):
+        text = self.texts.pop(0) if len(self.texts) > 1 else self.texts[0]
+        return FakeElement(text)
+
+
+def test_text_stabilized_returns_stable_text():
+    driver = FakeDriver(['', 'Address', 'Address: Pune'])
+    assert wait_for(driver, text_stabilized((By.ID, 'branchDetails'), quiet_period=0.05), timeout=2) == 'Address: Pune'
+
+
+def test_text_stabilized_allows_stable_empty_text():
+    driver = FakeDriver(['   '])
+    condition = text_stabilized((By.ID, 'branchDetails'), quiet_period=0.05, allow_empty=True)
+    assert wait_for(driver, condition, timeout=2) is True
+
+
+def test_text_stabilized_waits_on_empty_text_unless_allowed():
+    driver = FakeDriver([''])
+    with pytest.raises(TimeoutException):
+        wait_for(driver, text_stabilized((By.ID, 'branchDetails'), quiet_period=0.05), timeout=0.5)
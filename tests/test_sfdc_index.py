@@ -0,0 +1,85 @@
+import os
+
+import pandas as pd
+
+import sfdc_index
+from sfdc_index import SFDCIndex
+
+MG_ROAD = '12, MG Road, Pune - 411001'
+MG_ROAD_UPPER = '12 MG ROAD PUNE 411001'
+MG_ROAD_KEY = '12 mg road pune 411001_411001'
+STATION_ROAD = '4 Station Road, Nagpur 440001'
+STATION_ROAD_KEY = '4 station road nagpur 440001_440001'
+FC_ROAD = '7 FC Road, Pune 411004'
+
+
+def write_export(path, addresses, mtime_ns=None):
+    pd.DataFrame({'Id': range(len(addresses)), 'Address_Line_1__c': addresses}).to_csv(path, index=False)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_re_export_applies_count_deltas(tmp_path):
+    export = str(tmp_path / 'sfdc.csv')
+    write_export(export, [MG_ROAD, MG_ROAD_UPPER, STATION_ROAD, STATION_ROAD], mtime_ns=1_000_000_000)
+    index = SFDCIndex()
+    assert index.update_from_export(export)
+    assert index.match_keys[MG_ROAD_KEY] == 2
+    assert index.match_keys[STATION_ROAD_KEY] == 2
+    assert len(index) == 4
+
+    # One Nagpur row deleted, one Pune row edited, one new row.
+    write_export(export, [MG_ROAD, STATION_ROAD, FC_ROAD, FC_ROAD], mtime_ns=2_000_000_000)
+    assert index.update_from_export(export)
+
+    assert index.address_counts == {MG_ROAD: 1, STATION_ROAD: 1, FC_ROAD: 2}
+    assert index.match_keys[MG_ROAD_KEY] == 1
+    assert index.match_keys[STATION_ROAD_KEY] == 1
+    assert MG_ROAD_UPPER not in index.normalized
+    assert sorted(index.addresses_for_pincode('411001')) == [MG_ROAD]
+    assert sorted(index.addresses_for_pincode('411004')) == [FC_ROAD]
+    assert index.contains_keys([MG_ROAD_KEY, 'missing_000000']).tolist() == [True, False]
+
+    write_export(export, [FC_ROAD], mtime_ns=3_000_000_000)
+    index.update_from_export(export)
+    assert MG_ROAD_KEY not in index.match_keys
+    assert index.addresses_for_pincode('440001') == []
+    assert len(index) == 1
+
+
+def test_unchanged_export_is_skipped_by_signature(tmp_path, monkeypatch):
+    export = str(tmp_path / 'sfdc.csv')
+    write_export(export, [MG_ROAD, STATION_ROAD])
+    index = SFDCIndex()
+    assert index.update_from_export(export)
+
+    def read_csv(*args, **kwargs):
+        raise AssertionError("an unchanged export should not be opened")
+
+    monkeypatch.setattr(sfdc_index.pd, 'read_csv', read_csv)
+    assert not index.update_from_export(export)
+
+
+def test_save_and_load_round_trip(tmp_path):
+    export = str(tmp_path / 'sfdc.csv')
+    index_file = str(tmp_path / 'sfdc_index.pkl')
+    write_export(export, [MG_ROAD, MG_ROAD_UPPER, STATION_ROAD, None])
+    index = SFDCIndex()
+    index.update_from_export(export)
+
+    index.save(index_file)
+    assert sorted(os.listdir(tmp_path)) == ['sfdc.csv', 'sfdc_index.pkl']
+    loaded = SFDCIndex.load(index_file)
+
+    assert loaded.source_signature == index.source_signature
+    assert loaded.address_counts == index.address_counts
+    assert loaded.normalized == index.normalized
+    assert loaded.match_keys == index.match_keys
+    assert loaded.pincode_addresses == index.pincode_addresses
+    assert not loaded.update_from_export(export)
+
+
+def test_unreadable_index_starts_fresh(tmp_path):
+    index_file = tmp_path / 'sfdc_index.pkl'
+    index_file.write_bytes(b'not a pickle')
+    assert len(SFDCIndex.load(str(index_file))) == 0